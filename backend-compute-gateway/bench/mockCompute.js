@@ -0,0 +1,217 @@
+import crypto from 'crypto';
+import http from 'http';
+import { pathToFileURL } from 'url';
+
+/**
+ * Mock Rhino Compute server for benchmarks
+ *
+ * Implements the endpoints the gateway calls (/io, /grasshopper, /version) with a
+ * configurable solve latency and concurrency, and returns responses in Compute's
+ * shape: json-to-gh returns a `gh_file`, gh-to-json a `json_script`, and any
+ * other definition a set of serialized Rhino meshes.
+ *
+ * Run standalone: node bench/mockCompute.js --port 5055 --latency 80 --jitter 20
+ */
+
+const DEFAULTS = {
+  port: 0,
+  latencyMs: 50,
+  jitterMs: 10,
+  // Solves run at once beyond this, further requests wait (Compute solves are CPU bound)
+  concurrency: 4,
+  meshes: 4,
+  meshKb: 64,
+  // Answer every solve with a script error (500) instead of a result
+  failSolves: false,
+};
+
+function readBody(req) {
+  return new Promise((resolve, reject) => {
+    const chunks = [];
+    req.on('data', (chunk) => chunks.push(chunk));
+    req.on('end', () => resolve(Buffer.concat(chunks)));
+    req.on('error', reject);
+  });
+}
+
+function sendJson(res, status, body) {
+  const payload = Buffer.from(JSON.stringify(body));
+  res.writeHead(status, { 'Content-Type': 'application/json', 'Content-Length': payload.length });
+  res.end(payload);
+}
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+/**
+ * A Compute-serialized Rhino object: { version, archive3dm, opennurbs, data } as a JSON string
+ */
+function serializedGeometry(bytes) {
+  return JSON.stringify({
+    version: 10000,
+    archive3dm: 80,
+    opennurbs: -1877964208,
+    data: bytes.toString('base64'),
+  });
+}
+
+function stringOutput(paramName, value) {
+  return {
+    ParamName: paramName,
+    InnerTree: { '{0}': [{ type: 'System.String', data: JSON.stringify(value) }] },
+  };
+}
+
+/**
+ * Start a mock Compute server
+ * @param {Object} options - See DEFAULTS
+ * @returns {Promise<{ url, stats, close }>}
+ */
+export async function startMockCompute(options = {}) {
+  const config = { ...DEFAULTS, ...options };
+  const pointers = new Map(); // pointer -> upload size
+  const stats = { solves: 0, uploads: 0, peakActive: 0, peakQueued: 0 };
+
+  // One pseudo-random mesh blob reused by every geometry solve
+  const meshBytes = crypto.randomBytes(config.meshKb * 1024);
+  const geometryItem = { type: 'Rhino.Geometry.Mesh', data: serializedGeometry(meshBytes) };
+
+  let active = 0;
+  const waiting = [];
+  const acquire = async () => {
+    if (active >= config.concurrency) {
+      await new Promise((resolve) => {
+        waiting.push(resolve);
+        stats.peakQueued = Math.max(stats.peakQueued, waiting.length);
+      });
+    } else {
+      active += 1;
+    }
+    stats.peakActive = Math.max(stats.peakActive, active);
+  };
+  const release = () => {
+    const next = waiting.shift();
+    if (next) next();
+    else active -= 1;
+  };
+
+  const solve = (payload) => {
+    const name = payload.filename || '';
+    if (name === 'compute-json-to-gh.gh') {
+      // Echo a .gh-sized binary back as the generated file
+      const ghFile = crypto.createHash('sha256').update(JSON.stringify(payload.values)).digest();
+      return {
+        values: [{
+          ParamName: 'gh_file',
+          InnerTree: { '{0}': [{ type: 'System.String', data: Buffer.concat(Array(256).fill(ghFile)).toString('base64') }] },
+        }],
+        warnings: [],
+        errors: [],
+      };
+    }
+    if (name === 'compute-gh-to-json.gh') {
+      return { values: [stringOutput('json_script', JSON.stringify({ nodes: [], links: [] }))], warnings: [], errors: [] };
+    }
+    return {
+      values: [{
+        ParamName: 'RH_OUT:Geometry',
+        InnerTree: Object.fromEntries(
+          Array.from({ length: config.meshes }, (_, i) => [`{${i}}`, [geometryItem]])
+        ),
+      }],
+      warnings: [],
+      errors: [],
+    };
+  };
+
+  const server = http.createServer(async (req, res) => {
+    try {
+      const body = await readBody(req);
+
+      if (req.method === 'GET' && req.url === '/version') {
+        return sendJson(res, 200, { rhino: '8.0.0-mock', compute: 'mock', git_sha: null });
+      }
+
+      if (req.method === 'POST' && req.url === '/io') {
+        stats.uploads += 1;
+        const pointer = `md5_${crypto.createHash('md5').update(body).digest('hex')}`;
+        pointers.set(pointer, body.length);
+        return sendJson(res, 200, { pointer, InputNames: [], OutputNames: [] });
+      }
+
+      if (req.method === 'POST' && req.url === '/grasshopper') {
+        const payload = JSON.parse(body.toString('utf8'));
+        if (payload.pointer && !pointers.has(payload.pointer)) {
+          return sendJson(res, 500, { message: `Unable to find cached definition ${payload.pointer}` });
+        }
+        if (!payload.pointer && !payload.algo) {
+          return sendJson(res, 400, { message: 'algo or pointer is required' });
+        }
+
+        if (config.failSolves) {
+          return sendJson(res, 500, { message: 'Solution exception: input parameter is invalid' });
+        }
+
+        await acquire();
+        try {
+          const jitter = config.jitterMs ? (Math.random() * 2 - 1) * config.jitterMs : 0;
+          await sleep(Math.max(0, config.latencyMs + jitter));
+          stats.solves += 1;
+          return sendJson(res, 200, solve(payload));
+        } finally {
+          release();
+        }
+      }
+
+      return sendJson(res, 404, { message: `Unknown endpoint ${req.method} ${req.url}` });
+    } catch (err) {
+      return sendJson(res, 500, { message: err.message });
+    }
+  });
+  server.keepAliveTimeout = 30000;
+
+  await new Promise((resolve) => server.listen(config.port, '127.0.0.1', resolve));
+  const url = `http://127.0.0.1:${server.address().port}`;
+
+  return {
+    url,
+    stats,
+    config,
+    // Drop uploaded definitions, as a restarted Compute would
+    forget: () => pointers.clear(),
+    close: () => new Promise((resolve) => {
+      server.closeAllConnections?.();
+      server.close(resolve);
+    }),
+  };
+}
+
+/**
+ * Parse --name value flags into numbers/strings keyed by camelCase name
+ */
+export function parseFlags(argv) {
+  const flags = {};
+  for (let i = 0; i < argv.length; i++) {
+    const match = /^--([a-z-]+)(?:=(.*))?$/.exec(argv[i]);
+    if (!match) continue;
+    const key = match[1].replace(/-([a-z])/g, (_, c) => c.toUpperCase());
+    let value = match[2];
+    if (value === undefined) {
+      value = argv[i + 1] && !argv[i + 1].startsWith('--') ? argv[++i] : 'true';
+    }
+    flags[key] = value !== '' && !Number.isNaN(Number(value)) ? Number(value) : value;
+  }
+  return flags;
+}
+
+if (import.meta.url === pathToFileURL(process.argv[1]).href) {
+  const { port = 5055, latency, jitter, concurrency, meshes, meshKb } = parseFlags(process.argv.slice(2));
+  const mock = await startMockCompute({
+    port,
+    ...(latency !== undefined && { latencyMs: latency }),
+    ...(jitter !== undefined && { jitterMs: jitter }),
+    ...(concurrency !== undefined && { concurrency }),
+    ...(meshes !== undefined && { meshes }),
+    ...(meshKb !== undefined && { meshKb }),
+  });
+  console.log(`[mock-compute] listening on ${mock.url}`, mock.config);
+}
@@ -0,0 +1,329 @@
+import { spawn } from 'child_process';
+import fs from 'fs/promises';
+import net from 'net';
+import path from 'path';
+import { performance } from 'perf_hooks';
+import { fileURLToPath } from 'url';
+import { parseFlags, startMockCompute } from './mockCompute.js';
+
+/**
+ * Gateway benchmark
+ *
+ * Starts mock Rhino Compute worker(s) and the gateway (as a child process pointed
+ * at them), then replays solve, gh-to-json and json-to-gh traffic at a fixed
+ * concurrency and reports throughput and latency percentiles per scenario,
+ * together with the gateway's own /metrics snapshot.
+ *
+ *   npm run bench -- --duration 10 --concurrency 16 --latency 50
+ *   npm run bench -- --out bench/results.json
+ *   npm run bench -- --baseline bench/results.json --max-regression 0.15
+ *
+ * Flags:
+ *   --scenarios solve,gh-to-json,json-to-gh   which traffic to replay (default all)
+ *   --duration <s>          seconds per scenario (default 10), after --warmup <s> (default 2)
+ *   --concurrency <n>       in-flight client requests (default 16)
+ *   --latency <ms>          mock Compute solve latency (default 50), --jitter <ms> (default 10)
+ *   --workers <n>           mock Compute workers (default 1), --mock-concurrency <n> solves each (default 4)
+ *   --meshes <n>, --mesh-kb <kb>   geometry returned per solve (default 4 x 64 KB)
+ *   --distinct <n>          distinct solve inputs, i.e. how many solves can miss the cache (default 50)
+ *   --cache-mb <mb>         gateway SOLVE_CACHE_MAX_MB (default 256, 0 disables the cache)
+ *   --frames                request binary solve frames instead of JSON
+ *   --gh-parser compute     parse gh-to-json on (mock) Compute instead of natively
+ *   --graph-nodes <n>       nodes in the json-to-gh graph (default 50)
+ *   --out <file>            write results as JSON
+ *   --baseline <file>       compare with earlier results; exit 1 if throughput drops or
+ *                           p99 latency grows by more than --max-regression (default 0.1)
+ *   --verbose               show gateway output
+ */
+
+const __dirname = path.dirname(fileURLToPath(import.meta.url));
+const GATEWAY_DIR = path.resolve(__dirname, '..');
+const SCRIPTS_DIR = path.join(GATEWAY_DIR, 'src/scripts');
+
+const ALL_SCENARIOS = ['solve', 'gh-to-json', 'json-to-gh'];
+
+const flags = parseFlags(process.argv.slice(2));
+const options = {
+  scenarios: String(flags.scenarios || ALL_SCENARIOS.join(',')).split(',').map((name) => name.trim()),
+  duration: flags.duration ?? 10,
+  warmup: flags.warmup ?? 2,
+  concurrency: flags.concurrency ?? 16,
+  latencyMs: flags.latency ?? 50,
+  jitterMs: flags.jitter ?? 10,
+  workers: flags.workers ?? 1,
+  mockConcurrency: flags.mockConcurrency ?? 4,
+  meshes: flags.meshes ?? 4,
+  meshKb: flags.meshKb ?? 64,
+  distinct: flags.distinct ?? 50,
+  cacheMb: flags.cacheMb ?? 256,
+  frames: flags.frames === 'true',
+  ghParser: flags.ghParser || 'native',
+  graphNodes: flags.graphNodes ?? 50,
+  out: flags.out || null,
+  baseline: flags.baseline || null,
+  maxRegression: flags.maxRegression ?? 0.1,
+  verbose: flags.verbose === 'true',
+};
+
+const unknown = options.scenarios.filter((name) => !ALL_SCENARIOS.includes(name));
+if (unknown.length > 0) {
+  console.error(`Unknown scenario(s): ${unknown.join(', ')} (expected ${ALL_SCENARIOS.join(', ')})`);
+  process.exit(2);
+}
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+function freePort() {
+  return new Promise((resolve, reject) => {
+    const server = net.createServer();
+    server.once('error', reject);
+    server.listen(0, '127.0.0.1', () => {
+      const { port } = server.address();
+      server.close(() => resolve(port));
+    });
+  });
+}
+
+async function startGateway(computeUrls) {
+  const port = await freePort();
+  const child = spawn(process.execPath, ['src/index.js'], {
+    cwd: GATEWAY_DIR,
+    env: {
+      ...process.env,
+      PORT: String(port),
+      RHINO_COMPUTE_URL: '',
+      RHINO_COMPUTE_URLS: computeUrls.join(','),
+      SOLVE_CACHE_MAX_MB: String(options.cacheMb),
+      SOLVE_CACHE_DIR: '',
+      GH_PARSER: options.ghParser,
+      LOG_SAMPLE_RATE: process.env.LOG_SAMPLE_RATE ?? '0',
+    },
+    stdio: options.verbose ? 'inherit' : 'ignore',
+  });
+
+  const url = `http://127.0.0.1:${port}`;
+  const deadline = Date.now() + 15000;
+  while (Date.now() < deadline) {
+    if (child.exitCode !== null) {
+      throw new Error(`Gateway exited with code ${child.exitCode} (run npm install first; --verbose shows its output)`);
+    }
+    try {
+      const response = await fetch(`${url}/health/alive`);
+      if (response.ok) {
+        return { url, child };
+      }
+    } catch (err) {
+      // Not listening yet
+    }
+    await sleep(100);
+  }
+  child.kill();
+  throw new Error('Gateway did not become ready within 15s');
+}
+
+function buildGraph(nodeCount) {
+  const nodes = Array.from({ length: nodeCount }, (_, i) => ({
+    id: i + 1,
+    type: i % 2 ? 'Addition' : 'Number Slider',
+    guid: i % 2 ? 'a0d62394-a118-422d-abb3-6af115c75b25' : '57da07bd-ecab-415d-9d86-af36d7073abc',
+    x: (i % 10) * 200,
+    y: Math.floor(i / 10) * 120,
+    properties: i % 2 ? {} : { Value: i, Min: 0, Max: 100 },
+  }));
+  const links = nodes.slice(1).map((node, i) => ({
+    fromNode: nodes[i].id,
+    fromParam: i % 2 ? 'R' : 'N',
+    toNode: node.id,
+    toParam: 'A',
+  }));
+  return { nodes, links };
+}
+
+/**
+ * Request factories per scenario; `i` is the request sequence number
+ */
+async function buildScenarios() {
+  const solveAlgo = (await fs.readFile(path.join(SCRIPTS_DIR, 'test-script-geometry.gh'))).toString('base64');
+  const ghFileBase64 = (await fs.readFile(path.join(SCRIPTS_DIR, 'ScriptValidationTests.gh'))).toString('base64');
+  const graph = JSON.stringify(buildGraph(options.graphNodes));
+
+  return {
+    solve: (i) => ({
+      path: '/grasshopper/solve',
+      headers: options.frames ? { Accept: 'application/x-gh-solve-frames' } : {},
+      body: JSON.stringify({
+        algo: solveAlgo,
+        fileName: 'test-script-geometry.gh',
+        values: [{
+          ParamName: 'Number',
+          InnerTree: { '{0}': [{ type: 'System.Double', data: String(i % options.distinct) }] },
+        }],
+      }),
+    }),
+    'gh-to-json': () => ({
+      path: '/gh-to-json',
+      headers: {},
+      body: JSON.stringify({ ghFileBase64, fileName: 'ScriptValidationTests.gh' }),
+    }),
+    'json-to-gh': () => ({
+      path: '/json-to-gh',
+      headers: {},
+      body: graph,
+    }),
+  };
+}
+
+function percentile(sorted, q) {
+  if (sorted.length === 0) return 0;
+  return sorted[Math.min(sorted.length - 1, Math.floor(q * sorted.length))];
+}
+
+/**
+ * Run a closed-loop load: `concurrency` clients each send the next request as soon
+ * as the previous one completes
+ */
+async function runScenario(gatewayUrl, buildRequest, seconds, record) {
+  const latencies = [];
+  let sequence = 0;
+  let errors = 0;
+  let bytes = 0;
+  const statuses = {};
+  const started = performance.now();
+  const endAt = started + seconds * 1000;
+
+  const client = async () => {
+    while (performance.now() < endAt) {
+      const { path: requestPath, headers, body } = buildRequest(sequence++);
+      const requestStarted = performance.now();
+      try {
+        const response = await fetch(`${gatewayUrl}${requestPath}`, {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json', ...headers },
+          body,
+        });
+        const payload = await response.arrayBuffer();
+        statuses[response.status] = (statuses[response.status] || 0) + 1;
+        bytes += payload.byteLength;
+        if (!response.ok) errors += 1;
+      } catch (err) {
+        errors += 1;
+        statuses.failed = (statuses.failed || 0) + 1;
+      }
+      latencies.push(performance.now() - requestStarted);
+    }
+  };
+
+  await Promise.all(Array.from({ length: options.concurrency }, client));
+  if (!record) {
+    return null;
+  }
+
+  const elapsedSeconds = (performance.now() - started) / 1000;
+  latencies.sort((a, b) => a - b);
+  const round = (value) => Math.round(value * 100) / 100;
+  return {
+    requests: latencies.length,
+    errors,
+    statuses,
+    rps: round(latencies.length / elapsedSeconds),
+    bytesPerRequest: latencies.length ? Math.round(bytes / latencies.length) : 0,
+    latencyMs: {
+      mean: round(latencies.reduce((sum, value) => sum + value, 0) / (latencies.length || 1)),
+      p50: round(percentile(latencies, 0.5)),
+      p90: round(percentile(latencies, 0.9)),
+      p99: round(percentile(latencies, 0.99)),
+      max: round(latencies[latencies.length - 1] || 0),
+    },
+  };
+}
+
+function compareWithBaseline(results, baseline) {
+  const failures = [];
+  Object.entries(results.scenarios).forEach(([name, current]) => {
+    const previous = baseline.scenarios?.[name];
+    if (!previous) return;
+    if (current.rps < previous.rps * (1 - options.maxRegression)) {
+      failures.push(`${name}: throughput ${current.rps} req/s vs baseline ${previous.rps} req/s`);
+    }
+    if (current.latencyMs.p99 > previous.latencyMs.p99 * (1 + options.maxRegression)) {
+      failures.push(`${name}: p99 ${current.latencyMs.p99} ms vs baseline ${previous.latencyMs.p99} ms`);
+    }
+  });
+  return failures;
+}
+
+async function main() {
+  const mocks = await Promise.all(Array.from({ length: options.workers }, () => startMockCompute({
+    latencyMs: options.latencyMs,
+    jitterMs: options.jitterMs,
+    concurrency: options.mockConcurrency,
+    meshes: options.meshes,
+    meshKb: options.meshKb,
+  })));
+
+  let gateway = null;
+  const cleanup = async () => {
+    gateway?.child.kill();
+    await Promise.all(mocks.map((mock) => mock.close()));
+  };
+  process.once('SIGINT', () => cleanup().then(() => process.exit(130)));
+
+  try {
+    gateway = await startGateway(mocks.map((mock) => mock.url));
+    const scenarios = await buildScenarios();
+    console.log(`[bench] gateway ${gateway.url}, ${mocks.length} mock Compute worker(s) at ${options.latencyMs}±${options.jitterMs} ms`);
+
+    const results = {
+      createdAt: new Date().toISOString(),
+      node: process.version,
+      options: { ...options, out: undefined, baseline: undefined, verbose: undefined },
+      scenarios: {},
+    };
+
+    for (const name of options.scenarios) {
+      if (options.warmup > 0) {
+        await runScenario(gateway.url, scenarios[name], options.warmup, false);
+      }
+      const result = await runScenario(gateway.url, scenarios[name], options.duration, true);
+      results.scenarios[name] = result;
+      console.log(
+        `[bench] ${name.padEnd(10)} ${String(result.rps).padStart(8)} req/s  ` +
+        `p50 ${result.latencyMs.p50} ms  p90 ${result.latencyMs.p90} ms  p99 ${result.latencyMs.p99} ms  ` +
+        `errors ${result.errors}/${result.requests}  ${result.bytesPerRequest} B/resp`
+      );
+    }
+
+    const metricsResponse = await fetch(`${gateway.url}/metrics`, { headers: { Accept: 'application/json' } });
+    results.gatewayMetrics = await metricsResponse.json();
+    results.mockCompute = mocks.map((mock) => ({ url: mock.url, ...mock.stats }));
+    const { solveCache, upstreamQueueWaitMs } = results.gatewayMetrics;
+    console.log(
+      `[bench] solve cache hit rate ${(solveCache.hitRate * 100).toFixed(1)}%, ` +
+      `upstream queue wait p99 ${upstreamQueueWaitMs.p99} ms, ` +
+      `mock solves ${results.mockCompute.reduce((sum, mock) => sum + mock.solves, 0)}`
+    );
+
+    if (options.out) {
+      await fs.writeFile(options.out, `${JSON.stringify(results, null, 2)}\n`);
+      console.log(`[bench] results written to ${options.out}`);
+    }
+
+    if (options.baseline) {
+      const baseline = JSON.parse(await fs.readFile(options.baseline, 'utf8'));
+      const failures = compareWithBaseline(results, baseline);
+      if (failures.length > 0) {
+        console.error(`[bench] regression beyond ${options.maxRegression * 100}%:\n  ${failures.join('\n  ')}`);
+        process.exitCode = 1;
+      } else {
+        console.log(`[bench] within ${options.maxRegression * 100}% of baseline ${options.baseline}`);
+      }
+    }
+  } finally {
+    await cleanup();
+  }
+}
+
+main().catch((err) => {
+  console.error('[bench] failed:', err.message);
+  process.exit(1);
+});
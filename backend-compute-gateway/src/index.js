@@ -5,19 +5,26 @@ import express from 'express';
 import cors from 'cors';
 import morgan from 'morgan';
 import healthRouter from './routes/health.js';
+import metricsRouter from './routes/metrics.js';
 import grasshopperRouter from './routes/grasshopper.js';
 import ghToJsonRouter from './routes/ghToJson.js';
 import jsonToGhRouter from './routes/jsonToGh.js';
 import testScriptRouter from './routes/testScript.js';
 import versionRouter from './routes/version.js';
+import { loadDefinitions } from './services/definitionRegistry.js';
+import { metricsMiddleware } from './services/metrics.js';
 
 const app = express();
 
-app.use(cors());
+// Record latency and payload sizes for every request (served at /metrics)
+app.use(metricsMiddleware());
+// Expose gateway diagnostic headers so the browser client can read them
+app.use(cors({ exposedHeaders: ['X-Cache', 'X-Cache-Key', 'X-Cache-Tier', 'X-GH-Parser'] }));
 app.use(express.json({ limit: '10mb' }));
 app.use(morgan('dev'));
 
 app.use('/health', healthRouter);
+app.use('/metrics', metricsRouter);
 app.use('/gh-to-json', ghToJsonRouter);
 app.use('/json-to-gh', jsonToGhRouter);
 app.use('/test-script', testScriptRouter);
@@ -25,7 +32,14 @@ app.use('/grasshopper', grasshopperRouter);
 app.use('/version', versionRouter);
 
 app.use((err, req, res, next) => {
+  // The client disconnected and its queued Compute call was dropped; nobody is listening
+  if (res.destroyed) {
+    return;
+  }
   console.error('[Error]', err);
+  if (err.retryAfter) {
+    res.setHeader('Retry-After', String(err.retryAfter));
+  }
   res.status(err.status || 500).json({
     error: {
       message: err.message || 'Internal server error',
@@ -35,6 +49,13 @@ app.use((err, req, res, next) => {
 
 const PORT = process.env.PORT || 4001;
 
+// Read and hash the bundled scripts once; they are uploaded to Compute on first use
+try {
+  await loadDefinitions();
+} catch (err) {
+  console.error('[definitions] Failed to load bundled scripts:', err.message);
+}
+
 app.listen(PORT, () => {
   console.log(`backend-compute-gateway listening on port ${PORT}`);
 });
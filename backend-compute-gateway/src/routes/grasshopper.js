@@ -1,16 +1,11 @@
 import { Router } from 'express';
-import axios from 'axios';
+import { bindAffinity, clientAbortSignal, computeRequest, isComputeConfigured } from '../services/computeClient.js';
+import { buildSolveKey, definitionKey, getSolveCache, isSolveCacheEnabled, solveHasErrors } from '../services/solveCache.js';
+import { sendSolveFrames, wantsSolveFrames } from '../services/solveFrames.js';
+import { createLogger, summarizeValues } from '../services/logger.js';
 
 const router = Router();
-
-function buildHeaders(extra = {}) {
-  const { RHINO_COMPUTE_KEY } = process.env;
-  const headers = { ...extra };
-  if (RHINO_COMPUTE_KEY) {
-    headers['Authorization'] = `Bearer ${RHINO_COMPUTE_KEY}`;
-  }
-  return headers;
-}
+const log = createLogger('grasshopper');
 
 /**
  * POST /grasshopper/upload
@@ -30,9 +25,7 @@ function buildHeaders(extra = {}) {
  * }
  */
 router.post('/upload', async (req, res, next) => {
-  const { RHINO_COMPUTE_URL } = process.env;
-  
-  if (!RHINO_COMPUTE_URL) {
+  if (!isComputeConfigured()) {
     return res.status(500).json({ 
       error: { message: 'RHINO_COMPUTE_URL is not configured on the backend.' } 
     });
@@ -47,23 +40,18 @@ router.post('/upload', async (req, res, next) => {
   }
 
   try {
-    const computeBaseUrl = RHINO_COMPUTE_URL.replace(/\/$/, '');
-    
     // Convert base64 to buffer
     const ghBuffer = Buffer.from(ghFileBase64, 'base64');
     
     // Upload to /io endpoint
-    const uploadUrl = `${computeBaseUrl}/io`;
-    console.log(`[grasshopper] Uploading ${fileName} to ${uploadUrl}`);
-    
-    const uploadResponse = await axios.post(uploadUrl, ghBuffer, {
-      headers: buildHeaders({ 
-        'Content-Type': 'application/octet-stream'
-      }),
-      validateStatus: () => true,
+    const uploadResponse = await computeRequest({
+      path: '/io',
+      data: ghBuffer,
+      headers: { 'Content-Type': 'application/octet-stream' },
+      signal: clientAbortSignal(res),
     });
     
-    console.log(`[grasshopper] Upload response status: ${uploadResponse.status}`);
+    log.sample('upload', { fileName, bytes: ghBuffer.length, status: uploadResponse.status, worker: uploadResponse.worker });
     
     if (uploadResponse.status !== 200 && uploadResponse.status !== 201) {
       return res.status(uploadResponse.status).json({
@@ -74,11 +62,15 @@ router.post('/upload', async (req, res, next) => {
       });
     }
     
-    // The response should contain the pointer
+    // The response should contain the pointer; later solves with it are routed to this worker
+    const pointer = uploadResponse.data?.pointer ?? uploadResponse.data?.Pointer;
+    if (pointer) {
+      bindAffinity(definitionKey({ pointer }), uploadResponse.worker);
+    }
     return res.status(uploadResponse.status).json(uploadResponse.data);
     
   } catch (err) {
-    console.error('[grasshopper] Upload error:', err.message);
+    log.error('upload failed', { fileName, error: err.message });
     next(err);
   }
 });
@@ -105,11 +97,19 @@ router.post('/upload', async (req, res, next) => {
  *   values: [...],
  *   cachesolve: true
  * }
+ *
+ * Successful results are cached by the gateway, keyed by the definition plus
+ * the normalized input values and tolerances. The X-Cache response header is
+ * HIT, MISS, COALESCED (shared an in-flight upstream call) or BYPASS
+ * (cachesolve: false).
+ *
+ * Clients that send `Accept: application/x-gh-solve-frames` receive successful
+ * results as length-prefixed binary frames (one per output branch, geometry as
+ * raw OpenNURBS bytes), gzip/brotli compressed per Accept-Encoding. See
+ * services/solveFrames.js for the layout.
  */
 router.post('/solve', async (req, res, next) => {
-  const { RHINO_COMPUTE_URL } = process.env;
-  
-  if (!RHINO_COMPUTE_URL) {
+  if (!isComputeConfigured()) {
     return res.status(500).json({ 
       error: { message: 'RHINO_COMPUTE_URL is not configured on the backend.' } 
     });
@@ -135,8 +135,6 @@ router.post('/solve', async (req, res, next) => {
   }
 
   try {
-    const computeBaseUrl = RHINO_COMPUTE_URL.replace(/\/$/, '');
-    
     // Build the solve request
     const solvePayload = {
       absolutetolerance,
@@ -152,34 +150,81 @@ router.post('/solve', async (req, res, next) => {
       errors: []
     };
     
-    // Send solve request to /grasshopper endpoint
-    const solveUrl = `${computeBaseUrl}/grasshopper`;
-    if (pointer) {
-      console.log(`[grasshopper] Solving with pointer ${pointer} at ${solveUrl}`);
+    // Log a summary only: algo can be several MB of base64
+    log.sample('solve request', {
+      fileName,
+      pointer: pointer || undefined,
+      algoChars: algo ? algo.length : undefined,
+      params: summarizeValues(values),
+    });
+    
+    const definition = definitionKey({ algo, pointer });
+
+    // signal is only passed when this request owns the upstream call: a cached
+    // solve may be shared by coalesced requests that are still waiting for it
+    const callCompute = async (signal) => {
+      // Keep the upstream body as raw bytes so it can be cached and relayed without re-serializing
+      // Pointers only resolve on the worker they were uploaded to; algo solves just prefer
+      // the worker that has the definition warm
+      const solveResponse = await computeRequest({
+        path: '/grasshopper',
+        data: solvePayload,
+        headers: { 'Content-Type': 'application/json' },
+        responseType: 'arraybuffer',
+        affinityKey: definition,
+        strictAffinity: Boolean(pointer),
+        signal,
+      });
+
+      const body = Buffer.from(solveResponse.data);
+      if (solveResponse.status >= 400) {
+        log.error('solve failed upstream', {
+          status: solveResponse.status,
+          worker: solveResponse.worker,
+          body: body.toString('utf8', 0, 2000),
+        });
+      }
+      return {
+        status: solveResponse.status,
+        body,
+        contentType: solveResponse.headers['content-type'],
+        cacheable: solveResponse.status === 200 && !solveHasErrors(body),
+      };
+    };
+
+    // Identical solves (same definition, inputs and tolerances) are served from the
+    // gateway cache, and concurrent duplicates share one upstream call
+    let result;
+    if (cachesolve !== false && isSolveCacheEnabled()) {
+      const cacheKey = buildSolveKey({ definition, values, absolutetolerance, angletolerance, modelunits, dataversion });
+      result = await getSolveCache().wrap(cacheKey, () => callCompute());
+      res.setHeader('X-Cache-Key', cacheKey);
+      if (result.tier) {
+        res.setHeader('X-Cache-Tier', result.tier);
+      }
     } else {
-      console.log(`[grasshopper] Solving ${fileName} with base64 algo at ${solveUrl}`);
-      console.log(`[grasshopper] algo length: ${algo?.length || 0} chars`);
+      result = { ...(await callCompute(clientAbortSignal(res))), cache: 'BYPASS' };
     }
-    console.log(`[grasshopper] Parameters:`, values.map(v => v.ParamName).join(', ') || 'none');
-    console.log(`[grasshopper] Payload keys:`, Object.keys(solvePayload));
-    console.log(`[grasshopper] Full payload:`, JSON.stringify(solvePayload, null, 2));
-    
-    const solveResponse = await axios.post(solveUrl, solvePayload, {
-      headers: buildHeaders({ 'Content-Type': 'application/json' }),
-      validateStatus: () => true,
-      timeout: 60000, // 60 second timeout
+    res.setHeader('X-Cache', result.cache);
+    log.sample('solve response', {
+      status: result.status,
+      cache: result.cache,
+      bytes: result.body.length,
+      frames: wantsSolveFrames(req),
     });
-    
-    console.log(`[grasshopper] Solve response status: ${solveResponse.status}`);
-    if (solveResponse.status >= 400) {
-      console.error(`[grasshopper] Error response:`, JSON.stringify(solveResponse.data, null, 2));
+
+    if (result.status === 200 && wantsSolveFrames(req)) {
+      return await sendSolveFrames(req, res, result.body);
     }
-    
+
     // Return the solve results
-    return res.status(solveResponse.status).json(solveResponse.data);
+    return res
+      .status(result.status)
+      .type(result.contentType || 'application/json')
+      .send(result.body);
     
   } catch (err) {
-    console.error('[grasshopper] Solve error:', err.message);
+    log.error('solve failed', { fileName, error: err.message });
     next(err);
   }
 });
@@ -0,0 +1,78 @@
+import { Router } from 'express';
+import { getComputeClient } from '../services/computeClient.js';
+import { getMetricsSnapshot, renderPrometheus } from '../services/metrics.js';
+import { getSolveCache } from '../services/solveCache.js';
+
+const router = Router();
+
+function computeSnapshot() {
+  const snapshot = getComputeClient().snapshot();
+  return {
+    ...snapshot,
+    active: snapshot.workers.reduce((sum, worker) => sum + worker.active, 0),
+    queueDepth: snapshot.workers.reduce((sum, worker) => sum + worker.queued, 0),
+  };
+}
+
+function solveCacheSnapshot() {
+  const snapshot = getSolveCache().snapshot();
+  const lookups = snapshot.hits + snapshot.misses + snapshot.coalesced;
+  return {
+    ...snapshot,
+    hitRate: lookups ? snapshot.hits / lookups : 0,
+    // Coalesced requests shared an in-flight call, so they also skipped Compute
+    savedRate: lookups ? (snapshot.hits + snapshot.coalesced) / lookups : 0,
+  };
+}
+
+/**
+ * GET /metrics
+ *
+ * Per-route and per-upstream latency / payload-size histograms, Compute worker
+ * queue depth and solve cache hit rates. JSON by default; Prometheus text
+ * exposition when the client prefers text/plain (as Prometheus scrapers do).
+ */
+router.get('/', (req, res) => {
+  const compute = computeSnapshot();
+  const solveCache = solveCacheSnapshot();
+
+  if (req.accepts(['application/json', 'text/plain']) === 'text/plain') {
+    const metrics = {
+      gateway_compute_active: {
+        help: 'Compute requests in flight per worker',
+        values: compute.workers.map((worker) => [{ worker: worker.url }, worker.active]),
+      },
+      gateway_compute_queue_depth: {
+        help: 'Compute requests waiting for a worker slot',
+        values: compute.workers.map((worker) => [{ worker: worker.url }, worker.queued]),
+      },
+      gateway_compute_rejected_total: {
+        help: 'Requests rejected with 503 because every worker queue was full or the queue wait timed out',
+        type: 'counter',
+        values: [[{}, compute.rejected]],
+      },
+      gateway_solve_cache_lookups_total: {
+        help: 'Solve cache lookups by result',
+        type: 'counter',
+        values: ['hits', 'diskHits', 'misses', 'coalesced'].map((result) => [{ result }, solveCache[result]]),
+      },
+      gateway_solve_cache_hit_ratio: {
+        help: 'Share of solve cache lookups served from the cache',
+        values: [[{}, solveCache.hitRate]],
+      },
+      gateway_solve_cache_bytes: {
+        help: 'Bytes held by the in-memory solve cache',
+        values: [[{}, solveCache.bytes]],
+      },
+    };
+    return res.type('text/plain; version=0.0.4').send(renderPrometheus(metrics));
+  }
+
+  return res.json({
+    ...getMetricsSnapshot(),
+    compute,
+    solveCache,
+  });
+});
+
+export default router;
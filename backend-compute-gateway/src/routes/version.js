@@ -1,30 +1,27 @@
 import { Router } from 'express';
-import axios from 'axios';
+import { computeRequest, isComputeConfigured } from '../services/computeClient.js';
+import { createLogger } from '../services/logger.js';
 
 const router = Router();
+const log = createLogger('version');
 
 router.get('/', async (req, res, next) => {
-  const { RHINO_COMPUTE_URL } = process.env;
-  const computeBaseUrl = RHINO_COMPUTE_URL ? RHINO_COMPUTE_URL.replace(/\/$/, '') : '';
-  
-  if (!computeBaseUrl) {
-    console.warn('[backend-compute-gateway] RHINO_COMPUTE_URL is not configured');
+  if (!isComputeConfigured()) {
+    log.warn('RHINO_COMPUTE_URL is not configured');
     return res.status(500).json({ error: { message: 'RHINO_COMPUTE_URL is not configured on the backend.' } });
   }
 
   try {
-    const targetUrl = `${computeBaseUrl}/version`;
-    console.log(`[backend-compute-gateway] forwarding /version to ${targetUrl}`);
-    const response = await axios.get(targetUrl, {
-      headers: {},
-      validateStatus: () => true,
+    const response = await computeRequest({
+      method: 'get',
+      path: '/version',
       timeout: 10000, // 10 second timeout for version check
     });
-    console.log(`[backend-compute-gateway] version response ${response.status}`, response.data);
+    log.sample('forwarded', { worker: response.worker, status: response.status });
 
     return res.status(response.status).json(response.data);
   } catch (err) {
-    console.error('[backend-compute-gateway] version error:', err.message);
+    log.error('failed', { error: err.message });
     next(err);
   }
 });
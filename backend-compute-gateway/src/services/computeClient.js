@@ -0,0 +1,441 @@
+import axios from 'axios';
+import http from 'http';
+import https from 'https';
+import { createLogger } from './logger.js';
+import { recordUpstream, startTimer } from './metrics.js';
+
+const log = createLogger('compute-client');
+
+/**
+ * Pooled client for one or more Rhino Compute workers
+ *
+ * Each worker gets its own keep-alive connection pool, a concurrency cap and
+ * a bounded wait queue. Requests go to the worker with the fewest outstanding
+ * requests; requests carrying an affinity key (a definition pointer or hash)
+ * stick to workers that have already seen it so Compute's caches stay warm.
+ * When every eligible queue is full, or a request waits in a queue longer than
+ * the queue timeout, it is rejected with 503 and a Retry-After hint instead of
+ * piling up. A strict-affinity request (a pointer) whose bound workers are all
+ * unhealthy fails with ComputeAffinityError instead: only those workers know the
+ * pointer, so the definition has to be uploaded again. Queued requests whose signal aborts (the client went away) leave
+ * the queue without ever reaching Compute.
+ *
+ * Environment:
+ * - RHINO_COMPUTE_URLS – comma-separated worker base URLs (falls back to RHINO_COMPUTE_URL)
+ * - COMPUTE_WORKER_CONCURRENCY – in-flight requests per worker (default 4)
+ * - COMPUTE_WORKER_QUEUE – queued requests per worker before rejecting (default 32)
+ * - COMPUTE_QUEUE_TIMEOUT_MS – longest wait for a worker slot before rejecting (default 30000)
+ * - COMPUTE_TIMEOUT_MS – upstream request timeout (default 60000)
+ * - COMPUTE_AFFINITY_KEYS – affinity keys remembered, least recently used dropped first (default 10000)
+ */
+
+const UNHEALTHY_COOLDOWN_MS = 5000;
+const CONNECTION_ERRORS = new Set(['ECONNREFUSED', 'ECONNRESET', 'EHOSTUNREACH', 'ENOTFOUND', 'ETIMEDOUT']);
+
+export class ComputeBusyError extends Error {
+  constructor(message, retryAfter) {
+    super(message);
+    this.name = 'ComputeBusyError';
+    this.status = 503;
+    this.retryAfter = retryAfter;
+  }
+}
+
+/**
+ * A pointer request whose bound workers are all unhealthy; retrying won't help,
+ * the definition must be uploaded again
+ */
+export class ComputeAffinityError extends Error {
+  constructor(message) {
+    super(message);
+    this.name = 'ComputeAffinityError';
+    this.status = 404;
+  }
+}
+
+/**
+ * Body sizes for metrics; axios keeps the serialized request body in config.data
+ */
+function requestSize(data, config) {
+  const body = Buffer.isBuffer(data) ? data : config?.data;
+  if (Buffer.isBuffer(body)) return body.length;
+  return typeof body === 'string' ? Buffer.byteLength(body) : null;
+}
+
+function responseSize(response) {
+  const length = Number(response.headers?.['content-length']);
+  if (Number.isFinite(length)) return length;
+  return response.data?.byteLength ?? null;
+}
+
+function abortError(signal) {
+  if (signal.reason instanceof Error) {
+    return signal.reason;
+  }
+  const err = new Error('Compute request aborted');
+  err.name = 'AbortError';
+  return err;
+}
+
+function buildHeaders(extra = {}) {
+  const { RHINO_COMPUTE_KEY } = process.env;
+  const headers = { ...extra };
+  if (RHINO_COMPUTE_KEY) {
+    headers['Authorization'] = `Bearer ${RHINO_COMPUTE_KEY}`;
+  }
+  return headers;
+}
+
+class Worker {
+  constructor(baseUrl, { concurrency, maxQueue }) {
+    this.baseUrl = baseUrl.replace(/\/$/, '');
+    this.concurrency = concurrency;
+    this.maxQueue = maxQueue;
+    this.active = 0;
+    this.queue = [];
+    this.unhealthyUntil = 0;
+    this.stats = { requests: 0, errors: 0 };
+
+    const agentOptions = { keepAlive: true, maxSockets: concurrency, maxFreeSockets: concurrency };
+    this.httpAgent = new http.Agent(agentOptions);
+    this.httpsAgent = new https.Agent(agentOptions);
+  }
+
+  get outstanding() {
+    return this.active + this.queue.length;
+  }
+
+  get hasRoom() {
+    return this.active < this.concurrency || this.queue.length < this.maxQueue;
+  }
+
+  get healthy() {
+    return Date.now() >= this.unhealthyUntil;
+  }
+
+  /**
+   * Wait for a request slot
+   *
+   * @param {Object} options
+   * @param {number} options.timeout - Longest queue wait in ms before rejecting with ComputeBusyError (0 = none)
+   * @param {number} options.retryAfter - Retry-After seconds for that error
+   * @param {AbortSignal} options.signal - Leave the queue when aborted
+   */
+  acquire({ timeout = 0, retryAfter, signal } = {}) {
+    if (signal?.aborted) {
+      return Promise.reject(abortError(signal));
+    }
+    if (this.active < this.concurrency) {
+      this.active += 1;
+      return Promise.resolve();
+    }
+    return new Promise((resolve, reject) => {
+      let timer = null;
+      const cleanup = () => {
+        clearTimeout(timer);
+        signal?.removeEventListener('abort', onAbort);
+      };
+      const waiter = () => {
+        cleanup();
+        resolve();
+      };
+      const drop = (err) => {
+        const index = this.queue.indexOf(waiter);
+        if (index !== -1) {
+          this.queue.splice(index, 1);
+        }
+        cleanup();
+        reject(err);
+      };
+      const onAbort = () => drop(abortError(signal));
+
+      if (timeout > 0) {
+        timer = setTimeout(() => drop(new ComputeBusyError(
+          `Timed out after ${timeout}ms waiting for a Rhino Compute worker, try again shortly`,
+          retryAfter,
+        )), timeout);
+      }
+      signal?.addEventListener('abort', onAbort, { once: true });
+      this.queue.push(waiter);
+    });
+  }
+
+  release() {
+    const next = this.queue.shift();
+    if (next) {
+      // The slot passes straight to the next waiter
+      next();
+    } else {
+      this.active -= 1;
+    }
+  }
+}
+
+class ComputeClient {
+  constructor(urls, options) {
+    this.workers = urls.map((url) => new Worker(url, options));
+    this.timeout = options.timeout;
+    this.queueTimeout = options.queueTimeout;
+    this.maxAffinityKeys = options.maxAffinityKeys;
+    this.rejected = 0;
+    // affinity key -> Set of workers known to hold that definition, in least recently used order
+    this.affinity = new Map();
+  }
+
+  /**
+   * Pick the least-loaded worker, preferring those bound to the affinity key
+   * (or requiring them, with strictAffinity, once the key is known)
+   * @returns {Worker|null} null when every eligible worker queue is full
+   * @throws {ComputeAffinityError} strictAffinity and every bound worker is unhealthy
+   */
+  _selectWorker(affinityKey, strictAffinity) {
+    const leastLoaded = (workers) => workers
+      .filter((worker) => worker.hasRoom)
+      .reduce((best, worker) => (!best || worker.outstanding < best.outstanding ? worker : best), null);
+
+    const healthy = this.workers.filter((worker) => worker.healthy);
+    const candidates = healthy.length > 0 ? healthy : this.workers;
+
+    const bound = affinityKey ? this._touchAffinity(affinityKey) : null;
+    if (bound && bound.size > 0) {
+      const boundCandidates = candidates.filter((worker) => bound.has(worker));
+      if (strictAffinity && boundCandidates.length === 0) {
+        throw new ComputeAffinityError(
+          'The Rhino Compute worker holding this definition is unavailable; upload the definition again'
+        );
+      }
+      const preferred = leastLoaded(boundCandidates);
+      if (preferred || strictAffinity) {
+        return preferred;
+      }
+    }
+    return leastLoaded(candidates);
+  }
+
+  _retryAfterSeconds() {
+    // Rough estimate: one timeout window spread over the available slots
+    const slots = this.workers.reduce((sum, worker) => sum + worker.concurrency, 0);
+    return Math.max(1, Math.ceil(this.timeout / 1000 / Math.max(1, slots)));
+  }
+
+  /**
+   * Look up an affinity key and mark it most recently used
+   */
+  _touchAffinity(affinityKey) {
+    const bound = this.affinity.get(affinityKey);
+    if (bound) {
+      this.affinity.delete(affinityKey);
+      this.affinity.set(affinityKey, bound);
+    }
+    return bound ?? null;
+  }
+
+  bind(affinityKey, worker) {
+    if (typeof worker === 'string') {
+      worker = this.workers.find((w) => w.baseUrl === worker);
+    }
+    if (!affinityKey || !worker) {
+      return;
+    }
+    const bound = this._touchAffinity(affinityKey) ?? new Set();
+    bound.add(worker);
+    this.affinity.set(affinityKey, bound);
+
+    // Keys are per definition (and per uploaded pointer), so drop the least recently used
+    while (this.affinity.size > this.maxAffinityKeys) {
+      this.affinity.delete(this.affinity.keys().next().value);
+    }
+  }
+
+  unbind(affinityKey, workerUrl) {
+    const worker = this.workers.find((w) => w.baseUrl === workerUrl);
+    const bound = this.affinity.get(affinityKey);
+    bound?.delete(worker);
+    if (bound?.size === 0) {
+      this.affinity.delete(affinityKey);
+    }
+  }
+
+  _forgetWorker(worker) {
+    for (const [affinityKey, bound] of this.affinity) {
+      bound.delete(worker);
+      if (bound.size === 0) {
+        this.affinity.delete(affinityKey);
+      }
+    }
+  }
+
+  /**
+   * Send a request to a Compute worker
+   *
+   * @param {Object} options
+   * @param {string} options.method - HTTP method (default "post")
+   * @param {string} options.path - Compute endpoint path, e.g. "/grasshopper"
+   * @param {*} options.data - Request body
+   * @param {Object} options.headers - Extra headers (auth is added automatically)
+   * @param {string} options.responseType - axios responseType
+   * @param {number} options.timeout - Override the default timeout
+   * @param {string} options.affinityKey - Pointer or definition hash to keep on the same worker
+   * @param {boolean} options.strictAffinity - Only use workers bound to affinityKey (e.g. pointers, which
+   *   other workers cannot resolve); unknown keys may still go to any worker
+   * @param {AbortSignal} options.signal - Abort the request, or drop it from the worker queue if still waiting
+   * @returns {Promise<import('axios').AxiosResponse>} Response with `worker` set to the worker base URL
+   */
+  async request({
+    method = 'post',
+    path,
+    data,
+    headers = {},
+    responseType,
+    timeout,
+    affinityKey = null,
+    strictAffinity = false,
+    signal,
+  }) {
+    const worker = this._selectWorker(affinityKey, strictAffinity);
+    if (!worker) {
+      this.rejected += 1;
+      throw new ComputeBusyError('All Rhino Compute workers are busy, try again shortly', this._retryAfterSeconds());
+    }
+
+    const queueTimer = startTimer();
+    try {
+      await worker.acquire({ timeout: this.queueTimeout, retryAfter: this._retryAfterSeconds(), signal });
+    } catch (err) {
+      if (err instanceof ComputeBusyError) {
+        this.rejected += 1;
+      }
+      throw err;
+    }
+    const queueWaitMs = queueTimer();
+    const upstreamTimer = startTimer();
+    worker.stats.requests += 1;
+    try {
+      const response = await axios.request({
+        method,
+        url: `${worker.baseUrl}${path}`,
+        data,
+        headers: buildHeaders(headers),
+        responseType,
+        validateStatus: () => true,
+        timeout: timeout ?? this.timeout,
+        httpAgent: worker.httpAgent,
+        httpsAgent: worker.httpsAgent,
+        maxBodyLength: Infinity,
+        maxContentLength: Infinity,
+        signal,
+      });
+      recordUpstream({
+        worker: worker.baseUrl,
+        path,
+        durationMs: upstreamTimer(),
+        queueWaitMs,
+        status: response.status,
+        requestBytes: requestSize(data, response.config),
+        responseBytes: responseSize(response),
+      });
+      if (response.status < 400) {
+        this.bind(affinityKey, worker);
+      }
+      response.worker = worker.baseUrl;
+      return response;
+    } catch (err) {
+      recordUpstream({
+        worker: worker.baseUrl,
+        path,
+        durationMs: upstreamTimer(),
+        queueWaitMs,
+        requestBytes: requestSize(data),
+        error: true,
+      });
+      worker.stats.errors += 1;
+      if (CONNECTION_ERRORS.has(err.code)) {
+        worker.unhealthyUntil = Date.now() + UNHEALTHY_COOLDOWN_MS;
+        // The worker may have restarted and lost its uploaded definitions
+        this._forgetWorker(worker);
+      }
+      throw err;
+    } finally {
+      worker.release();
+    }
+  }
+
+  snapshot() {
+    const workers = this.workers.map((worker) => ({
+      url: worker.baseUrl,
+      active: worker.active,
+      queued: worker.queue.length,
+      concurrency: worker.concurrency,
+      maxQueue: worker.maxQueue,
+      healthy: worker.healthy,
+      ...worker.stats,
+    }));
+    return { workers, rejected: this.rejected, affinityKeys: this.affinity.size };
+  }
+}
+
+let computeClient = null;
+let computeClientUrls = null;
+
+export function getComputeUrls() {
+  const { RHINO_COMPUTE_URLS, RHINO_COMPUTE_URL } = process.env;
+  return (RHINO_COMPUTE_URLS || RHINO_COMPUTE_URL || '')
+    .split(',')
+    .map((url) => url.trim())
+    .filter(Boolean);
+}
+
+export function isComputeConfigured() {
+  return getComputeUrls().length > 0;
+}
+
+/**
+ * Lazily create the shared client so .env values are loaded before it is configured
+ */
+export function getComputeClient() {
+  const urls = getComputeUrls();
+  if (computeClient === null || computeClientUrls !== urls.join(',')) {
+    computeClient = new ComputeClient(urls, {
+      concurrency: Number(process.env.COMPUTE_WORKER_CONCURRENCY || 4),
+      maxQueue: Number(process.env.COMPUTE_WORKER_QUEUE || 32),
+      timeout: Number(process.env.COMPUTE_TIMEOUT_MS || 60000),
+      queueTimeout: Number(process.env.COMPUTE_QUEUE_TIMEOUT_MS || 30000),
+      maxAffinityKeys: Number(process.env.COMPUTE_AFFINITY_KEYS || 10000),
+    });
+    computeClientUrls = urls.join(',');
+    log.info('configured', { workers: urls });
+  }
+  return computeClient;
+}
+
+/**
+ * AbortSignal that fires when the client disconnects before its response is sent,
+ * so queued Compute calls made on its behalf are dropped
+ */
+export function clientAbortSignal(res) {
+  const controller = new AbortController();
+  res.on('close', () => {
+    if (!res.writableFinished) {
+      controller.abort();
+    }
+  });
+  return controller.signal;
+}
+
+export function computeRequest(options) {
+  return getComputeClient().request(options);
+}
+
+/**
+ * Record that a worker holds a definition (e.g. after an /io upload returned its pointer)
+ */
+export function bindAffinity(affinityKey, workerUrl) {
+  getComputeClient().bind(affinityKey, workerUrl);
+}
+
+/**
+ * Forget that a worker holds a definition (e.g. its pointer stopped resolving)
+ */
+export function unbindAffinity(affinityKey, workerUrl) {
+  getComputeClient().unbind(affinityKey, workerUrl);
+}
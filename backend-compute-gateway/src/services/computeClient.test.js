@@ -0,0 +1,86 @@
+import assert from 'node:assert/strict';
+import { after, before, test } from 'node:test';
+import { startMockCompute } from '../../bench/mockCompute.js';
+import { ComputeAffinityError, ComputeBusyError, getComputeClient } from './computeClient.js';
+
+let mock;
+
+before(async () => {
+  mock = await startMockCompute({ latencyMs: 150, jitterMs: 0, meshes: 1, meshKb: 1 });
+  process.env.RHINO_COMPUTE_URL = mock.url;
+  delete process.env.RHINO_COMPUTE_URLS;
+  process.env.COMPUTE_WORKER_CONCURRENCY = '1';
+  process.env.COMPUTE_QUEUE_TIMEOUT_MS = '50';
+  process.env.COMPUTE_AFFINITY_KEYS = '2';
+});
+
+after(() => mock.close());
+
+const solve = (client, options = {}) => client.request({
+  path: '/grasshopper',
+  data: { algo: 'abc', values: [] },
+  headers: { 'Content-Type': 'application/json' },
+  ...options,
+});
+
+test('a request that waits longer than the queue timeout is rejected as busy', async () => {
+  const client = getComputeClient();
+  const rejectedBefore = client.rejected;
+
+  const first = solve(client);
+  await assert.rejects(solve(client), (err) => err instanceof ComputeBusyError && err.status === 503 && err.retryAfter > 0);
+  assert.equal((await first).status, 200);
+  assert.equal(client.rejected, rejectedBefore + 1);
+  assert.equal(client.workers[0].queue.length, 0);
+});
+
+test('an aborted request leaves the queue without reaching Compute', async () => {
+  const client = getComputeClient();
+  const solvesBefore = mock.stats.solves;
+  const controller = new AbortController();
+
+  const first = solve(client, { timeout: 1000 });
+  const queued = solve(client, { signal: controller.signal });
+  assert.equal(client.workers[0].queue.length, 1);
+  controller.abort();
+
+  await assert.rejects(queued, { name: 'AbortError' });
+  assert.equal(client.workers[0].queue.length, 0);
+  await first;
+  assert.equal(mock.stats.solves, solvesBefore + 1);
+  assert.equal(client.workers[0].active, 0);
+});
+
+test('affinity keys are capped, dropping the least recently used', () => {
+  const client = getComputeClient();
+  client.bind('a', mock.url);
+  client.bind('b', mock.url);
+  client._selectWorker('a', false); // a is now most recently used
+  client.bind('c', mock.url);
+
+  assert.deepEqual([...client.affinity.keys()], ['a', 'c']);
+
+  client.unbind('a', mock.url);
+  assert.deepEqual([...client.affinity.keys()], ['c']);
+});
+
+test('a pointer whose workers are all unhealthy fails without a Retry-After', async () => {
+  const deadUrl = 'http://127.0.0.1:9';
+  process.env.RHINO_COMPUTE_URLS = `${mock.url},${deadUrl}`;
+  try {
+    const client = getComputeClient();
+    const dead = client.workers.find((worker) => worker.baseUrl === deadUrl);
+    client.bind('pointer:p', deadUrl);
+    dead.unhealthyUntil = Date.now() + 60000;
+
+    await assert.rejects(
+      solve(client, { affinityKey: 'pointer:p', strictAffinity: true }),
+      (err) => err instanceof ComputeAffinityError && err.status === 404 && err.retryAfter === undefined
+    );
+    // Without strict affinity the request goes to a healthy worker
+    const response = await solve(client, { affinityKey: 'pointer:p' });
+    assert.equal(response.worker, mock.url);
+  } finally {
+    delete process.env.RHINO_COMPUTE_URLS;
+  }
+});
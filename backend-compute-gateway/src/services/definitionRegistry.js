@@ -0,0 +1,205 @@
+import crypto from 'crypto';
+import fs from 'fs/promises';
+import path from 'path';
+import { fileURLToPath } from 'url';
+import { ComputeAffinityError, bindAffinity, computeRequest, unbindAffinity } from './computeClient.js';
+import { createLogger } from './logger.js';
+import { definitionKey } from './solveCache.js';
+
+const log = createLogger('definitions');
+
+const __filename = fileURLToPath(import.meta.url);
+const __dirname = path.dirname(__filename);
+
+const SCRIPTS_DIR = path.resolve(__dirname, '../scripts');
+
+/**
+ * Bundled definitions from src/scripts/, keyed by file name
+ * { buffer, algo, hash, pointer, uploading }
+ */
+const definitions = new Map();
+
+/**
+ * Read and hash every bundled .gh script once, at startup
+ */
+export async function loadDefinitions(scriptsDir = SCRIPTS_DIR) {
+  const files = (await fs.readdir(scriptsDir)).filter((file) => file.toLowerCase().endsWith('.gh'));
+
+  for (const file of files) {
+    const buffer = await fs.readFile(path.join(scriptsDir, file));
+    definitions.set(file, {
+      buffer,
+      algo: buffer.toString('base64'),
+      hash: crypto.createHash('sha256').update(buffer).digest('hex'),
+      pointer: null,
+      uploading: null,
+    });
+    log.info('loaded', { file, bytes: buffer.length });
+  }
+
+  return listDefinitions();
+}
+
+export function listDefinitions() {
+  return [...definitions.entries()].map(([name, def]) => ({
+    name,
+    bytes: def.buffer.length,
+    hash: def.hash,
+    pointer: def.pointer,
+  }));
+}
+
+export function getDefinition(name) {
+  const definition = definitions.get(name);
+  if (!definition) {
+    const err = new Error(`${name} is not registered (expected at backend-compute-gateway/src/scripts/)`);
+    err.code = 'ENOENT';
+    throw err;
+  }
+  return definition;
+}
+
+/**
+ * Upload a definition to Compute's /io endpoint (same flow as /grasshopper/upload)
+ * and remember the returned pointer. Concurrent callers share one upload.
+ */
+async function uploadDefinition(name) {
+  const definition = getDefinition(name);
+  if (definition.pointer) {
+    return definition.pointer;
+  }
+  if (!definition.uploading) {
+    definition.uploading = (async () => {
+      log.info('uploading to /io', { name });
+
+      const uploadResponse = await computeRequest({
+        path: '/io',
+        data: definition.buffer,
+        headers: { 'Content-Type': 'application/octet-stream' },
+      });
+
+      const pointer = uploadResponse.data?.pointer ?? uploadResponse.data?.Pointer ?? null;
+      if ((uploadResponse.status !== 200 && uploadResponse.status !== 201) || !pointer) {
+        throw new Error(`Upload of ${name} failed with status ${uploadResponse.status}`);
+      }
+
+      definition.pointer = pointer;
+      bindAffinity(definitionKey({ pointer }), uploadResponse.worker);
+      log.info('registered', { name, pointer, worker: uploadResponse.worker });
+      return pointer;
+    })().finally(() => {
+      definition.uploading = null;
+    });
+  }
+  return definition.uploading;
+}
+
+function buildSolvePayload(name, { algo = null, pointer = null }, values, options) {
+  return {
+    absolutetolerance: 0.01,
+    angletolerance: 1.0,
+    modelunits: 'Meters',
+    dataversion: 7,
+    cachesolve: true,
+    ...options,
+    algo,
+    filename: name,
+    pointer,
+    values,
+    warnings: [],
+    errors: [],
+  };
+}
+
+// Compute's errors when a pointer is not in its definition cache (e.g. after a restart)
+const UNKNOWN_DEFINITION_PATTERN = /unable to (load|find) (grasshopper|cached) definition|definition not found|pointer not found/i;
+
+/**
+ * True when a failed solve means the worker no longer knows the pointer, as
+ * opposed to the definition itself failing (bad inputs, script errors)
+ */
+export function isUnknownDefinitionResponse(response) {
+  if (response.status === 404) {
+    return true;
+  }
+  if (response.status < 400) {
+    return false;
+  }
+  const { data } = response;
+  let text;
+  if (typeof data === 'string') {
+    text = data;
+  } else if (Buffer.isBuffer(data) || data instanceof ArrayBuffer) {
+    text = Buffer.from(data).toString('utf8');
+  } else {
+    text = JSON.stringify(data ?? '');
+  }
+  return UNKNOWN_DEFINITION_PATTERN.test(text);
+}
+
+async function postSolve(payload, signal) {
+  // Pointers only resolve on the workers they were uploaded to; if those are
+  // down, ComputeAffinityError tells solveDefinition to re-upload
+  return computeRequest({
+    path: '/grasshopper',
+    data: payload,
+    headers: { 'Content-Type': 'application/json' },
+    affinityKey: definitionKey(payload),
+    strictAffinity: Boolean(payload.pointer),
+    signal,
+  });
+}
+
+/**
+ * Solve a bundled definition by pointer instead of shipping the base64 algo
+ *
+ * If the worker no longer knows the pointer (e.g. it restarted), or every worker
+ * holding it is unhealthy, the definition is re-uploaded and the solve retried once. Other failures are returned as-is. If /io is unavailable the solve falls
+ * back to sending the in-memory base64 algo.
+ *
+ * @param {string} name - Script file name in src/scripts/ (e.g. "compute-gh-to-json.gh")
+ * @param {Array} values - Grasshopper input values
+ * @param {Object} options - Overrides for tolerances, units, cachesolve, dataversion
+ * @param {AbortSignal} options.signal - Drop the solve if the caller goes away (not sent to Compute)
+ * @returns {Promise<import('axios').AxiosResponse>} Compute /grasshopper response
+ */
+export async function solveDefinition(name, values = [], { signal, ...options } = {}) {
+  const definition = getDefinition(name);
+
+  let pointer;
+  try {
+    pointer = await uploadDefinition(name);
+  } catch (err) {
+    log.warn('upload failed, sending base64 algo', { name, error: err.message });
+    return postSolve(buildSolvePayload(name, { algo: definition.algo }, values, options), signal);
+  }
+
+  let response;
+  try {
+    response = await postSolve(buildSolvePayload(name, { pointer }, values, options), signal);
+  } catch (err) {
+    if (!(err instanceof ComputeAffinityError)) {
+      throw err;
+    }
+    log.warn('pointer only held by unhealthy workers, re-uploading', { name, pointer });
+  }
+  if (response && !isUnknownDefinitionResponse(response)) {
+    return response;
+  }
+
+  // Compute loses uploaded definitions on restart; drop the stale pointer and retry once
+  if (response) {
+    log.warn('pointer unknown to worker, re-uploading', { name, pointer, worker: response.worker, status: response.status });
+    unbindAffinity(definitionKey({ pointer }), response.worker);
+  }
+  if (definition.pointer === pointer) {
+    definition.pointer = null;
+  }
+  try {
+    pointer = await uploadDefinition(name);
+  } catch (err) {
+    log.warn('upload failed, sending base64 algo', { name, error: err.message });
+    return postSolve(buildSolvePayload(name, { algo: definition.algo }, values, options), signal);
+  }
+  return postSolve(buildSolvePayload(name, { pointer }, values, options), signal);
+}
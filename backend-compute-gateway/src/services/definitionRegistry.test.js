@@ -0,0 +1,79 @@
+import assert from 'node:assert/strict';
+import { after, before, test } from 'node:test';
+import { startMockCompute } from '../../bench/mockCompute.js';
+import { getComputeClient } from './computeClient.js';
+import { isUnknownDefinitionResponse, listDefinitions, loadDefinitions, solveDefinition } from './definitionRegistry.js';
+import { definitionKey } from './solveCache.js';
+
+let mock;
+
+before(async () => {
+  mock = await startMockCompute({ latencyMs: 0, jitterMs: 0 });
+  process.env.RHINO_COMPUTE_URL = mock.url;
+  process.env.RHINO_COMPUTE_URLS = '';
+  await loadDefinitions();
+});
+
+after(() => mock.close());
+
+test('unknown pointers are told apart from script failures', () => {
+  assert.equal(isUnknownDefinitionResponse({ status: 404, data: '' }), true);
+  assert.equal(isUnknownDefinitionResponse({ status: 500, data: 'Unable to load grasshopper definition' }), true);
+  assert.equal(isUnknownDefinitionResponse({ status: 500, data: { message: 'Unable to find cached definition md5_1' } }), true);
+  assert.equal(isUnknownDefinitionResponse({ status: 500, data: { message: 'Solution exception: bad input' } }), false);
+  assert.equal(isUnknownDefinitionResponse({ status: 200, data: {} }), false);
+});
+
+test('scripts are uploaded once and then solved by pointer', async () => {
+  const uploads = mock.stats.uploads;
+  const first = await solveDefinition('test-script.gh');
+  const second = await solveDefinition('test-script.gh');
+  assert.equal(first.status, 200);
+  assert.equal(second.status, 200);
+  assert.equal(mock.stats.uploads - uploads, 1);
+});
+
+test('a forgotten pointer is re-uploaded and the solve retried', async () => {
+  await solveDefinition('test-script.gh');
+  mock.forget();
+  const uploads = mock.stats.uploads;
+  const response = await solveDefinition('test-script.gh');
+  assert.equal(response.status, 200);
+  assert.equal(mock.stats.uploads - uploads, 1);
+});
+
+test('script failures are returned without re-uploading', async () => {
+  await solveDefinition('test-script.gh');
+  const uploads = mock.stats.uploads;
+  mock.config.failSolves = true;
+  try {
+    const response = await solveDefinition('test-script.gh');
+    assert.equal(response.status, 500);
+    assert.equal(mock.stats.uploads, uploads);
+  } finally {
+    mock.config.failSolves = false;
+  }
+});
+
+test('a pointer held only by an unhealthy worker is re-uploaded straight away', async () => {
+  const second = await startMockCompute({ latencyMs: 0, jitterMs: 0 });
+  process.env.RHINO_COMPUTE_URLS = `${mock.url},${second.url}`;
+  try {
+    await solveDefinition('test-script.gh');
+    const { pointer } = listDefinitions().find((definition) => definition.name === 'test-script.gh');
+    const [holder] = getComputeClient().affinity.get(definitionKey({ pointer }));
+    holder.unhealthyUntil = Date.now() + 60000;
+
+    const uploads = mock.stats.uploads + second.stats.uploads;
+    const solves = mock.stats.solves + second.stats.solves;
+    const response = await solveDefinition('test-script.gh');
+    assert.equal(response.status, 200);
+    assert.notEqual(response.worker, holder.baseUrl);
+    assert.equal(mock.stats.uploads + second.stats.uploads - uploads, 1);
+    // No wasted solve against a worker that doesn't know the pointer
+    assert.equal(mock.stats.solves + second.stats.solves - solves, 1);
+  } finally {
+    process.env.RHINO_COMPUTE_URLS = '';
+    await second.close();
+  }
+});
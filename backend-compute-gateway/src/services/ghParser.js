@@ -0,0 +1,384 @@
+import { Readable } from 'stream';
+import zlib from 'zlib';
+
+/**
+ * Native reader for Grasshopper .gh files
+ *
+ * A .gh file is a raw-deflated GH_IO binary archive: a tree of chunks, each
+ * written as
+ *   name (7-bit length prefixed UTF-8), index (int32, -1 = none),
+ *   item count (int32), chunk count (int32), items..., chunks...
+ * and each item as name, index, type code (int32) and a type-specific value.
+ *
+ * The archive is inflated as a stream and parsing stops once the root
+ * "Definition" chunk has been read, so trailing data such as the thumbnail
+ * bitmap is never decompressed into memory.
+ */
+
+const MAX_INFLATED_BYTES = 256 * 1024 * 1024;
+
+// GH_IO item type codes -> fixed-size little-endian layouts
+const FIXED_TYPES = {
+  1: { size: 1, read: (b, o) => b.readUInt8(o) !== 0 }, // bool
+  2: { size: 1, read: (b, o) => b.readUInt8(o) }, // byte
+  3: { size: 4, read: (b, o) => b.readInt32LE(o) }, // int32
+  4: { size: 8, read: (b, o) => Number(b.readBigInt64LE(o)) }, // int64
+  5: { size: 4, read: (b, o) => b.readFloatLE(o) }, // single
+  6: { size: 8, read: (b, o) => b.readDoubleLE(o) }, // double
+  7: { size: 16, read: (b, o) => b.subarray(o, o + 16).toString('hex') }, // decimal (kept opaque)
+  8: { size: 8, read: (b, o) => Number(b.readBigInt64LE(o)) }, // date (ticks)
+  9: { size: 16, read: (b, o) => readGuid(b, o) }, // guid
+  30: { size: 8, read: (b, o) => ({ x: b.readInt32LE(o), y: b.readInt32LE(o + 4) }) }, // point
+  31: { size: 8, read: (b, o) => ({ x: b.readFloatLE(o), y: b.readFloatLE(o + 4) }) }, // pointf
+  32: { size: 8, read: (b, o) => ({ width: b.readInt32LE(o), height: b.readInt32LE(o + 4) }) }, // size
+  33: { size: 8, read: (b, o) => ({ width: b.readFloatLE(o), height: b.readFloatLE(o + 4) }) }, // sizef
+  34: { size: 16, read: (b, o) => readRect(b, o, 'readInt32LE', 4) }, // rectangle
+  35: { size: 16, read: (b, o) => readRect(b, o, 'readFloatLE', 4) }, // rectanglef
+  36: { size: 4, read: (b, o) => ({ a: b[o], r: b[o + 1], g: b[o + 2], b: b[o + 3] }) }, // color
+  50: { size: 16, read: (b, o) => readDoubles(b, o, 2) }, // point2d
+  51: { size: 24, read: (b, o) => readDoubles(b, o, 3) }, // point3d
+  52: { size: 32, read: (b, o) => readDoubles(b, o, 4) }, // point4d
+  60: { size: 16, read: (b, o) => readDoubles(b, o, 2) }, // interval1d
+  61: { size: 32, read: (b, o) => readDoubles(b, o, 4) }, // interval2d
+  70: { size: 48, read: (b, o) => readDoubles(b, o, 6) }, // line
+  71: { size: 48, read: (b, o) => readDoubles(b, o, 6) }, // boundingbox
+  72: { size: 72, read: (b, o) => readDoubles(b, o, 9) }, // plane
+  80: { size: 12, read: (b, o) => [b.readInt32LE(o), b.readInt32LE(o + 4), b.readInt32LE(o + 8)] }, // version
+};
+
+const TYPE_STRING = 10;
+const TYPE_BYTEARRAY = 20;
+const TYPE_DOUBLEARRAY = 21;
+const TYPE_BITMAP = 37;
+
+function readGuid(b, o) {
+  // .NET Guid byte order: first three groups little-endian
+  const hex = (start, end, reverse) => {
+    const bytes = [...b.subarray(o + start, o + end)];
+    return (reverse ? bytes.reverse() : bytes).map((x) => x.toString(16).padStart(2, '0')).join('');
+  };
+  return `${hex(0, 4, true)}-${hex(4, 6, true)}-${hex(6, 8, true)}-${hex(8, 10)}-${hex(10, 16)}`;
+}
+
+function readRect(b, o, method, step) {
+  return { x: b[method](o), y: b[method](o + step), width: b[method](o + 2 * step), height: b[method](o + 3 * step) };
+}
+
+function readDoubles(b, o, count) {
+  const values = [];
+  for (let i = 0; i < count; i++) {
+    values.push(b.readDoubleLE(o + i * 8));
+  }
+  return values;
+}
+
+/**
+ * Pull-based byte reader over an async iterable of Buffers
+ */
+class StreamReader {
+  constructor(iterable, maxBytes) {
+    this.iterator = iterable[Symbol.asyncIterator]();
+    this.buffer = Buffer.alloc(0);
+    this.offset = 0;
+    this.consumed = 0;
+    this.maxBytes = maxBytes;
+  }
+
+  async _fill(n) {
+    while (this.buffer.length - this.offset < n) {
+      const { value, done } = await this.iterator.next();
+      if (done) {
+        throw new Error('Unexpected end of Grasshopper archive');
+      }
+      this.consumed += value.length;
+      if (this.consumed > this.maxBytes) {
+        throw new Error(`Grasshopper archive exceeds ${this.maxBytes} bytes when inflated`);
+      }
+      this.buffer = this.buffer.length === this.offset
+        ? value
+        : Buffer.concat([this.buffer.subarray(this.offset), value]);
+      this.offset = 0;
+    }
+  }
+
+  async read(n) {
+    if (this.buffer.length - this.offset < n) {
+      await this._fill(n);
+    }
+    const start = this.offset;
+    this.offset += n;
+    return this.buffer.subarray(start, this.offset);
+  }
+
+  /** Discard n bytes without holding them all in memory at once */
+  async skip(n) {
+    let remaining = n;
+    while (remaining > 0) {
+      if (this.buffer.length === this.offset) {
+        await this._fill(1);
+      }
+      const step = Math.min(remaining, this.buffer.length - this.offset);
+      this.offset += step;
+      remaining -= step;
+    }
+  }
+
+  async int32() {
+    return (await this.read(4)).readInt32LE(0);
+  }
+
+  /** .NET BinaryWriter string: 7-bit encoded byte length, then UTF-8 */
+  async string() {
+    let length = 0;
+    let shift = 0;
+    let byte;
+    do {
+      byte = (await this.read(1))[0];
+      length |= (byte & 0x7f) << shift;
+      shift += 7;
+    } while (byte & 0x80);
+    return length === 0 ? '' : (await this.read(length)).toString('utf8');
+  }
+
+  async close() {
+    if (this.iterator.return) {
+      await this.iterator.return();
+    }
+  }
+}
+
+async function readItem(reader) {
+  const name = await reader.string();
+  const index = await reader.int32();
+  const type = await reader.int32();
+
+  let value;
+  const fixed = FIXED_TYPES[type];
+  if (fixed) {
+    value = fixed.read(await reader.read(fixed.size), 0);
+  } else if (type === TYPE_STRING) {
+    value = await reader.string();
+  } else if (type === TYPE_BYTEARRAY || type === TYPE_BITMAP) {
+    // Embedded blobs (bitmaps, nested archives) are not needed for the graph
+    const length = await reader.int32();
+    await reader.skip(length);
+    value = { length };
+  } else if (type === TYPE_DOUBLEARRAY) {
+    const count = await reader.int32();
+    value = readDoubles(await reader.read(count * 8), 0, count);
+  } else {
+    throw new Error(`Unsupported GH_IO item type ${type} for "${name}"`);
+  }
+
+  return { name, index, type, value };
+}
+
+async function readChunk(reader, { stopAfter = null } = {}) {
+  const name = await reader.string();
+  const index = await reader.int32();
+  const itemCount = await reader.int32();
+  const chunkCount = await reader.int32();
+
+  const chunk = { name, index, items: [], chunks: [] };
+  for (let i = 0; i < itemCount; i++) {
+    chunk.items.push(await readItem(reader));
+  }
+  for (let i = 0; i < chunkCount; i++) {
+    const child = await readChunk(reader);
+    chunk.chunks.push(child);
+    if (stopAfter && child.name === stopAfter) {
+      break;
+    }
+  }
+  return chunk;
+}
+
+/**
+ * Read a GH_IO chunk tree from a stream of raw-deflated .gh bytes
+ *
+ * @param {Readable} input - Stream of the compressed .gh file
+ * @param {Object} options
+ * @param {string|null} options.stopAfter - Stop once this root child chunk is read (default "Definition")
+ * @returns {Promise<Object>} Root chunk { name, index, items, chunks }
+ */
+export async function readGhArchive(input, { stopAfter = 'Definition', maxBytes = MAX_INFLATED_BYTES } = {}) {
+  const inflater = zlib.createInflateRaw();
+  const reader = new StreamReader(input.pipe(inflater), maxBytes);
+  input.on('error', (err) => inflater.destroy(err));
+  try {
+    return await readChunk(reader, { stopAfter });
+  } finally {
+    await reader.close();
+    input.destroy();
+  }
+}
+
+export function getItem(chunk, name, index = -1) {
+  return chunk?.items.find((item) => item.name === name && item.index === index)?.value;
+}
+
+export function getChunk(chunk, name, index = -1) {
+  return chunk?.chunks.find((child) => child.name === name && child.index === index);
+}
+
+export function getChunks(chunk, name) {
+  return (chunk?.chunks || []).filter((child) => child.name === name).sort((a, b) => a.index - b.index);
+}
+
+function getIndexedItems(chunk, name) {
+  return (chunk?.items || []).filter((item) => item.name === name).sort((a, b) => a.index - b.index).map((item) => item.value);
+}
+
+/** Shortest decimal that round-trips a float32, like .NET's float formatting */
+function toSingle(value) {
+  for (let precision = 1; precision < 10; precision++) {
+    const candidate = Number(value.toPrecision(precision));
+    if (Math.fround(candidate) === value) {
+      return candidate;
+    }
+  }
+  return value;
+}
+
+function sanitizeId(value) {
+  if (!value || !value.trim()) {
+    return 'Node';
+  }
+  return value.replace(/[^\p{L}\p{N}_-]/gu, '_');
+}
+
+function isBlank(value) {
+  return !value || !value.trim();
+}
+
+function getPivot(container) {
+  const attributes = getChunk(container, 'Attributes');
+  const pivot = getItem(attributes, 'Pivot');
+  if (pivot) {
+    return { x: toSingle(pivot.x), y: toSingle(pivot.y) };
+  }
+  // Objects that were never moved only store their bounds
+  const bounds = getItem(attributes, 'Bounds') || { x: 0, y: 0 };
+  return { x: toSingle(bounds.x), y: toSingle(bounds.y) };
+}
+
+function getParams(container, direction) {
+  // Native components nest params under ParameterData, compiled ones use param_input/param_output
+  const parameterData = getChunk(container, 'ParameterData');
+  if (parameterData) {
+    return getChunks(parameterData, direction === 'input' ? 'InputParam' : 'OutputParam');
+  }
+  return getChunks(container, direction === 'input' ? 'param_input' : 'param_output');
+}
+
+/**
+ * Convert a GH_IO chunk tree into the { nodes, links } graph produced by
+ * compute-gh-to-json.gh (ids from sanitized nicknames, links by param index,
+ * slider Min/Max/Value and panel Text as properties)
+ */
+export function archiveToGraph(root) {
+  const definitionObjects = getChunk(getChunk(root, 'Definition'), 'DefinitionObjects');
+  if (!definitionObjects) {
+    throw new Error('Archive has no Definition/DefinitionObjects chunk');
+  }
+
+  const entries = [];
+  const idCounts = new Map();
+
+  for (const object of getChunks(definitionObjects, 'Object')) {
+    const container = getChunk(object, 'Container');
+    const inputs = getParams(container, 'input');
+    const outputs = getParams(container, 'output');
+    const isComponent = Boolean(getChunk(container, 'ParameterData')) || inputs.length > 0 || outputs.length > 0;
+    const isParam = !isComponent && getItem(container, 'SourceCount') !== undefined;
+
+    // Ignore groups, scribbles, etc.
+    if (!container || (!isComponent && !isParam)) {
+      continue;
+    }
+
+    const name = getItem(container, 'Name') ?? getItem(object, 'Name') ?? '';
+    const nickname = getItem(container, 'NickName') ?? '';
+    const baseId = sanitizeId(!isBlank(nickname) ? nickname : (!isBlank(name) ? name : 'Node'));
+    const count = idCounts.get(baseId) || 0;
+    idCounts.set(baseId, count + 1);
+
+    entries.push({
+      id: count === 0 ? baseId : `${baseId}_${count + 1}`,
+      object,
+      container,
+      inputs,
+      outputs,
+      isComponent,
+      nickname,
+    });
+  }
+
+  // Source guid -> { node id, output param id }
+  const sources = new Map();
+  for (const entry of entries) {
+    if (entry.isComponent) {
+      entry.outputs.forEach((output, index) => {
+        sources.set(getItem(output, 'InstanceGuid'), { fromNode: entry.id, fromParam: String(index) });
+      });
+    } else {
+      sources.set(getItem(entry.container, 'InstanceGuid'), { fromNode: entry.id, fromParam: '0' });
+    }
+  }
+
+  const nodes = entries.map((entry) => {
+    const node = {
+      id: entry.id,
+      guid: getItem(entry.object, 'GUID') ?? getItem(entry.container, 'InstanceGuid'),
+      nickname: entry.nickname,
+      ...getPivot(entry.container),
+    };
+
+    const slider = getChunk(entry.container, 'Slider');
+    const panelText = getChunk(entry.container, 'PanelProperties') ? getItem(entry.container, 'UserText') : undefined;
+    if (slider || panelText !== undefined) {
+      node.properties = {};
+      if (slider) {
+        node.properties.Min = getItem(slider, 'Min');
+        node.properties.Max = getItem(slider, 'Max');
+        node.properties.Value = getItem(slider, 'Value');
+      }
+      if (panelText !== undefined) {
+        node.properties.Text = panelText;
+      }
+    }
+    return node;
+  });
+
+  const links = [];
+  const addLinks = (sink, toNode, toParam) => {
+    for (const sourceGuid of getIndexedItems(sink, 'Source')) {
+      const source = sources.get(sourceGuid);
+      if (source) {
+        links.push({ ...source, toNode, toParam });
+      }
+    }
+  };
+
+  // Component inputs first, then floating params with sources (same order as the Compute script)
+  for (const entry of entries.filter((e) => e.isComponent)) {
+    entry.inputs.forEach((input, index) => addLinks(input, entry.id, String(index)));
+  }
+  for (const entry of entries.filter((e) => !e.isComponent)) {
+    addLinks(entry.container, entry.id, '0');
+  }
+
+  return { nodes, links };
+}
+
+/**
+ * Parse a .gh file into the { nodes, links } graph without Rhino Compute
+ *
+ * @param {Buffer|Readable} input - Compressed .gh bytes or a stream of them
+ * @returns {Promise<{ nodes: Array, links: Array }>}
+ */
+export async function parseGhGraph(input) {
+  const stream = Buffer.isBuffer(input) ? Readable.from([input]) : input;
+  const root = await readGhArchive(stream);
+  return archiveToGraph(root);
+}
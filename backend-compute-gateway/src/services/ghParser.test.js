@@ -0,0 +1,36 @@
+import assert from 'node:assert/strict';
+import fs from 'fs';
+import path from 'path';
+import { test } from 'node:test';
+import { fileURLToPath } from 'url';
+import { parseGhGraph } from './ghParser.js';
+
+// .gh files paired with the graph JSON compute-gh-to-json.gh produces for them
+const CORPUS_DIR = path.resolve(path.dirname(fileURLToPath(import.meta.url)), '../../../gh file parser');
+
+const samples = fs.readdirSync(CORPUS_DIR)
+  .filter((file) => /^test_input_gh_.*\.gh$/.test(file))
+  .map((file) => ({ gh: file, graph: file.replace(/\.gh$/, '_graph.json') }));
+
+test('conformance corpus is present', () => {
+  assert.ok(samples.length > 0);
+});
+
+for (const sample of samples) {
+  test(`${sample.gh} parses to ${sample.graph}`, async () => {
+    const expected = JSON.parse(fs.readFileSync(path.join(CORPUS_DIR, sample.graph), 'utf8'));
+    const graph = await parseGhGraph(fs.readFileSync(path.join(CORPUS_DIR, sample.gh)));
+    assert.deepEqual(graph, expected);
+  });
+}
+
+test('streamed input parses the same as a buffer', async () => {
+  const file = path.join(CORPUS_DIR, samples[0].gh);
+  const fromBuffer = await parseGhGraph(fs.readFileSync(file));
+  const fromStream = await parseGhGraph(fs.createReadStream(file));
+  assert.deepEqual(fromStream, fromBuffer);
+});
+
+test('non-archive input is rejected', async () => {
+  await assert.rejects(parseGhGraph(Buffer.from('not a grasshopper file')));
+});
@@ -0,0 +1,67 @@
+/**
+ * Structured, sampled request logging
+ *
+ * Per-request detail goes through `sample()`, which only emits a fraction of
+ * events so busy endpoints don't pay for logging every payload. Warnings and
+ * errors are always written. Fields are summaries (sizes, counts, names), never
+ * full payloads.
+ *
+ * Environment:
+ * - LOG_SAMPLE_RATE – fraction of sampled events to emit, 0..1 (default 0.1)
+ * - LOG_FORMAT – "json" for one JSON object per line, otherwise "[scope] message key=value"
+ */
+
+const getSampleRate = () => {
+  const rate = Number(process.env.LOG_SAMPLE_RATE ?? 0.1);
+  return Number.isFinite(rate) ? Math.min(1, Math.max(0, rate)) : 0.1;
+};
+
+const formatValue = (value) => {
+  if (typeof value === 'string') {
+    return /[\s"=]/.test(value) ? JSON.stringify(value) : value;
+  }
+  return JSON.stringify(value);
+};
+
+function write(level, scope, message, fields) {
+  const sink = level === 'error' ? console.error : level === 'warn' ? console.warn : console.log;
+  if (process.env.LOG_FORMAT === 'json') {
+    sink(JSON.stringify({ time: new Date().toISOString(), level, scope, msg: message, ...fields }));
+    return;
+  }
+  const pairs = Object.entries(fields)
+    .filter(([, value]) => value !== undefined)
+    .map(([key, value]) => `${key}=${formatValue(value)}`);
+  sink(`[${scope}] ${message}${pairs.length ? ` ${pairs.join(' ')}` : ''}`);
+}
+
+/**
+ * Create a logger for one module, e.g. createLogger('grasshopper')
+ */
+export function createLogger(scope) {
+  return {
+    info: (message, fields = {}) => write('info', scope, message, fields),
+    warn: (message, fields = {}) => write('warn', scope, message, fields),
+    error: (message, fields = {}) => write('error', scope, message, fields),
+    /**
+     * Log a per-request detail event for a sampled fraction of requests
+     */
+    sample: (message, fields = {}) => {
+      const rate = getSampleRate();
+      if (rate > 0 && (rate >= 1 || Math.random() < rate)) {
+        write('info', scope, message, { ...fields, sampleRate: rate });
+      }
+    },
+  };
+}
+
+/**
+ * Summarize a Grasshopper values tree for logging: param names and item counts
+ */
+export function summarizeValues(values = []) {
+  return values.map((param) => {
+    const branches = Object.values(param.InnerTree || {});
+    const items = branches.reduce((sum, branch) => sum + (branch?.length || 0), 0);
+    return `${param.ParamName}[${branches.length}/${items}]`;
+  });
+}
@@ -0,0 +1,56 @@
+import assert from 'node:assert/strict';
+import { afterEach, beforeEach, test } from 'node:test';
+import { createLogger, summarizeValues } from './logger.js';
+
+let lines;
+const originals = { log: console.log, warn: console.warn, error: console.error };
+const savedEnv = { LOG_FORMAT: process.env.LOG_FORMAT, LOG_SAMPLE_RATE: process.env.LOG_SAMPLE_RATE };
+
+beforeEach(() => {
+  lines = [];
+  for (const level of Object.keys(originals)) {
+    console[level] = (line) => lines.push({ level, line });
+  }
+});
+
+afterEach(() => {
+  Object.assign(console, originals);
+  for (const [key, value] of Object.entries(savedEnv)) {
+    if (value === undefined) delete process.env[key];
+    else process.env[key] = value;
+  }
+});
+
+test('text format prefixes the scope and quotes values with spaces', () => {
+  delete process.env.LOG_FORMAT;
+  createLogger('grasshopper').warn('solve failed', { fileName: 'my def.gh', status: 502, skipped: undefined });
+  assert.deepEqual(lines, [{ level: 'warn', line: '[grasshopper] solve failed fileName="my def.gh" status=502' }]);
+});
+
+test('json format writes one object per line', () => {
+  process.env.LOG_FORMAT = 'json';
+  createLogger('version').error('failed', { error: 'timeout' });
+  assert.equal(lines[0].level, 'error');
+  const entry = JSON.parse(lines[0].line);
+  assert.equal(entry.scope, 'version');
+  assert.equal(entry.msg, 'failed');
+  assert.equal(entry.error, 'timeout');
+});
+
+test('sample() honours LOG_SAMPLE_RATE', () => {
+  delete process.env.LOG_FORMAT;
+  const log = createLogger('test');
+  process.env.LOG_SAMPLE_RATE = '0';
+  log.sample('dropped');
+  process.env.LOG_SAMPLE_RATE = '1';
+  log.sample('kept', { bytes: 3 });
+  assert.deepEqual(lines.map(({ line }) => line), ['[test] kept bytes=3 sampleRate=1']);
+});
+
+test('summarizeValues reports branch and item counts per param', () => {
+  const values = [
+    { ParamName: 'A', InnerTree: { '{0}': [{}, {}], '{1}': [{}] } },
+    { ParamName: 'B', InnerTree: {} },
+  ];
+  assert.deepEqual(summarizeValues(values), ['A[2/3]', 'B[0/0]']);
+});
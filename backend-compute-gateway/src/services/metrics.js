@@ -0,0 +1,266 @@
+/**
+ * In-process metrics for the gateway (served by GET /metrics)
+ *
+ * Fixed-bucket histograms keep recording O(1) per observation with a bounded
+ * memory footprint; percentiles are estimated from the buckets. Series are
+ * keyed by route (e.g. "POST /grasshopper/solve") or by upstream worker and
+ * Compute path (e.g. "http://localhost:5000 /grasshopper").
+ */
+
+// Upper bounds in milliseconds
+export const LATENCY_BUCKETS_MS = [1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000];
+
+// Upper bounds in bytes (1 KB .. 64 MB)
+export const SIZE_BUCKETS_BYTES = [1, 4, 16, 64, 256, 1024, 4096, 16384, 65536].map((kb) => kb * 1024);
+
+export class Histogram {
+  constructor(buckets) {
+    this.buckets = buckets;
+    this.counts = new Array(buckets.length + 1).fill(0); // last slot is +Inf
+    this.count = 0;
+    this.sum = 0;
+    this.max = 0;
+  }
+
+  observe(value) {
+    if (!Number.isFinite(value)) {
+      return;
+    }
+    let i = 0;
+    while (i < this.buckets.length && value > this.buckets[i]) {
+      i++;
+    }
+    this.counts[i] += 1;
+    this.count += 1;
+    this.sum += value;
+    if (value > this.max) {
+      this.max = value;
+    }
+  }
+
+  /**
+   * Estimate a quantile by interpolating inside the bucket that contains it
+   */
+  quantile(q) {
+    if (this.count === 0) {
+      return 0;
+    }
+    const rank = q * this.count;
+    let seen = 0;
+    for (let i = 0; i < this.counts.length; i++) {
+      if (this.counts[i] === 0) continue;
+      if (seen + this.counts[i] >= rank) {
+        const lower = i === 0 ? 0 : this.buckets[i - 1];
+        const upper = i < this.buckets.length ? Math.min(this.buckets[i], this.max) : this.max;
+        return lower + (upper - lower) * ((rank - seen) / this.counts[i]);
+      }
+      seen += this.counts[i];
+    }
+    return this.max;
+  }
+
+  snapshot() {
+    const round = (value) => Math.round(value * 100) / 100;
+    return {
+      count: this.count,
+      sum: round(this.sum),
+      mean: this.count ? round(this.sum / this.count) : 0,
+      p50: round(this.quantile(0.5)),
+      p90: round(this.quantile(0.9)),
+      p99: round(this.quantile(0.99)),
+      max: round(this.max),
+    };
+  }
+}
+
+/**
+ * Latency and payload-size histograms plus status counts for one series
+ */
+class SeriesStats {
+  constructor() {
+    this.latencyMs = new Histogram(LATENCY_BUCKETS_MS);
+    this.requestBytes = new Histogram(SIZE_BUCKETS_BYTES);
+    this.responseBytes = new Histogram(SIZE_BUCKETS_BYTES);
+    this.statuses = {};
+    this.errors = 0;
+  }
+
+  record({ durationMs, status = null, requestBytes = null, responseBytes = null, error = false }) {
+    this.latencyMs.observe(durationMs);
+    if (requestBytes !== null) this.requestBytes.observe(requestBytes);
+    if (responseBytes !== null) this.responseBytes.observe(responseBytes);
+    const statusClass = status ? `${String(status)[0]}xx` : 'none';
+    this.statuses[statusClass] = (this.statuses[statusClass] || 0) + 1;
+    if (error || status >= 500) {
+      this.errors += 1;
+    }
+  }
+
+  snapshot() {
+    return {
+      latencyMs: this.latencyMs.snapshot(),
+      requestBytes: this.requestBytes.snapshot(),
+      responseBytes: this.responseBytes.snapshot(),
+      statuses: { ...this.statuses },
+      errors: this.errors,
+    };
+  }
+}
+
+const startedAt = Date.now();
+const routes = new Map();
+const upstream = new Map();
+const upstreamQueueWaitMs = new Histogram(LATENCY_BUCKETS_MS);
+
+const seriesFor = (map, key) => {
+  let series = map.get(key);
+  if (!series) {
+    series = new SeriesStats();
+    map.set(key, series);
+  }
+  return series;
+};
+
+const elapsedMs = (started) => Number(process.hrtime.bigint() - started) / 1e6;
+
+/**
+ * Express middleware recording latency, status and payload sizes per route
+ *
+ * Response bytes are counted as written, so streamed and compressed responses
+ * (e.g. solve frames) report what actually went over the wire.
+ */
+export function metricsMiddleware() {
+  return (req, res, next) => {
+    const started = process.hrtime.bigint();
+    let responseBytes = 0;
+
+    const { write, end } = res;
+    res.write = function countedWrite(chunk, ...args) {
+      if (chunk) responseBytes += Buffer.byteLength(chunk);
+      return write.call(this, chunk, ...args);
+    };
+    res.end = function countedEnd(chunk, ...args) {
+      if (chunk && typeof chunk !== 'function') responseBytes += Buffer.byteLength(chunk);
+      return end.call(this, chunk, ...args);
+    };
+
+    // Label with the matched route pattern so ids in URLs don't create new series.
+    // It is captured when the router assigns req.route: by the time an error
+    // reaches the app-level handler (next(err)) req.baseUrl has been reset.
+    let route = 'unmatched';
+    let matched;
+    Object.defineProperty(req, 'route', {
+      configurable: true,
+      enumerable: true,
+      get: () => matched,
+      set: (value) => {
+        matched = value;
+        if (value) {
+          route = `${req.baseUrl}${value.path === '/' ? '' : value.path}`;
+        }
+      },
+    });
+
+    let recorded = false;
+    const record = () => {
+      if (recorded) return;
+      recorded = true;
+      const requestBytes = Number(req.get('content-length'));
+      seriesFor(routes, `${req.method} ${route || '/'}`).record({
+        durationMs: elapsedMs(started),
+        status: res.statusCode,
+        requestBytes: Number.isFinite(requestBytes) ? requestBytes : null,
+        responseBytes,
+        error: !res.writableFinished,
+      });
+    };
+    res.on('finish', record);
+    res.on('close', record);
+    next();
+  };
+}
+
+/**
+ * Record one upstream Compute call (called by the compute client)
+ * @param {Object} sample
+ * @param {string} sample.worker - Worker base URL
+ * @param {string} sample.path - Compute endpoint path
+ * @param {number} sample.durationMs - Time from dispatch to response (excludes queueing)
+ * @param {number} sample.queueWaitMs - Time spent waiting for a worker slot
+ */
+export function recordUpstream({ worker, path, durationMs, queueWaitMs = 0, status = null, requestBytes = null, responseBytes = null, error = false }) {
+  upstreamQueueWaitMs.observe(queueWaitMs);
+  seriesFor(upstream, `${worker} ${path}`).record({ durationMs, status, requestBytes, responseBytes, error });
+}
+
+export function startTimer() {
+  const started = process.hrtime.bigint();
+  return () => elapsedMs(started);
+}
+
+const snapshotMap = (map) => Object.fromEntries([...map.entries()].map(([key, series]) => [key, series.snapshot()]));
+
+export function getMetricsSnapshot() {
+  return {
+    uptimeSeconds: Math.round((Date.now() - startedAt) / 1000),
+    routes: snapshotMap(routes),
+    upstream: snapshotMap(upstream),
+    upstreamQueueWaitMs: upstreamQueueWaitMs.snapshot(),
+  };
+}
+
+const METRIC_TYPES = new Set(['gauge', 'counter']);
+
+/**
+ * Prometheus text exposition of the histograms
+ * @param {Object} metrics - Extra series as { name: { help, type, values: [[labels, value]] } };
+ *   type is 'gauge' (default) or 'counter' (monotonic, name should end in _total)
+ */
+export function renderPrometheus(metrics = {}) {
+  const lines = [];
+  const labelString = (labels) => {
+    const parts = Object.entries(labels).map(([key, value]) => `${key}="${String(value).replace(/["\\\n]/g, '\\$&')}"`);
+    return parts.length ? `{${parts.join(',')}}` : '';
+  };
+  const writeHistogram = (name, histogram, labels) => {
+    let cumulative = 0;
+    histogram.buckets.forEach((bound, i) => {
+      cumulative += histogram.counts[i];
+      lines.push(`${name}_bucket${labelString({ ...labels, le: bound })} ${cumulative}`);
+    });
+    lines.push(`${name}_bucket${labelString({ ...labels, le: '+Inf' })} ${histogram.count}`);
+    lines.push(`${name}_sum${labelString(labels)} ${histogram.sum}`);
+    lines.push(`${name}_count${labelString(labels)} ${histogram.count}`);
+  };
+  const writeSeries = (prefix, map, labelsFor) => {
+    [
+      ['duration_ms', 'latencyMs', 'Latency in milliseconds'],
+      ['request_bytes', 'requestBytes', 'Request body size in bytes'],
+      ['response_bytes', 'responseBytes', 'Response body size in bytes'],
+    ].forEach(([suffix, field, help]) => {
+      lines.push(`# HELP ${prefix}_${suffix} ${help}`, `# TYPE ${prefix}_${suffix} histogram`);
+      map.forEach((series, key) => writeHistogram(`${prefix}_${suffix}`, series[field], labelsFor(key)));
+    });
+  };
+
+  writeSeries('gateway_http', routes, (key) => {
+    const [method, route] = key.split(' ');
+    return { method, route };
+  });
+  writeSeries('gateway_upstream', upstream, (key) => {
+    const [worker, path] = key.split(' ');
+    return { worker, path };
+  });
+  lines.push('# HELP gateway_upstream_queue_wait_ms Time waiting for a Compute worker slot', '# TYPE gateway_upstream_queue_wait_ms histogram');
+  writeHistogram('gateway_upstream_queue_wait_ms', upstreamQueueWaitMs, {});
+
+  Object.entries(metrics).forEach(([name, { help, type = 'gauge', values }]) => {
+    if (!METRIC_TYPES.has(type)) {
+      throw new Error(`Unsupported metric type "${type}" for ${name}`);
+    }
+    lines.push(`# HELP ${name} ${help}`, `# TYPE ${name} ${type}`);
+    values.forEach(([labels, value]) => lines.push(`${name}${labelString(labels)} ${Number(value) || 0}`));
+  });
+
+  return `${lines.join('\n')}\n`;
+}
@@ -0,0 +1,99 @@
+import assert from 'node:assert/strict';
+import { EventEmitter } from 'events';
+import { test } from 'node:test';
+import {
+  Histogram,
+  LATENCY_BUCKETS_MS,
+  getMetricsSnapshot,
+  metricsMiddleware,
+  renderPrometheus,
+} from './metrics.js';
+
+/**
+ * Minimal Express request/response pair for metricsMiddleware
+ */
+function mockExchange(method = 'POST') {
+  const req = { method, baseUrl: '', get: () => '12' };
+  const res = new EventEmitter();
+  res.statusCode = 200;
+  res.writableFinished = false;
+  res.write = () => true;
+  res.end = () => {
+    res.writableFinished = true;
+    res.emit('finish');
+  };
+  return { req, res };
+}
+
+test('histogram quantiles are interpolated inside buckets', () => {
+  const histogram = new Histogram(LATENCY_BUCKETS_MS);
+  for (let i = 1; i <= 100; i++) {
+    histogram.observe(i);
+  }
+  histogram.observe(Number.NaN);
+
+  const snapshot = histogram.snapshot();
+  assert.equal(snapshot.count, 100);
+  assert.equal(snapshot.max, 100);
+  assert.equal(snapshot.mean, 50.5);
+  assert.ok(snapshot.p50 > 25 && snapshot.p50 <= 50, `p50 ${snapshot.p50}`);
+  assert.ok(snapshot.p99 > 50 && snapshot.p99 <= 100, `p99 ${snapshot.p99}`);
+});
+
+test('requests are labelled with the mounted route pattern and response bytes', () => {
+  const { req, res } = mockExchange();
+  metricsMiddleware()(req, res, () => {});
+
+  // What express.Router does while dispatching POST /grasshopper/solve
+  req.baseUrl = '/grasshopper';
+  req.route = { path: '/solve' };
+  res.write('abc');
+  res.end('de');
+
+  const series = getMetricsSnapshot().routes['POST /grasshopper/solve'];
+  assert.equal(series.latencyMs.count, 1);
+  assert.equal(series.requestBytes.sum, 12);
+  assert.equal(series.responseBytes.sum, 5);
+  assert.equal(series.statuses['2xx'], 1);
+});
+
+test('errors passed to next(err) keep the route they were raised on', () => {
+  const { req, res } = mockExchange('GET');
+  metricsMiddleware()(req, res, () => {});
+
+  req.baseUrl = '/version';
+  req.route = { path: '/' };
+  // The router unwinds to the app-level error handler before the response is sent
+  req.baseUrl = '';
+  res.statusCode = 500;
+  res.end('{}');
+
+  const { routes } = getMetricsSnapshot();
+  assert.equal(routes['GET /version'].errors, 1);
+  assert.equal(routes['GET /'], undefined);
+});
+
+test('unmatched requests and aborted responses are recorded once', () => {
+  const { req, res } = mockExchange('DELETE');
+  metricsMiddleware()(req, res, () => {});
+  res.emit('close');
+  res.emit('close');
+
+  const series = getMetricsSnapshot().routes['DELETE unmatched'];
+  assert.equal(series.latencyMs.count, 1);
+  assert.equal(series.errors, 1);
+});
+
+test('prometheus output declares counters and gauges', () => {
+  const text = renderPrometheus({
+    gateway_compute_rejected_total: { help: 'Rejected', type: 'counter', values: [[{}, 3]] },
+    gateway_compute_active: { help: 'Active', values: [[{ worker: 'http://a "b"' }, 2]] },
+  });
+
+  assert.match(text, /^# TYPE gateway_compute_rejected_total counter$/m);
+  assert.match(text, /^gateway_compute_rejected_total 3$/m);
+  assert.match(text, /^# TYPE gateway_compute_active gauge$/m);
+  assert.match(text, /^gateway_compute_active\{worker="http:\/\/a \\"b\\""\} 2$/m);
+  assert.match(text, /^# TYPE gateway_http_duration_ms histogram$/m);
+  assert.throws(() => renderPrometheus({ x: { help: 'x', type: 'summary', values: [] } }), /Unsupported metric type/);
+});
@@ -0,0 +1,374 @@
+import crypto from 'crypto';
+import fs from 'fs/promises';
+import path from 'path';
+import { createLogger } from './logger.js';
+
+const log = createLogger('solve-cache');
+
+const NUMERIC_TYPES = new Set(['System.Double', 'System.Single', 'System.Int32', 'System.Int64']);
+
+function sha256(value) {
+  return crypto.createHash('sha256').update(value).digest('hex');
+}
+
+/**
+ * Normalize a single InnerTree item so equivalent inputs hash the same
+ * (e.g. "5" and "5.0" for a System.Double)
+ */
+function normalizeItem(item) {
+  if (!item || typeof item !== 'object') {
+    return item;
+  }
+  let { data } = item;
+  if (NUMERIC_TYPES.has(item.type) && data !== '' && data !== null && !Number.isNaN(Number(data))) {
+    data = String(Number(data));
+  }
+  return { type: item.type ?? null, data: data ?? null };
+}
+
+/**
+ * Normalize the solve input tree: params sorted by name, branch paths sorted,
+ * item order within a branch preserved (it is significant to Grasshopper)
+ */
+export function normalizeValues(values = []) {
+  return [...values]
+    .map((param) => {
+      const innerTree = param.InnerTree || {};
+      const branches = Object.keys(innerTree)
+        .sort()
+        .map((branchPath) => [branchPath, (innerTree[branchPath] || []).map(normalizeItem)]);
+      return { ParamName: param.ParamName, InnerTree: branches };
+    })
+    .sort((a, b) => String(a.ParamName).localeCompare(String(b.ParamName)));
+}
+
+/**
+ * Identify a definition by a hash of the base64 algo, or by the Compute
+ * pointer (which is itself content-derived by Compute's /io)
+ */
+export function definitionKey({ algo = null, pointer = null }) {
+  return algo ? `algo:${sha256(algo)}` : `pointer:${pointer}`;
+}
+
+/**
+ * Build the content-addressed cache key for a solve request
+ *
+ * Pass `definition` (from definitionKey) when the caller already has it, so a
+ * multi-MB algo is only hashed once per request.
+ */
+export function buildSolveKey({
+  algo = null,
+  pointer = null,
+  definition = null,
+  values = [],
+  absolutetolerance = 0.01,
+  angletolerance = 1.0,
+  modelunits = 'Meters',
+  dataversion = 7,
+}) {
+  const payload = JSON.stringify([
+    definition ?? definitionKey({ algo, pointer }),
+    Number(absolutetolerance),
+    Number(angletolerance),
+    modelunits,
+    Number(dataversion),
+    normalizeValues(values),
+  ]);
+  return sha256(payload);
+}
+
+/**
+ * True when a Compute solve body reports errors (Compute answers 200 with an
+ * `errors` list for failed solves; those must not be cached)
+ */
+export function solveHasErrors(body) {
+  try {
+    const { errors } = JSON.parse(body.toString('utf8'));
+    return Array.isArray(errors) && errors.length > 0;
+  } catch (err) {
+    // Not a Compute JSON document; don't cache what we can't check
+    return true;
+  }
+}
+
+/**
+ * Two-tier (memory LRU + optional disk) cache for serialized solve results
+ *
+ * Entries are stored as the JSON body Buffer so hits can be sent as-is and
+ * memory accounting is exact. Concurrent lookups for the same key while the
+ * upstream call is in flight share a single promise.
+ *
+ * The disk tier has its own byte budget and LRU order (seeded from file mtimes
+ * on first use). Disk writes happen in the background so a MISS response never
+ * waits on the filesystem.
+ */
+export class SolveCache {
+  constructor({
+    maxBytes = 256 * 1024 * 1024,
+    maxEntryBytes = 32 * 1024 * 1024,
+    diskDir = null,
+    maxDiskBytes = 1024 * 1024 * 1024,
+  } = {}) {
+    this.maxBytes = maxBytes;
+    this.maxEntryBytes = maxEntryBytes;
+    this.diskDir = diskDir;
+    this.maxDiskBytes = maxDiskBytes;
+    this.entries = new Map();
+    this.inflight = new Map();
+    this.bytes = 0;
+    // key -> size of the file on disk, least recently used first
+    this.diskEntries = null;
+    this.diskIndexing = null;
+    this.diskBytes = 0;
+    // Background disk writes run one at a time, in set() order, so the disk LRU
+    // index matches insertion order and evictions never race each other
+    this.diskQueue = Promise.resolve();
+    this.stats = { hits: 0, diskHits: 0, misses: 0, coalesced: 0, evictions: 0, diskEvictions: 0 };
+  }
+
+  _touch(key, body) {
+    this.entries.delete(key);
+    this.entries.set(key, body);
+  }
+
+  _setMemory(key, body) {
+    if (body.length > this.maxEntryBytes || body.length > this.maxBytes) {
+      return;
+    }
+    const existing = this.entries.get(key);
+    if (existing) {
+      this.bytes -= existing.length;
+      this.entries.delete(key);
+    }
+    this.entries.set(key, body);
+    this.bytes += body.length;
+
+    // Map iteration order is insertion order, so the first key is least recently used
+    while (this.bytes > this.maxBytes) {
+      const [oldestKey, oldestBody] = this.entries.entries().next().value;
+      this.entries.delete(oldestKey);
+      this.bytes -= oldestBody.length;
+      this.stats.evictions += 1;
+    }
+  }
+
+  _diskPath(key) {
+    return path.join(this.diskDir, `${key}.json`);
+  }
+
+  /**
+   * Build the disk LRU index from the files already in diskDir (once)
+   */
+  _indexDisk() {
+    if (!this.diskIndexing) {
+      this.diskIndexing = (async () => {
+        const found = [];
+        try {
+          await fs.mkdir(this.diskDir, { recursive: true });
+          for (const file of await fs.readdir(this.diskDir)) {
+            if (!file.endsWith('.json')) continue;
+            try {
+              const stat = await fs.stat(path.join(this.diskDir, file));
+              found.push({ key: file.slice(0, -'.json'.length), size: stat.size, mtime: stat.mtimeMs });
+            } catch (err) {
+              // Removed while indexing
+            }
+          }
+        } catch (err) {
+          log.warn('disk index failed', { dir: this.diskDir, error: err.message });
+        }
+        found.sort((a, b) => a.mtime - b.mtime);
+        this.diskEntries = new Map(found.map(({ key, size }) => [key, size]));
+        this.diskBytes = found.reduce((sum, { size }) => sum + size, 0);
+        await this._evictDisk();
+      })();
+    }
+    return this.diskIndexing;
+  }
+
+  async _evictDisk() {
+    while (this.diskBytes > this.maxDiskBytes && this.diskEntries.size > 0) {
+      const [oldestKey, size] = this.diskEntries.entries().next().value;
+      this.diskEntries.delete(oldestKey);
+      this.diskBytes -= size;
+      this.stats.diskEvictions += 1;
+      await fs.unlink(this._diskPath(oldestKey)).catch(() => {});
+    }
+  }
+
+  async _readDisk(key) {
+    if (!this.diskDir) {
+      return null;
+    }
+    await this._indexDisk();
+    const size = this.diskEntries.get(key);
+    if (size === undefined) {
+      return null;
+    }
+    try {
+      const body = await fs.readFile(this._diskPath(key));
+      this.diskEntries.delete(key);
+      this.diskEntries.set(key, size);
+      return body;
+    } catch (err) {
+      if (err.code !== 'ENOENT') {
+        log.warn('disk read failed', { key, error: err.message });
+      }
+      this.diskEntries.delete(key);
+      this.diskBytes -= size;
+      return null;
+    }
+  }
+
+  async _writeDisk(key, body) {
+    await this._indexDisk();
+    if (this.diskEntries.has(key) || body.length > this.maxDiskBytes) {
+      return;
+    }
+    try {
+      // Write to a temp file and rename so readers never see a partial entry
+      const tmpPath = `${this._diskPath(key)}.${process.pid}.tmp`;
+      await fs.writeFile(tmpPath, body);
+      await fs.rename(tmpPath, this._diskPath(key));
+      this.diskEntries.set(key, body.length);
+      this.diskBytes += body.length;
+      await this._evictDisk();
+    } catch (err) {
+      log.warn('disk write failed', { key, error: err.message });
+    }
+  }
+
+  /**
+   * Wait for background disk writes (tests, shutdown)
+   */
+  async flush() {
+    await this.diskQueue;
+  }
+
+  /**
+   * Look up a key in memory, then on disk (promoting disk hits to memory)
+   * @returns {Promise<{ body: Buffer, tier: string } | null>}
+   */
+  async get(key) {
+    return this._getMemory(key) || this._getDisk(key);
+  }
+
+  _getMemory(key) {
+    const body = this.entries.get(key);
+    if (!body) {
+      return null;
+    }
+    this._touch(key, body);
+    this.stats.hits += 1;
+    return { body, tier: 'memory' };
+  }
+
+  async _getDisk(key) {
+    const diskBody = await this._readDisk(key);
+    if (diskBody) {
+      this._setMemory(key, diskBody);
+      this.stats.hits += 1;
+      this.stats.diskHits += 1;
+      return { body: diskBody, tier: 'disk' };
+    }
+    return null;
+  }
+
+  /**
+   * Store a result in memory now and on disk in the background
+   */
+  set(key, body) {
+    this._setMemory(key, body);
+    if (this.diskDir) {
+      this.diskQueue = this.diskQueue.then(() => this._writeDisk(key, body));
+    }
+  }
+
+  /**
+   * Return a cached result, or run `producer` once for all concurrent callers
+   *
+   * `producer` must resolve to `{ status, body, cacheable, ...extra }` where
+   * body is a Buffer. Only results flagged cacheable are stored; extra fields
+   * are passed through to the callers that shared the upstream call.
+   *
+   * The in-flight entry is registered before the first await (the disk lookup),
+   * so duplicates arriving while the disk tier is read also share the call.
+   *
+   * @returns {Promise<{ status: number, body: Buffer, cache: string }>}
+   */
+  async wrap(key, producer) {
+    const cached = this._getMemory(key);
+    if (cached) {
+      return { status: 200, body: cached.body, cache: 'HIT', tier: cached.tier };
+    }
+
+    const pending = this.inflight.get(key);
+    if (pending) {
+      this.stats.coalesced += 1;
+      const result = await pending;
+      return { ...result, cache: 'COALESCED' };
+    }
+
+    const promise = (async () => {
+      const diskHit = this.diskDir ? await this._getDisk(key) : null;
+      if (diskHit) {
+        return { status: 200, body: diskHit.body, cache: 'HIT', tier: diskHit.tier };
+      }
+      this.stats.misses += 1;
+      const result = await producer();
+      if (result.cacheable) {
+        this.set(key, result.body);
+      }
+      const { cacheable, ...response } = result;
+      return { ...response, cache: 'MISS' };
+    })();
+    this.inflight.set(key, promise);
+
+    try {
+      return await promise;
+    } finally {
+      this.inflight.delete(key);
+    }
+  }
+
+  snapshot() {
+    return {
+      entries: this.entries.size,
+      bytes: this.bytes,
+      maxBytes: this.maxBytes,
+      inflight: this.inflight.size,
+      disk: Boolean(this.diskDir),
+      diskEntries: this.diskEntries ? this.diskEntries.size : 0,
+      diskBytes: this.diskBytes,
+      maxDiskBytes: this.maxDiskBytes,
+      ...this.stats,
+    };
+  }
+}
+
+let solveCache = null;
+
+/**
+ * Lazily create the shared cache so .env values are loaded before it is configured
+ *
+ * Environment:
+ * - SOLVE_CACHE_MAX_MB – memory budget for cached results (default 256, 0 disables the cache)
+ * - SOLVE_CACHE_DIR – optional directory for the on-disk tier
+ * - SOLVE_CACHE_DISK_MAX_MB – disk tier budget (default 1024)
+ */
+export function getSolveCache() {
+  if (solveCache === null) {
+    const maxMb = Number(process.env.SOLVE_CACHE_MAX_MB ?? 256);
+    solveCache = new SolveCache({
+      maxBytes: Math.max(0, maxMb) * 1024 * 1024,
+      diskDir: process.env.SOLVE_CACHE_DIR || null,
+      maxDiskBytes: Math.max(0, Number(process.env.SOLVE_CACHE_DISK_MAX_MB ?? 1024)) * 1024 * 1024,
+    });
+    log.info('configured', { memoryMb: maxMb, diskDir: solveCache.diskDir || undefined });
+  }
+  return solveCache;
+}
+
+export function isSolveCacheEnabled() {
+  return getSolveCache().maxBytes > 0;
+}
@@ -0,0 +1,132 @@
+import assert from 'node:assert/strict';
+import fs from 'fs/promises';
+import os from 'os';
+import path from 'path';
+import { test } from 'node:test';
+import { SolveCache, buildSolveKey, definitionKey, solveHasErrors } from './solveCache.js';
+
+const body = (size, fill = 'x') => Buffer.alloc(size, fill);
+
+const number = (paramName, data) => ({
+  ParamName: paramName,
+  InnerTree: { '{0}': [{ type: 'System.Double', data }] },
+});
+
+test('equivalent solve inputs hash to the same key', () => {
+  const a = buildSolveKey({ algo: 'abc', values: [number('B', '5'), number('A', '1.0')] });
+  const b = buildSolveKey({ algo: 'abc', values: [number('A', '1'), number('B', '5.0')] });
+  const c = buildSolveKey({ algo: 'abc', values: [number('A', '1'), number('B', '6')] });
+  assert.equal(a, b);
+  assert.notEqual(a, c);
+});
+
+test('memory tier evicts least recently used entries beyond maxBytes', async () => {
+  const cache = new SolveCache({ maxBytes: 30 });
+  cache.set('a', body(10));
+  cache.set('b', body(10));
+  cache.set('c', body(10));
+  await cache.get('a'); // a is now most recently used
+  cache.set('d', body(10));
+
+  assert.equal(cache.entries.has('b'), false);
+  assert.deepEqual([...cache.entries.keys()], ['c', 'a', 'd']);
+  assert.equal(cache.bytes, 30);
+  assert.equal(cache.stats.evictions, 1);
+});
+
+test('concurrent misses share one producer call', async () => {
+  const cache = new SolveCache();
+  let calls = 0;
+  const producer = async () => {
+    calls += 1;
+    await new Promise((resolve) => setTimeout(resolve, 10));
+    return { status: 200, body: body(4), cacheable: true };
+  };
+
+  const results = await Promise.all([cache.wrap('k', producer), cache.wrap('k', producer), cache.wrap('k', producer)]);
+  assert.equal(calls, 1);
+  assert.deepEqual(results.map((result) => result.cache).sort(), ['COALESCED', 'COALESCED', 'MISS']);
+
+  const hit = await cache.wrap('k', producer);
+  assert.equal(hit.cache, 'HIT');
+  assert.equal(calls, 1);
+});
+
+test('a precomputed definition key gives the same solve key', () => {
+  const definition = definitionKey({ algo: 'abc' });
+  assert.equal(
+    buildSolveKey({ definition, values: [number('A', '1')] }),
+    buildSolveKey({ algo: 'abc', values: [number('A', '1')] })
+  );
+});
+
+test('duplicates arriving during a disk lookup share one producer call', async () => {
+  const diskDir = await fs.mkdtemp(path.join(os.tmpdir(), 'solve-cache-'));
+  try {
+    const cache = new SolveCache({ diskDir });
+    let calls = 0;
+    const producer = async () => {
+      calls += 1;
+      return { status: 200, body: body(4), cacheable: true };
+    };
+    const results = await Promise.all([cache.wrap('k', producer), cache.wrap('k', producer)]);
+    assert.equal(calls, 1);
+    assert.deepEqual(results.map((result) => result.cache).sort(), ['COALESCED', 'MISS']);
+    await cache.flush();
+  } finally {
+    await fs.rm(diskDir, { recursive: true, force: true });
+  }
+});
+
+test('solve bodies with Compute errors are detected', () => {
+  assert.equal(solveHasErrors(Buffer.from(JSON.stringify({ values: [], errors: [] }))), false);
+  assert.equal(solveHasErrors(Buffer.from(JSON.stringify({ values: [] }))), false);
+  assert.equal(solveHasErrors(Buffer.from(JSON.stringify({ values: [], errors: ['Solution exception'] }))), true);
+  assert.equal(solveHasErrors(Buffer.from('<html>')), true);
+});
+
+test('results that are not cacheable are not stored', async () => {
+  const cache = new SolveCache();
+  await cache.wrap('k', async () => ({ status: 500, body: body(4), cacheable: false }));
+  assert.equal(await cache.get('k'), null);
+});
+
+test('disk tier is written in the background and kept under maxDiskBytes', async () => {
+  const diskDir = await fs.mkdtemp(path.join(os.tmpdir(), 'solve-cache-'));
+  try {
+    const cache = new SolveCache({ maxBytes: 0, diskDir, maxDiskBytes: 25 });
+    for (const key of ['a', 'b', 'c']) {
+      const result = await cache.wrap(key, async () => ({ status: 200, body: body(10, key), cacheable: true }));
+      assert.equal(result.cache, 'MISS');
+    }
+    await cache.flush();
+
+    const files = (await fs.readdir(diskDir)).sort();
+    assert.deepEqual(files, ['b.json', 'c.json']);
+    assert.equal(cache.diskBytes, 20);
+    assert.equal(cache.stats.diskEvictions, 1);
+
+    const hit = await cache.get('b');
+    assert.equal(hit.tier, 'disk');
+    assert.equal(hit.body.toString(), 'b'.repeat(10));
+  } finally {
+    await fs.rm(diskDir, { recursive: true, force: true });
+  }
+});
+
+test('disk index is rebuilt from existing files and trimmed to the budget', async () => {
+  const diskDir = await fs.mkdtemp(path.join(os.tmpdir(), 'solve-cache-'));
+  try {
+    await fs.writeFile(path.join(diskDir, 'old.json'), body(10));
+    const past = new Date(Date.now() - 60000);
+    await fs.utimes(path.join(diskDir, 'old.json'), past, past);
+    await fs.writeFile(path.join(diskDir, 'new.json'), body(10));
+
+    const cache = new SolveCache({ maxBytes: 0, diskDir, maxDiskBytes: 15 });
+    assert.equal(await cache.get('old'), null);
+    assert.equal((await cache.get('new')).tier, 'disk');
+    assert.deepEqual(await fs.readdir(diskDir), ['new.json']);
+  } finally {
+    await fs.rm(diskDir, { recursive: true, force: true });
+  }
+});
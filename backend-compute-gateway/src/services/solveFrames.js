@@ -0,0 +1,203 @@
+import { once } from 'events';
+import zlib from 'zlib';
+import { createLogger } from './logger.js';
+
+const log = createLogger('solve-frames');
+
+/**
+ * Binary framed transport for solve results (opt-in on POST /grasshopper/solve)
+ *
+ * Compute returns one JSON document in which every geometry item is an OpenNURBS
+ * blob, base64-encoded inside a JSON string. This re-encodes that document as a
+ * sequence of length-prefixed frames, one per output param branch, with the
+ * geometry as raw bytes, so the browser can start decoding the first branches
+ * while the rest are still on the wire.
+ *
+ * Stream layout (integers little-endian):
+ *   "GHSF" | u8 version | 3 reserved bytes
+ *   frame*: u8 type | u32 headerLength | u32 payloadLength | JSON header | payload
+ *
+ * Frame types:
+ *   META   - header: top-level solve fields except `values` (warnings, errors, ...)
+ *   BRANCH - header: { param, path, items }; geometry items carry
+ *            { type, version, archive3dm, opennurbs, offset, length } and their
+ *            bytes live in the payload, other items are inlined as { type, data }
+ *   END    - header: { branches, params }
+ */
+export const SOLVE_FRAMES_CONTENT_TYPE = 'application/x-gh-solve-frames';
+export const SOLVE_FRAMES_VERSION = 1;
+
+export const FRAME_TYPES = {
+  META: 1,
+  BRANCH: 2,
+  END: 3,
+};
+
+const MAGIC = Buffer.from('GHSF', 'ascii');
+const FRAME_PREFIX_BYTES = 9;
+
+// Flush the compressor at least this often so frames reach the browser progressively
+const FLUSH_BYTES = 64 * 1024;
+
+/**
+ * True when the client asked for the framed transport (Accept header)
+ */
+export function wantsSolveFrames(req) {
+  return (req.get('accept') || '').includes(SOLVE_FRAMES_CONTENT_TYPE);
+}
+
+function streamHeader() {
+  const header = Buffer.alloc(MAGIC.length + 4);
+  MAGIC.copy(header, 0);
+  header.writeUInt8(SOLVE_FRAMES_VERSION, MAGIC.length);
+  return header;
+}
+
+/**
+ * Encode one frame
+ */
+export function encodeFrame(type, header, payload = null) {
+  const headerBytes = Buffer.from(JSON.stringify(header), 'utf8');
+  const payloadLength = payload ? payload.length : 0;
+  const prefix = Buffer.alloc(FRAME_PREFIX_BYTES);
+  prefix.writeUInt8(type, 0);
+  prefix.writeUInt32LE(headerBytes.length, 1);
+  prefix.writeUInt32LE(payloadLength, 5);
+  return payloadLength > 0 ? [prefix, headerBytes, payload] : [prefix, headerBytes];
+}
+
+/**
+ * Parse the serialized OpenNURBS object of a geometry item, or null for other items
+ */
+function parseGeometryItem(item) {
+  if (!item?.type?.startsWith('Rhino.Geometry') || typeof item.data !== 'string') {
+    return null;
+  }
+  try {
+    const parsed = JSON.parse(item.data);
+    return parsed && typeof parsed.data === 'string' ? parsed : null;
+  } catch (err) {
+    return null;
+  }
+}
+
+/**
+ * Encode one InnerTree branch as a BRANCH frame
+ */
+function encodeBranch(param, path, items) {
+  const chunks = [];
+  let offset = 0;
+  const headerItems = (items || []).map((item) => {
+    const geometry = parseGeometryItem(item);
+    if (!geometry) {
+      return { type: item?.type ?? null, data: item?.data ?? null };
+    }
+    const { data, ...fields } = geometry;
+    const bytes = Buffer.from(data, 'base64');
+    chunks.push(bytes);
+    const entry = { type: item.type, ...fields, offset, length: bytes.length };
+    offset += bytes.length;
+    return entry;
+  });
+  const payload = chunks.length > 0 ? Buffer.concat(chunks, offset) : null;
+  return encodeFrame(FRAME_TYPES.BRANCH, { param, path, items: headerItems }, payload);
+}
+
+/**
+ * Yield the frames (as buffer lists) for a parsed Compute solve result
+ */
+export function* solveResultFrames(solveResult) {
+  const { values = [], ...meta } = solveResult || {};
+  yield encodeFrame(FRAME_TYPES.META, meta);
+
+  let branches = 0;
+  for (const param of values) {
+    for (const [path, items] of Object.entries(param.InnerTree || {})) {
+      branches++;
+      yield encodeBranch(param.ParamName, path, items);
+    }
+  }
+
+  yield encodeFrame(FRAME_TYPES.END, { branches, params: values.length });
+}
+
+/**
+ * Pick a compression stream from Accept-Encoding (brotli, then gzip)
+ */
+function createEncoder(req) {
+  const encoding = req.acceptsEncodings(['br', 'gzip', 'identity']);
+  if (encoding === 'br') {
+    return {
+      encoding,
+      stream: zlib.createBrotliCompress({
+        params: {
+          // Favour latency: geometry bytes compress well at low quality
+          [zlib.constants.BROTLI_PARAM_QUALITY]: 4,
+        },
+      }),
+    };
+  }
+  if (encoding === 'gzip') {
+    return { encoding, stream: zlib.createGzip({ level: 6 }) };
+  }
+  return { encoding: null, stream: null };
+}
+
+/**
+ * Send a cached/relayed Compute solve body (JSON bytes) to the client as frames
+ * @param {Request} req - Express request (for Accept-Encoding)
+ * @param {Response} res - Express response; headers already set are kept
+ * @param {Buffer} body - Upstream Compute response body
+ */
+export async function sendSolveFrames(req, res, body) {
+  const solveResult = JSON.parse(body.toString('utf8'));
+  const { encoding, stream: encoder } = createEncoder(req);
+
+  res.status(200);
+  res.setHeader('Content-Type', SOLVE_FRAMES_CONTENT_TYPE);
+  res.setHeader('Vary', 'Accept, Accept-Encoding');
+  if (encoding) {
+    res.setHeader('Content-Encoding', encoding);
+  }
+
+  const out = encoder || res;
+  if (encoder) {
+    encoder.pipe(res);
+  }
+
+  const write = async (buffers) => {
+    for (const buffer of buffers) {
+      if (!out.write(buffer)) {
+        await once(out, 'drain');
+      }
+    }
+  };
+
+  // Headers are already sent, so a failure mid-stream can only abort the response
+  try {
+    let unflushed = 0;
+    let branchesSent = 0;
+    await write([streamHeader()]);
+    for (const frame of solveResultFrames(solveResult)) {
+      if (res.destroyed) {
+        // Client went away; stop encoding the rest of the result
+        encoder?.destroy();
+        return;
+      }
+      await write(frame);
+      unflushed += frame.reduce((sum, buffer) => sum + buffer.length, 0);
+      const isBranch = frame[0][0] === FRAME_TYPES.BRANCH;
+      if (isBranch) branchesSent++;
+      // Flush the META frame and the first branch right away so rendering can start early
+      if (encoder && (unflushed >= FLUSH_BYTES || !isBranch || branchesSent === 1)) {
+        encoder.flush();
+        unflushed = 0;
+      }
+    }
+    out.end();
+  } catch (err) {
+    log.error('failed to stream solve result', { error: err.message });
+    encoder?.destroy();
+    res.destroy(err);
+  }
+}
@@ -0,0 +1,159 @@
+import assert from 'node:assert/strict';
+import { PassThrough } from 'stream';
+import { test } from 'node:test';
+import zlib from 'zlib';
+import {
+  FRAME_TYPES,
+  SOLVE_FRAMES_CONTENT_TYPE,
+  SOLVE_FRAMES_VERSION,
+  encodeFrame,
+  sendSolveFrames,
+  solveResultFrames,
+} from './solveFrames.js';
+
+const geometry = (bytes) => ({
+  type: 'Rhino.Geometry.Brep',
+  data: JSON.stringify({ version: 10000, archive3dm: 70, opennurbs: -1, data: Buffer.from(bytes).toString('base64') }),
+});
+
+const solveResult = {
+  absolutetolerance: 0.01,
+  warnings: ['careful'],
+  errors: [],
+  values: [
+    {
+      ParamName: 'RH_OUT:Geometry',
+      InnerTree: {
+        '{0}': [geometry([1, 2, 3]), { type: 'System.Double', data: '4.5' }, geometry([9, 8])],
+        '{1}': [],
+      },
+    },
+    {
+      ParamName: 'RH_OUT:Count',
+      InnerTree: { '{0}': [{ type: 'System.Int32', data: '3' }] },
+    },
+  ],
+};
+
+/**
+ * Decode a frame stream (optionally with the GHSF stream header) into frames
+ */
+function decodeFrames(buffer, { streamHeader = false } = {}) {
+  let offset = 0;
+  if (streamHeader) {
+    assert.equal(buffer.toString('ascii', 0, 4), 'GHSF');
+    assert.equal(buffer[4], SOLVE_FRAMES_VERSION);
+    offset = 8;
+  }
+  const frames = [];
+  while (offset < buffer.length) {
+    const type = buffer.readUInt8(offset);
+    const headerLength = buffer.readUInt32LE(offset + 1);
+    const payloadLength = buffer.readUInt32LE(offset + 5);
+    offset += 9;
+    const header = JSON.parse(buffer.toString('utf8', offset, offset + headerLength));
+    offset += headerLength;
+    const payload = buffer.subarray(offset, offset + payloadLength);
+    offset += payloadLength;
+    frames.push({ type, header, payload });
+  }
+  assert.equal(offset, buffer.length);
+  return frames;
+}
+
+test('encodeFrame writes a little-endian prefix and omits empty payloads', () => {
+  const withPayload = encodeFrame(FRAME_TYPES.BRANCH, { a: 1 }, Buffer.from([7, 7, 7]));
+  assert.equal(withPayload.length, 3);
+  const [frame] = decodeFrames(Buffer.concat(withPayload));
+  assert.equal(frame.type, FRAME_TYPES.BRANCH);
+  assert.deepEqual(frame.header, { a: 1 });
+  assert.deepEqual([...frame.payload], [7, 7, 7]);
+
+  const empty = encodeFrame(FRAME_TYPES.END, { branches: 0 });
+  assert.equal(empty.length, 2);
+  assert.equal(empty[0].readUInt32LE(5), 0);
+});
+
+test('solve results round-trip through META, BRANCH and END frames', () => {
+  const frames = decodeFrames(Buffer.concat([...solveResultFrames(solveResult)].flat()));
+  assert.deepEqual(frames.map((frame) => frame.type), [
+    FRAME_TYPES.META,
+    FRAME_TYPES.BRANCH,
+    FRAME_TYPES.BRANCH,
+    FRAME_TYPES.BRANCH,
+    FRAME_TYPES.END,
+  ]);
+
+  const { values, ...meta } = solveResult;
+  assert.deepEqual(frames[0].header, meta);
+  assert.deepEqual(frames[4].header, { branches: 3, params: 2 });
+
+  const [first, empty, count] = frames.slice(1, 4);
+  assert.equal(first.header.param, 'RH_OUT:Geometry');
+  assert.equal(first.header.path, '{0}');
+  const [brepA, number, brepB] = first.header.items;
+  assert.deepEqual(brepA, {
+    type: 'Rhino.Geometry.Brep', version: 10000, archive3dm: 70, opennurbs: -1, offset: 0, length: 3,
+  });
+  assert.deepEqual(number, { type: 'System.Double', data: '4.5' });
+  assert.deepEqual([...first.payload.subarray(brepA.offset, brepA.offset + brepA.length)], [1, 2, 3]);
+  assert.deepEqual([...first.payload.subarray(brepB.offset, brepB.offset + brepB.length)], [9, 8]);
+
+  assert.deepEqual(empty.header, { param: 'RH_OUT:Geometry', path: '{1}', items: [] });
+  assert.equal(empty.payload.length, 0);
+  assert.deepEqual(count.header.items, [{ type: 'System.Int32', data: '3' }]);
+});
+
+test('geometry items that are not serialized OpenNURBS objects are inlined', () => {
+  const frames = [...solveResultFrames({
+    values: [{ ParamName: 'P', InnerTree: { '{0}': [{ type: 'Rhino.Geometry.Point3d', data: '{"X":1}' }] } }],
+  })];
+  const [, branch] = decodeFrames(Buffer.concat(frames.flat()));
+  assert.deepEqual(branch.header.items, [{ type: 'Rhino.Geometry.Point3d', data: '{"X":1}' }]);
+  assert.equal(branch.payload.length, 0);
+});
+
+/**
+ * Minimal Express request/response pair for sendSolveFrames
+ */
+function mockExchange(encoding) {
+  const req = { acceptsEncodings: () => encoding };
+  const res = new PassThrough();
+  res.headers = {};
+  res.status = (code) => {
+    res.statusCode = code;
+    return res;
+  };
+  res.setHeader = (name, value) => {
+    res.headers[name.toLowerCase()] = value;
+  };
+  const chunks = [];
+  res.on('data', (chunk) => chunks.push(chunk));
+  const finished = new Promise((resolve) => res.on('end', () => resolve(Buffer.concat(chunks))));
+  return { req, res, finished };
+}
+
+test('sendSolveFrames streams the header and frames uncompressed', async () => {
+  const { req, res, finished } = mockExchange('identity');
+  await sendSolveFrames(req, res, Buffer.from(JSON.stringify(solveResult)));
+  const body = await finished;
+
+  assert.equal(res.statusCode, 200);
+  assert.equal(res.headers['content-type'], SOLVE_FRAMES_CONTENT_TYPE);
+  assert.equal(res.headers['content-encoding'], undefined);
+  const frames = decodeFrames(body, { streamHeader: true });
+  assert.equal(frames.length, 5);
+  assert.equal(frames.at(-1).type, FRAME_TYPES.END);
+});
+
+test('sendSolveFrames compresses with the negotiated encoding', async () => {
+  const { req, res, finished } = mockExchange('gzip');
+  await sendSolveFrames(req, res, Buffer.from(JSON.stringify(solveResult)));
+  const body = zlib.gunzipSync(await finished);
+
+  assert.equal(res.headers['content-encoding'], 'gzip');
+  assert.deepEqual(
+    decodeFrames(body, { streamHeader: true }).map((frame) => frame.type),
+    [FRAME_TYPES.META, FRAME_TYPES.BRANCH, FRAME_TYPES.BRANCH, FRAME_TYPES.BRANCH, FRAME_TYPES.END]
+  );
+});
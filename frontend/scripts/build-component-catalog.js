@@ -0,0 +1,83 @@
+/**
+ * Build the compact, lazily loaded component catalog
+ *
+ * Reads public/gh_components_native.json and writes public/gh_components_catalog.json
+ * in the format read by ComponentCatalog.fromCompact (src/utils/componentCatalog.js):
+ * components become positional rows, libraries are deduplicated into a table and
+ * repeated strings (categories, kinds, type names) are interned. Missing values stay
+ * distinguishable from empty strings: plain fields are written as null and interned
+ * or library references as -1.
+ *
+ * Usage: node scripts/build-component-catalog.js [input] [output]
+ */
+
+const fs = require('fs');
+const path = require('path');
+
+const CATALOG_VERSION = 2;
+const publicDir = path.resolve(__dirname, '../public');
+const inputPath = path.resolve(process.argv[2] || path.join(publicDir, 'gh_components_native.json'));
+const outputPath = path.resolve(process.argv[3] || path.join(publicDir, 'gh_components_catalog.json'));
+
+const strings = [];
+const stringIndex = new Map();
+const intern = (value) => {
+  if (value === null || value === undefined) return -1;
+  if (!stringIndex.has(value)) {
+    stringIndex.set(value, strings.length);
+    strings.push(value);
+  }
+  return stringIndex.get(value);
+};
+
+const libraries = [];
+const libraryIndex = new Map();
+const internLibrary = (library) => {
+  if (!library) return -1;
+  const row = [library.Id, library.Name, library.Version, library.Location, library.IsCoreLibrary];
+  const key = JSON.stringify(row);
+  if (!libraryIndex.has(key)) {
+    libraryIndex.set(key, libraries.length);
+    libraries.push(row);
+  }
+  return libraryIndex.get(key);
+};
+
+const encodeParam = (param) => [
+  param.Name ?? null,
+  param.Nickname ?? null,
+  param.Description ?? null,
+  intern(param.TypeName),
+  intern(param.DotNetType),
+];
+
+const database = JSON.parse(fs.readFileSync(inputPath, 'utf8'));
+const components = (database.Components || []).map((comp) => [
+  comp.Guid,
+  comp.Name ?? null,
+  comp.Nickname ?? null,
+  intern(comp.Category),
+  intern(comp.SubCategory),
+  intern(comp.Kind),
+  internLibrary(comp.Library),
+  (comp.Inputs || []).map(encodeParam),
+  (comp.Outputs || []).map(encodeParam),
+]);
+
+const catalog = {
+  version: CATALOG_VERSION,
+  exportedAt: database.ExportedAt,
+  count: components.length,
+  libraries,
+  strings,
+  components,
+};
+
+const json = JSON.stringify(catalog);
+fs.writeFileSync(outputPath, json);
+
+const inputSize = fs.statSync(inputPath).size;
+console.log(
+  `[catalog] ${components.length} components -> ${path.relative(process.cwd(), outputPath)} ` +
+  `(${(json.length / 1024).toFixed(0)} KB, was ${(inputSize / 1024).toFixed(0)} KB)`
+);
@@ -1,4 +1,5 @@
-import React, { useState, useEffect, useRef } from 'react';
+import React, { useState, useEffect, useRef, useMemo } from 'react';
+import { getComponentCatalog } from '../../utils/componentCatalog';
 import './ComponentSearch.css';
 
 /**
@@ -11,15 +12,13 @@ const ComponentSearch = ({ componentsDatabase, onComponentSelect }) => {
   const [selectedIndex, setSelectedIndex] = useState(0);
   const searchRef = useRef(null);
 
+  // Search index is built once per database, not per keystroke
+  const catalog = useMemo(() => getComponentCatalog(componentsDatabase), [componentsDatabase]);
+
   // Search components when search term changes
   useEffect(() => {
-    if (searchTerm.trim().length > 0) {
-      const term = searchTerm.toLowerCase();
-      const results = componentsDatabase.filter(comp => 
-        comp.Name?.toLowerCase().includes(term) ||
-        comp.Nickname?.toLowerCase().includes(term) ||
-        comp.Category?.toLowerCase().includes(term)
-      ).slice(0, 10); // Limit to 10 results
+    if (catalog && searchTerm.trim().length > 0) {
+      const results = catalog.search(searchTerm, { limit: 10 }); // Limit to 10 results
       
       setSearchResults(results);
       setIsOpen(results.length > 0);
@@ -28,7 +27,7 @@ const ComponentSearch = ({ componentsDatabase, onComponentSelect }) => {
       setSearchResults([]);
       setIsOpen(false);
     }
-  }, [searchTerm, componentsDatabase]);
+  }, [searchTerm, catalog]);
 
   // Handle keyboard navigation
   const handleKeyDown = (e) => {
@@ -31,6 +31,7 @@ import {
   parseGrasshopperComponent,
   parseSimplifiedGraph 
 } from '../../utils/nodeParser';
+import { getComponentCatalog } from '../../utils/componentCatalog';
 import { ConnectionManager, convertReactFlowConnection } from '../../utils/connectionManager';
 import './NodeParser.css';
 
@@ -150,13 +151,15 @@ const createInteractiveNode = (component, instanceId, position) => {
  * Main NodeParser component that renders Grasshopper components using React Flow
  * Now with separate connection management and component search
  */
-const NodeParser = ({ graphData, onConnectionsChange, onNodesChange: onNodesChangeCallback, onNodeDataChange, componentsDatabase }) => {
+const NodeParser = ({ graphData, onConnectionsChange, onNodesChange: onNodesChangeCallback, onNodeDataChange, onNodeDrag: onNodeDragCallback, componentsDatabase }) => {
   const [nodes, setNodes, onNodesChange] = useNodesState([]);
   const [edges, setEdges, onEdgesChange] = useEdgesState([]);
   const [error, setError] = useState(null);
   const connectionManager = useRef(new ConnectionManager());
   const isCtrlPressed = useRef(false);
   const isInitialized = useRef(false);
+  const nodeSources = useRef(new Map()); // node id -> graphData node it was parsed from
+  const nodeSourcesDatabase = useRef(null);
   const nextInstanceId = useRef(1000); // Start from 1000 for new components
 
   // Handler for interactive node value changes (sliders, inputs, etc.)
@@ -241,13 +244,34 @@ const NodeParser = ({ graphData, onConnectionsChange, onNodesChange: onNodesChan
         
         // Update nodes if this is initial load, node count changed, or database just loaded
         const nodesChanged = parsedNodes.length !== nodes.length;
-        const hasDatabase = componentsDatabase && componentsDatabase.length > 0;
+        const hasDatabase = getComponentCatalog(componentsDatabase)?.count > 0;
         
         if (!isInitialized.current || nodesChanged || (hasDatabase && parsedNodes.length > 0)) {
+          // Storage snapshots keep unchanged nodes' identity; remember which graphData node
+          // each rendered node came from so unchanged nodes can be reused as-is
+          const previousSources = nodeSources.current;
+          const databaseUnchanged = nodeSourcesDatabase.current === componentsDatabase;
+          const nextSources = new Map();
+          parsedNodes.forEach((node, index) => {
+            if (graphData.nodes?.[index]) nextSources.set(node.id, graphData.nodes[index]);
+          });
+          nodeSources.current = nextSources;
+          nodeSourcesDatabase.current = componentsDatabase;
+
           // Preserve selection state and inject onChange handler for interactive nodes
           setNodes((currentNodes) => {
             const selectedNodeIds = currentNodes.filter(n => n.selected).map(n => n.id);
+            const currentById = new Map(currentNodes.map(n => [n.id, n]));
             return parsedNodes.map(node => {
+              // Reuse the rendered node so React Flow only re-renders nodes that actually
+              // changed, and never overwrite a node the local user is dragging
+              const existing = currentById.get(node.id);
+              const source = nextSources.get(node.id);
+              if (existing && (existing.dragging ||
+                  (source && databaseUnchanged && previousSources.get(node.id) === source))) {
+                return existing;
+              }
+
               // For interactive nodes, inject the onChange handler
               const interactiveNodeTypes = ['numberSlider', 'panel', 'booleanToggle', 'button', 'numberInput'];
               if (interactiveNodeTypes.includes(node.type)) {
@@ -487,6 +511,16 @@ const NodeParser = ({ graphData, onConnectionsChange, onNodesChange: onNodesChan
     [setNodes, onNodesChangeCallback]
   );
 
+  // Stream positions while dragging (the parent throttles and batches them)
+  const handleNodeDrag = useCallback(
+    (event, node, draggedNodes) => {
+      if (onNodeDragCallback) {
+        onNodeDragCallback(draggedNodes && draggedNodes.length > 0 ? draggedNodes : [node]);
+      }
+    },
+    [onNodeDragCallback]
+  );
+
   // Handle node drag end to save position changes
   const onNodeDragStop = useCallback(
     (event, node) => {
@@ -520,6 +554,7 @@ const NodeParser = ({ graphData, onConnectionsChange, onNodesChange: onNodesChan
         onConnect={onConnect}
         onEdgesDelete={onEdgesDelete}
         onNodesDelete={handleNodesDelete}
+        onNodeDrag={handleNodeDrag}
         onNodeDragStop={onNodeDragStop}
         nodeTypes={nodeTypes}
         nodesDraggable={true}
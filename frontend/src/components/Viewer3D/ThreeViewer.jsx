@@ -155,6 +155,32 @@ function MeshGeometry({ vertices, faces }) {
   );
 }
 
+/**
+ * BufferMesh - Component that renders decoded mesh buffers from the rhino3dm workers
+ * The typed arrays are wrapped as-is, without copying
+ */
+function BufferMesh({ positions, indices, normals }) {
+  const geometry = useMemo(() => {
+    const geo = new THREE.BufferGeometry();
+    geo.setAttribute('position', new THREE.BufferAttribute(positions, 3));
+    geo.setIndex(new THREE.BufferAttribute(indices, 1));
+    if (normals) {
+      geo.setAttribute('normal', new THREE.BufferAttribute(normals, 3));
+    } else {
+      geo.computeVertexNormals();
+    }
+    return geo;
+  }, [positions, indices, normals]);
+
+  useEffect(() => () => geometry.dispose(), [geometry]);
+
+  return (
+    <mesh geometry={geometry}>
+      <meshStandardMaterial color="#4CAF50" side={THREE.DoubleSide} />
+    </mesh>
+  );
+}
+
 /**
  * ThreeObject - Component that renders a Three.js Object3D from Rhino3dmLoader
  */
@@ -215,8 +241,9 @@ function SceneContent({ geometry, theme }) {
   const meshes = Array.isArray(geometry) ? geometry : [geometry];
   // console.log('SceneContent: Rendering', meshes.length, 'mesh(es)');
 
-  // Check if the array contains three-objects
-  const hasThreeObjects = meshes.length > 0 && meshes[0].type === 'three-object';
+  // Check if the array contains three-objects or decoded mesh buffers
+  const hasThreeObjects = meshes.length > 0 &&
+    (meshes[0].type === 'three-object' || meshes[0].type === 'mesh-buffers');
 
   if (hasThreeObjects) {
     // console.log('SceneContent: Rendering array of Three.js objects');
@@ -248,7 +275,16 @@ function SceneContent({ geometry, theme }) {
         <pointLight position={[-10, -10, -5]} intensity={0.5} />
 
         {meshes.map((item, index) => (
-          <ThreeObject key={index} object={item.object} />
+          item.type === 'mesh-buffers' ? (
+            <BufferMesh
+              key={item.id ?? index}
+              positions={item.positions}
+              indices={item.indices}
+              normals={item.normals}
+            />
+          ) : (
+            <ThreeObject key={index} object={item.object} />
+          )
         ))}
 
         <Grid
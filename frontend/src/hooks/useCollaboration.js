@@ -1,4 +1,17 @@
-import { useStorage, useMutation, useOthers, useStatus } from '@liveblocks/react';
+import { useCallback, useEffect, useMemo, useRef } from 'react';
+import { useStorage, useMutation, useOthers, useSelf, useStatus, useHistory } from '@liveblocks/react';
+import {
+  isSimplifiedGraph,
+  migrateLegacyGraph,
+  orderedValues,
+  updateGraphNodeFields,
+  writeGraph,
+  writeGraphLinks,
+  writeGraphNodes,
+  writeNodePositions,
+} from '../utils/graphStorage';
+
+export { createGraphStorage, getLinkKey } from '../utils/graphStorage';
 
 /**
  * useCollaboration - Hook for managing Liveblocks collaboration
@@ -8,13 +21,13 @@ import { useStorage, useMutation, useOthers, useStatus } from '@liveblocks/react
 export function useCollaboration() {
   const status = useStatus();
   const others = useOthers();
-  
+
   // Get nodes and edges from Liveblocks storage
   // useStorage can return undefined initially, so we handle that
-  const storageRoot = useStorage((root) => root);
-  const nodes = storageRoot?.nodes ?? [];
-  const edges = storageRoot?.edges ?? [];
-  
+  // Select each key separately so unrelated storage changes (comments, threads) don't re-render
+  const nodes = useStorage((root) => root.nodes) ?? [];
+  const edges = useStorage((root) => root.edges) ?? [];
+
   // Mutation to update nodes
   const updateNodes = useMutation(({ storage }, newNodes) => {
     if (!storage) {
@@ -23,7 +36,7 @@ export function useCollaboration() {
     }
     storage.set('nodes', newNodes);
   }, []);
-  
+
   // Mutation to update edges
   const updateEdges = useMutation(({ storage }, newEdges) => {
     if (!storage) {
@@ -32,10 +45,10 @@ export function useCollaboration() {
     }
     storage.set('edges', newEdges);
   }, []);
-  
+
   // Check connection status from status object
   const isConnected = status === 'connected';
-  
+
   return {
     connectionStatus: status,
     others,
@@ -47,56 +60,153 @@ export function useCollaboration() {
   };
 }
 
+const NODE_DRAG_THROTTLE_MS = 50;
+
 /**
  * useGraphCollaboration - Hook for managing graph data collaboration (NodeParserDemo)
- * Handles the simplified graph format with nodes and links
+ * Handles the simplified graph format with nodes and links; see utils/graphStorage.js
+ * for the storage layout
  * @returns {Object} Collaboration state and functions
  */
 export function useGraphCollaboration() {
   const status = useStatus();
   const others = useOthers();
-  
-  // Get graph data from Liveblocks storage
-  const storageRoot = useStorage((root) => root);
-  const graphData = storageRoot?.graphData ?? { nodes: [], links: [] };
-  
+  const self = useSelf();
+  const history = useHistory();
+
+  // Subscribe to the graph keys only; immutable snapshots share structure, so
+  // unchanged nodes and links keep their identity between updates
+  const legacyGraphData = useStorage((root) => root.graphData);
+  const nodeMap = useStorage((root) => root.graphNodes);
+  const linkMap = useStorage((root) => root.graphLinks);
+  const nodeOrder = useStorage((root) => root.graphNodeOrder);
+  const linkOrder = useStorage((root) => root.graphLinkOrder);
+
+  const graphData = useMemo(() => {
+    if (legacyGraphData) {
+      return legacyGraphData;
+    }
+    return {
+      nodes: orderedValues(nodeMap, nodeOrder),
+      links: orderedValues(linkMap, linkOrder),
+    };
+  }, [legacyGraphData, nodeMap, linkMap, nodeOrder, linkOrder]);
+
   // Mutation to update entire graph data
   const updateGraphData = useMutation(({ storage }, newGraphData) => {
     if (!storage) {
       console.error('Storage not available');
       return;
     }
-    storage.set('graphData', newGraphData);
+    writeGraph(storage, newGraphData);
   }, []);
-  
-  // Mutation to update just nodes
+
+  // Mutation to update just nodes (only changed fields are sent)
   const updateGraphNodes = useMutation(({ storage }, newNodes) => {
     if (!storage) {
       console.error('Storage not available');
       return;
     }
-    const currentData = storage.get('graphData') || { nodes: [], links: [] };
-    storage.set('graphData', {
-      ...currentData,
-      nodes: newNodes
-    });
+    writeGraphNodes(storage, newNodes);
   }, []);
-  
+
   // Mutation to update just links
   const updateGraphLinks = useMutation(({ storage }, newLinks) => {
     if (!storage) {
       console.error('Storage not available');
       return;
     }
-    const currentData = storage.get('graphData') || { nodes: [], links: [] };
-    storage.set('graphData', {
-      ...currentData,
-      links: newLinks
+    writeGraphLinks(storage, newLinks);
+  }, []);
+
+  // Mutation to update some fields of one node, e.g. { properties: { Value: 5 } }
+  const updateGraphNode = useMutation(({ storage }, nodeId, fields) => {
+    if (!storage) {
+      console.error('Storage not available');
+      return;
+    }
+    if (!updateGraphNodeFields(storage, nodeId, fields)) {
+      console.warn(`Node ${nodeId} not found in storage`);
+    }
+  }, []);
+
+  // Mutation to write a batch of node positions at once
+  const applyNodePositions = useMutation(({ storage }, positions) => {
+    if (!storage) {
+      console.error('Storage not available');
+      return;
+    }
+    writeNodePositions(storage, positions);
+  }, []);
+
+  // Drag batching: coalesce position updates and flush at most every NODE_DRAG_THROTTLE_MS.
+  // History is paused during a drag so undo restores the pre-drag position in one step.
+  const pendingPositions = useRef({});
+  const flushTimer = useRef(null);
+  const isDragging = useRef(false);
+
+  const flushNodePositions = useCallback(() => {
+    clearTimeout(flushTimer.current);
+    flushTimer.current = null;
+    const positions = pendingPositions.current;
+    pendingPositions.current = {};
+    if (Object.keys(positions).length > 0) {
+      applyNodePositions(positions);
+    }
+  }, [applyNodePositions]);
+
+  /**
+   * Move nodes, throttled for use while dragging
+   * @param {Object} positions - { [nodeId]: { x, y } } in graph (unscaled) coordinates
+   * @param {Object} options
+   * @param {boolean} options.final - Drag finished: flush now and resume history
+   */
+  const moveGraphNodes = useCallback((positions, { final = false } = {}) => {
+    if (!isDragging.current && !final) {
+      isDragging.current = true;
+      history.pause();
+    }
+    Object.entries(positions).forEach(([nodeId, position]) => {
+      pendingPositions.current[String(nodeId)] = position;
     });
+
+    if (final) {
+      flushNodePositions();
+      if (isDragging.current) {
+        isDragging.current = false;
+        history.resume();
+      }
+    } else if (!flushTimer.current) {
+      flushTimer.current = setTimeout(flushNodePositions, NODE_DRAG_THROTTLE_MS);
+    }
+  }, [flushNodePositions, history]);
+
+  // Unmounting mid-drag: write the last positions and re-enable history
+  useEffect(() => () => {
+    flushNodePositions();
+    if (isDragging.current) {
+      isDragging.current = false;
+      history.resume();
+    }
+  }, [flushNodePositions, history]);
+
+  // Move rooms created with a single graphData object to the per-node layout.
+  // Only the client with the lowest connection id among those present runs it,
+  // so clients loading the room together don't race to create the per-node
+  // containers; edits made before it runs go to graphData and are carried over.
+  const isMigrationLeader = Boolean(self) && others.every((other) => other.connectionId > self.connectionId);
+  const migrateGraph = useMutation(({ storage }) => {
+    if (storage) migrateLegacyGraph(storage);
   }, []);
-  
+
+  useEffect(() => {
+    if (isMigrationLeader && isSimplifiedGraph(legacyGraphData)) {
+      migrateGraph();
+    }
+  }, [isMigrationLeader, legacyGraphData, migrateGraph]);
+
   const isConnected = status === 'connected';
-  
+
   return {
     connectionStatus: status,
     others,
@@ -105,6 +215,7 @@ export function useGraphCollaboration() {
     updateGraphData,
     updateGraphNodes,
     updateGraphLinks,
+    updateGraphNode,
+    moveGraphNodes,
   };
 }
-
@@ -1,43 +1,112 @@
-import { useState, useCallback } from 'react';
-import { computeGraph } from '../services/computeAPI';
-import { convertToGraphDefinition } from '../services/graphConverter';
+import { useState, useCallback, useEffect, useRef } from 'react';
+import { computeGraph, isComputeCanceled } from '../services/computeAPI';
+import { GraphEvaluator } from '../services/graphConverter';
 
 /**
  * useCompute - Hook for managing compute state and operations
+ *
+ * Evaluation is incremental: only nodes changed since the last compute (and
+ * everything downstream of them) are re-resolved and sent, and starting a new
+ * compute aborts any request still in flight.
+ *
  * @param {Array} nodes - React Flow nodes
  * @param {Array} edges - React Flow edges
+ * @param {Object} options
+ * @param {boolean} options.autoCompute - Recompute automatically (debounced) when the graph changes
+ * @param {number} options.debounceMs - Delay used by scheduleCompute / autoCompute
  * @returns {Object} Compute state and functions
  */
-export function useCompute(nodes, edges) {
+export function useCompute(nodes, edges, { autoCompute = false, debounceMs = 300 } = {}) {
   const [isComputing, setIsComputing] = useState(false);
   const [geometry, setGeometry] = useState(null);
   const [error, setError] = useState(null);
+  const evaluatorRef = useRef(null);
+  const abortRef = useRef(null);
+  const timerRef = useRef(null);
+
+  if (evaluatorRef.current === null) {
+    evaluatorRef.current = new GraphEvaluator();
+  }
+
+  const cancel = useCallback(() => {
+    clearTimeout(timerRef.current);
+    if (abortRef.current) {
+      abortRef.current.abort();
+      abortRef.current = null;
+      setIsComputing(false);
+    }
+  }, []);
 
   const compute = useCallback(async () => {
+    // A newer compute supersedes any pending or in-flight one
+    clearTimeout(timerRef.current);
+    abortRef.current?.abort();
+    const controller = new AbortController();
+    abortRef.current = controller;
+
     setIsComputing(true);
     setError(null);
-    
+
     try {
-      const graphDefinition = convertToGraphDefinition(nodes, edges);
-      console.log('Computing graph:', graphDefinition);
-      const result = await computeGraph(graphDefinition);
-      console.log('Compute result:', result);
-      setGeometry(result.geometry);
-      return result;
+      const evaluator = evaluatorRef.current;
+      evaluator.update(nodes, edges);
+
+      let result = null;
+      let merged = null;
+      // At most two passes: a partial result the evaluator can't attribute is re-sent in full
+      for (let attempt = 0; attempt < 2 && merged === null; attempt++) {
+        const prepared = evaluator.prepare();
+        if (!prepared) {
+          merged = evaluator.getGeometry();
+          break;
+        }
+        result = await computeGraph(prepared.graph, {}, { signal: controller.signal });
+        merged = evaluator.commit(prepared, result.geometry);
+      }
+
+      setGeometry(merged);
+      return { ...result, geometry: merged };
     } catch (err) {
+      if (isComputeCanceled(err)) {
+        return null;
+      }
       console.error('Compute error:', err);
       setError(err.message || 'Compute failed');
       throw err;
     } finally {
-      setIsComputing(false);
+      if (abortRef.current === controller) {
+        abortRef.current = null;
+        setIsComputing(false);
+      }
     }
   }, [nodes, edges]);
 
+  const scheduleCompute = useCallback(() => {
+    clearTimeout(timerRef.current);
+    timerRef.current = setTimeout(() => {
+      // Errors are already reported through `error`
+      compute().catch(() => {});
+    }, debounceMs);
+  }, [compute, debounceMs]);
+
+  useEffect(() => {
+    if (autoCompute) {
+      scheduleCompute();
+    }
+  }, [autoCompute, scheduleCompute]);
+
+  // Drop pending and in-flight computes on unmount
+  useEffect(() => () => {
+    clearTimeout(timerRef.current);
+    abortRef.current?.abort();
+  }, []);
+
   return {
     isComputing,
     geometry,
     error,
     compute,
+    scheduleCompute,
+    cancel,
   };
 }
-
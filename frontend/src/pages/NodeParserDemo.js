@@ -6,7 +6,7 @@ import { IconButton, Box, Button } from '@mui/material';
 import { ChevronLeft, ChevronRight, Save, FolderOpen, Delete, PlayArrow, Comment } from '@mui/icons-material';
 import { RoomProvider, useSelf, useUpdateMyPresence } from '@liveblocks/react';
 import { NodeParser } from '../components/NodeParser';
-import { useGraphCollaboration } from '../hooks/useCollaboration';
+import { useGraphCollaboration, createGraphStorage } from '../hooks/useCollaboration';
 import CollaborationStatus from '../components/Collaboration/CollaborationStatus';
 import { LiveCursorsContainer } from '../components/Collaboration/LiveCursors';
 import { CommentsPanel } from '../components/Collaboration/CommentsPanel';
@@ -14,7 +14,9 @@ import ThreeViewer from '../components/Viewer3D/ThreeViewer';
 import ThreeViewerRhino from '../components/Viewer3D/ThreeViewerRhino';
 import ErrorBoundary from '../components/ErrorBoundary';
 import { POSITION_SCALE_FACTOR } from '../utils/nodeParser';
-import { convertRhinoComputeToThreeViewer } from '../utils/rhinoGeometryConverter';
+import { decodeGeometryBranch } from '../utils/rhinoGeometryConverter';
+import { solveGrasshopperStream } from '../utils/grasshopperSolver';
+import { loadComponentCatalog } from '../utils/componentCatalog';
 import exampleData from '../data/exampleGraph.json';
 import exampleDataInteractive from '../data/exampleGraphInteractive.json';
 import testScript1 from '../data/Test-Script-1.json';
@@ -33,6 +35,22 @@ const api = axios.create({
 const USE_BACKEND_LOAD = true;
 const USE_BACKEND_SAVE = true;
 
+/**
+ * Collect node positions in graph (unscaled) coordinates, keyed by simplified node id
+ */
+const toGraphPositions = (reactFlowNodes) => {
+  const positions = {};
+  reactFlowNodes.forEach((node) => {
+    if (node?.position) {
+      positions[node.id.replace(/^node-/, '')] = {
+        x: node.position.x / POSITION_SCALE_FACTOR,
+        y: node.position.y / POSITION_SCALE_FACTOR
+      };
+    }
+  });
+  return positions;
+};
+
 const NodeParserDemoContent = ({ roomId }) => {
   const theme = useTheme();
   const self = useSelf();
@@ -56,6 +74,8 @@ const NodeParserDemoContent = ({ roomId }) => {
     updateGraphData,
     updateGraphNodes,
     updateGraphLinks,
+    updateGraphNode,
+    moveGraphNodes,
     isConnected,
     others
   } = useGraphCollaboration();
@@ -76,7 +96,7 @@ const NodeParserDemoContent = ({ roomId }) => {
   
   const [jsonInput, setJsonInput] = useState(JSON.stringify(currentData, null, 2));
   const [parseError, setParseError] = useState(null);
-  const [componentsDatabase, setComponentsDatabase] = useState([]);
+  const [componentsDatabase, setComponentsDatabase] = useState(null);
   const [isLoadingDatabase, setIsLoadingDatabase] = useState(true);
 
   // Sync JSON input when currentData changes from Liveblocks
@@ -84,21 +104,17 @@ const NodeParserDemoContent = ({ roomId }) => {
     setJsonInput(JSON.stringify(currentData, null, 2));
   }, [currentData]);
 
-  // Load the components database
+  // Load the components database (compact indexed catalog when it has been built)
   useEffect(() => {
     const loadDatabase = async () => {
       try {
-        const response = await fetch('/gh_components_native.json');
-        if (response.ok) {
-          const data = await response.json();
-          if (data && data.Components) {
-            setComponentsDatabase(data.Components);
-            console.log(`Loaded ${data.Components.length} components from database`);
-          } else {
-            console.error('No components found in database');
-          }
+        const catalog = await loadComponentCatalog();
+        if (catalog.count > 0) {
+          // Pass the catalog itself so compact rows are only hydrated when used
+          setComponentsDatabase(catalog);
+          console.log(`Loaded ${catalog.count} components from database`);
         } else {
-          console.error('Failed to fetch database:', response.statusText);
+          console.error('No components found in database');
         }
         setIsLoadingDatabase(false);
       } catch (error) {
@@ -334,32 +350,29 @@ const NodeParserDemoContent = ({ roomId }) => {
     const isSimplifiedFormat = currentData.nodes && currentData.links;
 
     if (isSimplifiedFormat) {
-      // Update the node's properties in the simplified format
-      const updatedNodes = currentData.nodes?.map(node => {
-        if (`node-${node.id}` === nodeId) {
-          // Update properties based on node type
-          const updatedProperties = { ...node.properties };
-
-          // Handle different data types
-          if (newData.value !== undefined) {
-            updatedProperties.Value = newData.value;
-          }
-          if (newData.min !== undefined) updatedProperties.Min = newData.min;
-          if (newData.max !== undefined) updatedProperties.Max = newData.max;
-          if (newData.step !== undefined) updatedProperties.Step = newData.step;
-          if (newData.text !== undefined) updatedProperties.Text = newData.text;
-
-          return {
-            ...node,
-            properties: updatedProperties
-          };
-        }
-        return node;
-      }) || [];
+      // Update only the changed properties of this node in the simplified format
+      const updatedProperties = {};
 
-      updateGraphNodes(updatedNodes);
+      // Handle different data types
+      if (newData.value !== undefined) {
+        updatedProperties.Value = newData.value;
+      }
+      if (newData.min !== undefined) updatedProperties.Min = newData.min;
+      if (newData.max !== undefined) updatedProperties.Max = newData.max;
+      if (newData.step !== undefined) updatedProperties.Step = newData.step;
+      if (newData.text !== undefined) updatedProperties.Text = newData.text;
+
+      updateGraphNode(nodeId.replace(/^node-/, ''), { properties: updatedProperties });
     }
-  }, [currentData, updateGraphNodes]);
+  }, [currentData, updateGraphNode]);
+
+  // Stream positions to collaborators while dragging (throttled in moveGraphNodes)
+  const handleNodeDrag = useCallback((draggedNodes) => {
+    const isSimplifiedFormat = currentData.nodes && currentData.links;
+    if (isSimplifiedFormat) {
+      moveGraphNodes(toGraphPositions(draggedNodes));
+    }
+  }, [currentData, moveGraphNodes]);
 
   const handleNodesChange = (newNodes, newComponentInstance, deletedNodeIds, isPositionUpdate) => {
     // Detect format
@@ -462,19 +475,8 @@ const NodeParserDemoContent = ({ roomId }) => {
     // If this is a position update (node drag), update positions without triggering re-parse
     if (isPositionUpdate && newNodes) {
       if (isSimplifiedFormat) {
-        const updatedNodes = currentData.nodes?.map(node => {
-          const reactFlowNode = newNodes.find(n => n.id === `node-${node.id}`);
-          if (reactFlowNode && reactFlowNode.position) {
-            return {
-              ...node,
-              x: reactFlowNode.position.x / POSITION_SCALE_FACTOR,
-              y: reactFlowNode.position.y / POSITION_SCALE_FACTOR
-            };
-          }
-          return node;
-        }) || [];
-        
-        updateGraphNodes(updatedNodes);
+        // Only nodes whose position changed are written
+        moveGraphNodes(toGraphPositions(newNodes), { final: true });
       } else {
         const updatedInstances = currentData.componentInstances?.map(inst => {
           const node = newNodes.find(n => n.id === `node-${inst.instanceId}`);
@@ -576,8 +578,19 @@ const NodeParserDemoContent = ({ roomId }) => {
       console.log('[Run] Converted to base64 (', ghBase64.length, 'chars)');
       
       // 3. Solve directly with base64 algo
+      // Results arrive as binary frames per output branch; geometry branches are
+      // decoded (in Web Workers) and shown as soon as each one arrives
       console.log('[Run] Solving with base64 algo...');
-      const solveResponse = await api.post('/grasshopper/solve', {
+      const decodedBranches = [];
+      const branchDecodes = [];
+      const showDecodedGeometry = () => {
+        const decoded = decodedBranches.filter(Boolean).flat();
+        if (decoded.length > 0) {
+          setSampleGeometry(decoded);
+          setIsViewerCollapsed(false);
+        }
+      };
+      const solveData = await solveGrasshopperStream({
         algo: ghBase64,
         pointer: null,
         fileName: 'generated.gh',
@@ -585,8 +598,17 @@ const NodeParserDemoContent = ({ roomId }) => {
         cachesolve: true,
         absolutetolerance: 0.01,
         angletolerance: 1.0,
-        modelunits: "Meters"
+        modelunits: "Meters",
+        backendUrl: BACKEND_URL,
+        onBranch: (branch) => {
+          const index = branchDecodes.length;
+          branchDecodes.push(decodeGeometryBranch(branch).then((geometries) => {
+            decodedBranches[index] = geometries;
+            showDecodedGeometry();
+          }));
+        }
       });
+      const solveResponse = { data: solveData };
       
       console.log('[Run] Solve completed:', solveResponse.data);
       
@@ -639,12 +661,13 @@ const NodeParserDemoContent = ({ roomId }) => {
         }
       }
       
-      // 5. Convert geometry to ThreeViewer format
+      // 5. Wait for the remaining geometry branches to finish decoding
       if (geometryItems.length > 0) {
-        console.log('[Run] Converting', geometryItems.length, 'geometry items...');
-        const geometries = await convertRhinoComputeToThreeViewer(solveResponse.data);
-        
-        if (geometries && geometries.length > 0) {
+        console.log('[Run] Decoding', geometryItems.length, 'geometry items...');
+        await Promise.all(branchDecodes);
+        const geometries = decodedBranches.filter(Boolean).flat();
+
+        if (geometries.length > 0) {
           console.log('[Run] Converted', geometries.length, 'geometries for visualization');
           setSampleGeometry(geometries);
           setIsViewerCollapsed(false);
@@ -743,7 +766,7 @@ const NodeParserDemoContent = ({ roomId }) => {
           <div className="loading-message">
             Loading components database...
           </div>
-        ) : componentsDatabase.length === 0 ? (
+        ) : !componentsDatabase ? (
           <div className="loading-message" style={{background: '#fff3cd', color: '#856404'}}>
             ⚠️ Components database not loaded. Some features may not work correctly.
           </div>
@@ -760,6 +783,7 @@ const NodeParserDemoContent = ({ roomId }) => {
               onConnectionsChange={handleConnectionsChange}
               onNodesChange={handleNodesChange}
               onNodeDataChange={handleNodeDataChange}
+              onNodeDrag={handleNodeDrag}
               componentsDatabase={componentsDatabase}
             />
           </div>
@@ -997,7 +1021,7 @@ const NodeParserDemo = () => {
         color: null,
       }}
       initialStorage={{
-        graphData: testScript1, // Initial data for new rooms
+        ...createGraphStorage(testScript1), // Initial data for new rooms
         comments: [],
         threads: {},
       }}
@@ -1,6 +1,6 @@
 import React, { useCallback, useRef, useEffect, useMemo, useState } from 'react';
 import { useParams } from 'react-router-dom';
-import { Box, Typography, Button, Toolbar, useMediaQuery, IconButton } from '@mui/material';
+import { Box, Typography, Button, Toolbar, useMediaQuery, IconButton, FormControlLabel, Switch } from '@mui/material';
 import { RoomProvider, useSelf, useUpdateMyPresence } from '@liveblocks/react';
 import { applyNodeChanges, applyEdgeChanges, addEdge } from '@xyflow/react';
 import { nanoid } from 'nanoid';
@@ -112,7 +112,9 @@ function Workspace3DMContent({ roomId }) {
   
   const edges = liveblocksEdges;
 
-  const { isComputing, geometry, compute } = useCompute(nodes, edges);
+  // With auto compute on, graph edits trigger a debounced compute of the dirty nodes
+  const [autoCompute, setAutoCompute] = useState(false);
+  const { isComputing, geometry, error: computeError, compute } = useCompute(nodes, edges, { autoCompute });
   const reactFlowInstance = useRef(null);
 
   // Sync React Flow changes to Liveblocks
@@ -257,6 +259,23 @@ function Workspace3DMContent({ roomId }) {
               >
                 <Comment />
               </IconButton>
+              <FormControlLabel
+                sx={{ ml: 2 }}
+                control={
+                  <Switch
+                    size="small"
+                    checked={autoCompute}
+                    onChange={(event) => setAutoCompute(event.target.checked)}
+                  />
+                }
+                label="Auto"
+                title="Recompute automatically when the graph changes"
+              />
+              {autoCompute && computeError && (
+                <Typography variant="caption" color="error" sx={{ ml: 1 }}>
+                  {computeError}
+                </Typography>
+              )}
               <Button
                 variant="contained"
                 color="primary"
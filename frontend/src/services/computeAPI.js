@@ -10,15 +10,18 @@ const API_BASE_URL = process.env.REACT_APP_API_URL || 'http://localhost:5000';
  * Send graph definition to backend for computation
  * @param {Object} graphDefinition - Graph definition with nodes and edges
  * @param {Object} settings - Computation settings (e.g., tolerance)
+ * @param {Object} options - Request options
+ * @param {AbortSignal} options.signal - Aborts the request (e.g. when a newer compute supersedes it)
  * @returns {Promise<Object>} Geometry results from backend
  */
-export async function computeGraph(graphDefinition, settings = {}) {
+export async function computeGraph(graphDefinition, settings = {}, { signal } = {}) {
   console.log('computeGraph called with:', {
     API_BASE_URL,
     nodeCount: graphDefinition?.nodes?.length || 0,
     edgeCount: graphDefinition?.edges?.length || 0
   });
   
+  let requestInterceptor = null;
   try {
     const url = `${API_BASE_URL}/api/compute`;
     const payload = {
@@ -48,7 +51,7 @@ export async function computeGraph(graphDefinition, settings = {}) {
     }
     
     // Add request interceptor to log the actual request
-    const requestInterceptor = axios.interceptors.request.use(
+    requestInterceptor = axios.interceptors.request.use(
       (config) => {
         if (config.url && config.url.includes('/api/compute')) {
           console.log('Axios POST request intercepted:', {
@@ -65,10 +68,7 @@ export async function computeGraph(graphDefinition, settings = {}) {
       }
     );
     
-    const response = await axios.post(url, payload);
-    
-    // Remove interceptor after request
-    axios.interceptors.request.eject(requestInterceptor);
+    const response = await axios.post(url, payload, { signal });
     
     console.log('Response received:', {
       status: response.status,
@@ -78,6 +78,9 @@ export async function computeGraph(graphDefinition, settings = {}) {
     
     return response.data;
   } catch (error) {
+    if (axios.isCancel(error)) {
+      throw error;
+    }
     console.error('Compute API error:', error);
     console.error('Error details:', {
       message: error.message,
@@ -86,9 +89,23 @@ export async function computeGraph(graphDefinition, settings = {}) {
       url: error.config?.url
     });
     throw error;
+  } finally {
+    // Remove interceptor after request (also when it failed or was aborted)
+    if (requestInterceptor !== null) {
+      axios.interceptors.request.eject(requestInterceptor);
+    }
   }
 }
 
+/**
+ * Whether a computeGraph error came from aborting the request
+ * @param {Error} error - Error thrown by computeGraph
+ * @returns {boolean} True if the request was cancelled
+ */
+export function isComputeCanceled(error) {
+  return axios.isCancel(error);
+}
+
 /**
  * Health check for backend server
  * @returns {Promise<boolean>} True if backend is available
@@ -2,117 +2,167 @@
  * graphConverter - Converts React Flow graph to backend-compatible JSON
  */
 
+const toNumber = (value) => (typeof value === 'number' ? value : (parseFloat(value) || 0));
+
 /**
- * Resolve node connections - when a node input is connected, use the source node's output
+ * Build a topologically indexed adjacency map for the graph
  * @param {Array} nodes - React Flow nodes
  * @param {Array} edges - React Flow edges
- * @returns {Array} Nodes with resolved connections
+ * @returns {Object} { nodeById, incoming, outgoing, order }
+ *   - incoming: nodeId -> Map(targetHandle -> edge)
+ *   - outgoing: nodeId -> Set of downstream node ids
+ *   - order: node ids in topological order (nodes in cycles are appended last)
  */
-function resolveConnections(nodes, edges) {
-  // Create a map of node outputs for quick lookup
-  const nodeOutputs = new Map();
+export function buildGraphIndex(nodes, edges) {
+  const nodeById = new Map();
+  const incoming = new Map();
+  const outgoing = new Map();
   nodes.forEach((node) => {
-    if (node.type === 'point') {
-      // Point node outputs its coordinates - get current values from inputs
-      // Parse coordinates, handling both number and string types
-      // Round to avoid floating point precision issues
-      const x = Math.round((typeof node.data.inputs?.x === 'number' ? node.data.inputs.x : (parseFloat(node.data.inputs?.x) || 0)) * 1000) / 1000;
-      const y = Math.round((typeof node.data.inputs?.y === 'number' ? node.data.inputs.y : (parseFloat(node.data.inputs?.y) || 0)) * 1000) / 1000;
-      const z = Math.round((typeof node.data.inputs?.z === 'number' ? node.data.inputs.z : (parseFloat(node.data.inputs?.z) || 0)) * 1000) / 1000;
-      
-      nodeOutputs.set(node.id, {
-        point: { x, y, z },
-      });
-      
-      console.log(`Point node ${node.id} outputs:`, { x, y, z });
-    } else if (node.type === 'number') {
-      // Number node outputs its value
-      const value = typeof node.data.inputs?.value === 'number' 
-        ? node.data.inputs.value 
-        : (parseFloat(node.data.inputs?.value) || 0);
-      nodeOutputs.set(node.id, {
-        number: value,
-      });
-    }
+    nodeById.set(node.id, node);
+    incoming.set(node.id, new Map());
+    outgoing.set(node.id, new Set());
   });
 
-  // Create a map of edges by target node and handle
-  const edgeMap = new Map();
   edges.forEach((edge) => {
-    const key = `${edge.target}:${edge.targetHandle}`;
-    edgeMap.set(key, edge);
-    console.log(`Edge: ${edge.source}:${edge.sourceHandle} -> ${edge.target}:${edge.targetHandle}`);
+    if (!nodeById.has(edge.source) || !nodeById.has(edge.target)) return;
+    incoming.get(edge.target).set(edge.targetHandle, edge);
+    outgoing.get(edge.source).add(edge.target);
   });
 
-  // Resolve connections for each node
-  return nodes.map((node) => {
-    const resolvedInputs = { ...(node.data.inputs || {}) };
-
-    // Check each input handle for connections
-    if (node.type === 'circle') {
-      // Check if center input is connected
-      const centerEdge = edgeMap.get(`${node.id}:center`);
-      if (centerEdge) {
-        const sourceNode = nodes.find((n) => n.id === centerEdge.source);
-        console.log(`Circle ${node.id} center connected to:`, sourceNode?.type, sourceNode?.id);
-        
-        if (sourceNode && sourceNode.type === 'point') {
-          // Use the connected point's coordinates as center
-          const pointOutput = nodeOutputs.get(centerEdge.source);
-          if (pointOutput && pointOutput.point) {
-            const { x, y, z } = pointOutput.point;
-            
-            // Set center coordinates in multiple formats for backend compatibility
-            // Most backends expect center as an array [x, y, z] or object {x, y, z}
-            // Format 1: Array [x, y, z] (most common for coordinate data in geometry libraries)
-            resolvedInputs.center = [x, y, z];
-            // Format 2: Object {x, y, z}
-            resolvedInputs.centerPoint = { x, y, z };
-            // Format 3: Individual fields (some backends look for these)
-            resolvedInputs.centerX = x;
-            resolvedInputs.centerY = y;
-            resolvedInputs.centerZ = z;
-            // Format 4: Direct x, y, z in inputs (in case backend looks for these directly)
-            resolvedInputs.x = x;
-            resolvedInputs.y = y;
-            resolvedInputs.z = z;
-            
-            console.log(`Circle ${node.id} center resolved to:`, { x, y, z });
-            console.log(`Circle ${node.id} center array:`, resolvedInputs.center);
-            console.log(`Circle ${node.id} full inputs:`, resolvedInputs);
-          }
-        }
-      } else {
-        console.log(`Circle ${node.id} center not connected`);
+  // Kahn's algorithm
+  const inDegree = new Map();
+  incoming.forEach((handles, id) => {
+    inDegree.set(id, new Set([...handles.values()].map((edge) => edge.source)).size);
+  });
+  const order = [];
+  const ready = nodes.filter((node) => inDegree.get(node.id) === 0).map((node) => node.id);
+  while (ready.length > 0) {
+    const id = ready.shift();
+    order.push(id);
+    outgoing.get(id).forEach((targetId) => {
+      inDegree.set(targetId, inDegree.get(targetId) - 1);
+      if (inDegree.get(targetId) === 0) {
+        ready.push(targetId);
       }
+    });
+  }
+  if (order.length < nodes.length) {
+    const placed = new Set(order);
+    nodes.forEach((node) => {
+      if (!placed.has(node.id)) order.push(node.id);
+    });
+  }
+
+  return { nodeById, incoming, outgoing, order };
+}
+
+/**
+ * Compute the values a node exposes to downstream nodes
+ */
+function computeNodeOutputs(node) {
+  if (node.type === 'point') {
+    // Point node outputs its coordinates - get current values from inputs
+    // Round to avoid floating point precision issues
+    const x = Math.round(toNumber(node.data.inputs?.x) * 1000) / 1000;
+    const y = Math.round(toNumber(node.data.inputs?.y) * 1000) / 1000;
+    const z = Math.round(toNumber(node.data.inputs?.z) * 1000) / 1000;
+    return { point: { x, y, z } };
+  }
+  if (node.type === 'number') {
+    // Number node outputs its value
+    return { number: toNumber(node.data.inputs?.value) };
+  }
+  return null;
+}
 
-      // Check if radius input is connected (if we add number node connections later)
-      const radiusEdge = edgeMap.get(`${node.id}:radius`);
-      if (radiusEdge) {
-        const sourceNode = nodes.find((n) => n.id === radiusEdge.source);
-        if (sourceNode && sourceNode.type === 'number') {
-          const numberOutput = nodeOutputs.get(radiusEdge.source);
-          if (numberOutput && numberOutput.number !== undefined) {
-            resolvedInputs.radius = numberOutput.number;
-            console.log(`Circle ${node.id} radius connected to number:`, numberOutput.number);
-          }
-        }
+/**
+ * Resolve a single node's connected inputs from its upstream outputs
+ * @param {Object} node - React Flow node
+ * @param {Object} index - Graph index from buildGraphIndex
+ * @param {Map} nodeOutputs - nodeId -> outputs of already resolved upstream nodes
+ * @returns {Object} Backend node with resolved inputs
+ */
+function resolveNode(node, index, nodeOutputs) {
+  const resolvedInputs = { ...(node.data.inputs || {}) };
+  const handles = index.incoming.get(node.id);
+
+  if (node.type === 'circle') {
+    // Check if center input is connected
+    const centerEdge = handles.get('center');
+    if (centerEdge && index.nodeById.get(centerEdge.source)?.type === 'point') {
+      // Use the connected point's coordinates as center
+      const pointOutput = nodeOutputs.get(centerEdge.source);
+      if (pointOutput && pointOutput.point) {
+        const { x, y, z } = pointOutput.point;
+
+        // Set center coordinates in multiple formats for backend compatibility
+        // Format 1: Array [x, y, z] (most common for coordinate data in geometry libraries)
+        resolvedInputs.center = [x, y, z];
+        // Format 2: Object {x, y, z}
+        resolvedInputs.centerPoint = { x, y, z };
+        // Format 3: Individual fields (some backends look for these)
+        resolvedInputs.centerX = x;
+        resolvedInputs.centerY = y;
+        resolvedInputs.centerZ = z;
+        // Format 4: Direct x, y, z in inputs (in case backend looks for these directly)
+        resolvedInputs.x = x;
+        resolvedInputs.y = y;
+        resolvedInputs.z = z;
       }
     }
 
-    return {
-      id: node.id,
-      type: node.type,
-      position: node.position,
-      data: {
-        label: node.data.label || node.type,
-        inputs: resolvedInputs,
-        outputs: node.data.outputs || {},
-      },
-    };
+    // Check if radius input is connected to a number node
+    const radiusEdge = handles.get('radius');
+    if (radiusEdge && index.nodeById.get(radiusEdge.source)?.type === 'number') {
+      const numberOutput = nodeOutputs.get(radiusEdge.source);
+      if (numberOutput && numberOutput.number !== undefined) {
+        resolvedInputs.radius = numberOutput.number;
+      }
+    }
+  }
+
+  return {
+    id: node.id,
+    type: node.type,
+    position: node.position,
+    data: {
+      label: node.data.label || node.type,
+      inputs: resolvedInputs,
+      outputs: node.data.outputs || {},
+    },
+  };
+}
+
+/**
+ * Resolve node connections - when a node input is connected, use the source node's output
+ * @param {Array} nodes - React Flow nodes
+ * @param {Array} edges - React Flow edges
+ * @returns {Array} Nodes with resolved connections
+ */
+function resolveConnections(nodes, edges) {
+  const index = buildGraphIndex(nodes, edges);
+  const nodeOutputs = new Map();
+  const resolvedById = new Map();
+
+  // Upstream nodes are always resolved before the nodes that read from them
+  index.order.forEach((id) => {
+    const node = index.nodeById.get(id);
+    const outputs = computeNodeOutputs(node);
+    if (outputs) nodeOutputs.set(id, outputs);
+    resolvedById.set(id, resolveNode(node, index, nodeOutputs));
   });
+
+  return nodes.map((node) => resolvedById.get(node.id));
 }
 
+const serializeEdge = (edge) => ({
+  id: edge.id,
+  source: edge.source,
+  sourceHandle: edge.sourceHandle,
+  target: edge.target,
+  targetHandle: edge.targetHandle,
+});
+
 /**
  * Convert React Flow nodes and edges to graph definition format
  * @param {Array} nodes - React Flow nodes
@@ -123,33 +173,179 @@ export function convertToGraphDefinition(nodes, edges) {
   // Resolve connections before sending to backend
   const resolvedNodes = resolveConnections(nodes, edges);
 
-  // Log the final graph definition for debugging
-  console.log('Final graph definition:', JSON.stringify({
-    nodes: resolvedNodes.map(n => ({
-      id: n.id,
-      type: n.type,
-      inputs: n.data.inputs
-    })),
-    edges: edges.map(e => ({
-      source: e.source,
-      target: e.target,
-      sourceHandle: e.sourceHandle,
-      targetHandle: e.targetHandle
-    }))
-  }, null, 2));
-
   return {
     nodes: resolvedNodes,
-    edges: edges.map((edge) => ({
-      id: edge.id,
-      source: edge.source,
-      sourceHandle: edge.sourceHandle,
-      target: edge.target,
-      targetHandle: edge.targetHandle,
-    })),
+    edges: edges.map(serializeEdge),
   };
 }
 
+/**
+ * Node id a returned geometry item belongs to, if the backend reports one
+ */
+const geometryNodeId = (item) => item?.nodeId ?? item?.node_id ?? null;
+
+/**
+ * GraphEvaluator - Incremental, dirty-tracking evaluation of a React Flow graph
+ *
+ * Each node is memoized by a signature of its type, own inputs and incoming
+ * connections. On update, nodes whose signature changed are marked dirty and
+ * the dirt is propagated downstream in topological order; only dirty nodes
+ * are re-resolved. `prepare` returns the dirty subgraph to send to the backend,
+ * together with the clean nodes that feed it directly, so every input edge of a
+ * dirty node is present in the payload; `commit` merges the returned geometry
+ * with the memoized geometry of clean nodes.
+ *
+ * Partial graphs are only sent once the backend has returned geometry tagged
+ * with nodeId/node_id; otherwise results cannot be attributed to nodes and the
+ * full graph is sent whenever anything is dirty.
+ */
+export class GraphEvaluator {
+  constructor() {
+    this.memo = new Map(); // nodeId -> { signature, revision, outputs, resolved }
+    this.revision = 0;
+    this.geometryByNode = new Map(); // nodeId -> geometry items from the last commit
+    this.unattributedGeometry = null;
+    this.supportsPartial = false;
+    this.dirty = new Set();
+    this.index = null;
+    this.edges = [];
+  }
+
+  /**
+   * Re-index the graph and mark changed nodes (and everything downstream) dirty
+   * @returns {Set} Dirty node ids
+   */
+  update(nodes, edges) {
+    const index = buildGraphIndex(nodes, edges);
+    const changed = new Set();
+
+    // Forget deleted nodes
+    this.memo.forEach((_, id) => {
+      if (!index.nodeById.has(id)) {
+        this.memo.delete(id);
+        this.geometryByNode.delete(id);
+        this.dirty.delete(id);
+      }
+    });
+
+    index.order.forEach((id) => {
+      const node = index.nodeById.get(id);
+      const connections = [...index.incoming.get(id).entries()]
+        .map(([handle, edge]) => `${handle}<${edge.source}:${edge.sourceHandle}`)
+        .sort();
+      const signature = JSON.stringify([node.type, node.data.label, node.data.inputs || {}, connections]);
+      const previous = this.memo.get(id);
+      const upstreamChanged = [...index.incoming.get(id).values()].some((edge) => changed.has(edge.source));
+
+      if (!previous || previous.signature !== signature || upstreamChanged) {
+        changed.add(id);
+        const outputs = computeNodeOutputs(node);
+        const nodeOutputs = new Map();
+        index.incoming.get(id).forEach((edge) => {
+          const upstream = this.memo.get(edge.source);
+          if (upstream?.outputs) nodeOutputs.set(edge.source, upstream.outputs);
+        });
+        this.revision += 1;
+        this.memo.set(id, { signature, revision: this.revision, outputs, resolved: resolveNode(node, index, nodeOutputs) });
+      } else if (previous.resolved.position !== node.position) {
+        // Moving a node does not dirty it, but keep the sent position current
+        previous.resolved = { ...previous.resolved, position: node.position };
+      }
+    });
+
+    changed.forEach((id) => this.dirty.add(id));
+    this.index = index;
+    this.edges = edges;
+    return this.dirty;
+  }
+
+  /**
+   * Graph definition for the next request, or null when nothing is dirty
+   * @returns {Object|null} { graph, nodeIds, revisions, partial }
+   */
+  prepare() {
+    if (!this.index || this.dirty.size === 0) {
+      return null;
+    }
+
+    const partial = this.supportsPartial && this.dirty.size < this.index.order.length;
+    let nodeIds = [...this.index.order];
+    if (partial) {
+      // Clean nodes wired into a dirty node are sent too (the backend evaluates them
+      // again); without them the dirty nodes' input edges would be dropped
+      const included = new Set(this.dirty);
+      this.dirty.forEach((id) => {
+        this.index.incoming.get(id)?.forEach((edge) => included.add(edge.source));
+      });
+      nodeIds = nodeIds.filter((id) => included.has(id));
+    }
+    const included = new Set(nodeIds);
+
+    return {
+      partial,
+      nodeIds,
+      revisions: new Map(nodeIds.map((id) => [id, this.memo.get(id).revision])),
+      graph: {
+        nodes: nodeIds.map((id) => this.memo.get(id).resolved),
+        edges: this.edges
+          .filter((edge) => included.has(edge.source) && included.has(edge.target))
+          .map(serializeEdge),
+      },
+    };
+  }
+
+  /**
+   * Record a backend result for a prepared request
+   * @param {Object} prepared - Value returned by prepare()
+   * @param {Array} geometry - Geometry items returned by the backend
+   * @returns {Array|null} Geometry for the whole graph, or null if the partial
+   *   result could not be attributed to nodes and the full graph must be sent
+   */
+  commit(prepared, geometry = []) {
+    const items = geometry || [];
+    const attributed = items.every((item) => geometryNodeId(item) !== null);
+
+    if (!attributed) {
+      if (prepared.partial) {
+        this.supportsPartial = false;
+        return null;
+      }
+      this.geometryByNode.clear();
+      this.unattributedGeometry = items;
+    } else {
+      // Only send partial graphs once the backend has shown it reports node ids
+      this.supportsPartial = items.length > 0 || this.supportsPartial;
+      this.unattributedGeometry = null;
+      prepared.nodeIds.forEach((id) => this.geometryByNode.delete(id));
+      items.forEach((item) => {
+        const id = geometryNodeId(item);
+        if (!this.geometryByNode.has(id)) this.geometryByNode.set(id, []);
+        this.geometryByNode.get(id).push(item);
+      });
+    }
+
+    prepared.revisions.forEach((revision, id) => {
+      // Nodes re-resolved while the request was in flight (edited, or fed by an
+      // edited node) have a newer revision and stay dirty
+      if (this.memo.get(id)?.revision === revision) {
+        this.dirty.delete(id);
+      }
+    });
+    return this.getGeometry();
+  }
+
+  /**
+   * Memoized geometry for the whole graph, in topological order
+   */
+  getGeometry() {
+    if (this.unattributedGeometry) {
+      return this.unattributedGeometry;
+    }
+    const order = this.index ? this.index.order : [...this.geometryByNode.keys()];
+    return order.flatMap((id) => this.geometryByNode.get(id) || []);
+  }
+}
+
 /**
  * Convert graph definition to React Flow format
  * @param {Object} graphDefinition - Graph definition from backend
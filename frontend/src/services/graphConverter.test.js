@@ -0,0 +1,100 @@
+import { GraphEvaluator, buildGraphIndex } from './graphConverter';
+
+const point = (id, x = 0) => ({ id, type: 'point', position: { x: 0, y: 0 }, data: { inputs: { x, y: 0, z: 0 } } });
+const number = (id, value) => ({ id, type: 'number', position: { x: 0, y: 0 }, data: { inputs: { value } } });
+const circle = (id) => ({ id, type: 'circle', position: { x: 0, y: 0 }, data: { inputs: { radius: 1 } } });
+const edge = (source, target, targetHandle) => ({
+  id: `${source}-${target}`,
+  source,
+  sourceHandle: 'out',
+  target,
+  targetHandle,
+});
+
+const graph = () => ({
+  nodes: [point('p', 1), number('r', 5), circle('c'), circle('lonely')],
+  edges: [edge('p', 'c', 'center'), edge('r', 'c', 'radius')],
+});
+
+// Backend stand-in that tags every node's geometry with its id
+const tagged = (prepared) => prepared.nodeIds.map((nodeId) => ({ type: 'mesh', nodeId }));
+
+test('buildGraphIndex orders upstream nodes first', () => {
+  const { nodes, edges } = graph();
+  const { order } = buildGraphIndex([...nodes].reverse(), edges);
+  expect(order.indexOf('p')).toBeLessThan(order.indexOf('c'));
+  expect(order.indexOf('r')).toBeLessThan(order.indexOf('c'));
+});
+
+test('connected point and number outputs are inlined into the circle inputs', () => {
+  const { nodes, edges } = graph();
+  const evaluator = new GraphEvaluator();
+  evaluator.update(nodes, edges);
+  const circleNode = evaluator.prepare().graph.nodes.find((node) => node.id === 'c');
+  expect(circleNode.data.inputs.center).toEqual([1, 0, 0]);
+  expect(circleNode.data.inputs.radius).toBe(5);
+});
+
+test('nothing is sent when no node changed', () => {
+  const { nodes, edges } = graph();
+  const evaluator = new GraphEvaluator();
+  evaluator.update(nodes, edges);
+  evaluator.commit(evaluator.prepare(), []);
+
+  evaluator.update(nodes.map((node) => ({ ...node, position: { x: 10, y: 10 } })), edges);
+  expect(evaluator.prepare()).toBeNull();
+});
+
+test('an edit dirties the node and everything downstream of it', () => {
+  const { nodes, edges } = graph();
+  const evaluator = new GraphEvaluator();
+  evaluator.update(nodes, edges);
+  evaluator.commit(evaluator.prepare(), []);
+
+  const dirty = evaluator.update([point('p', 2), ...nodes.slice(1)], edges);
+  expect([...dirty].sort()).toEqual(['c', 'p']);
+});
+
+test('partial graphs include clean upstream nodes so dirty inputs stay connected', () => {
+  const { nodes, edges } = graph();
+  const evaluator = new GraphEvaluator();
+  evaluator.update(nodes, edges);
+  const full = evaluator.prepare();
+  expect(full.partial).toBe(false);
+  evaluator.commit(full, tagged(full));
+
+  evaluator.update([point('p', 2), ...nodes.slice(1)], edges);
+  const prepared = evaluator.prepare();
+  expect(prepared.partial).toBe(true);
+  expect(prepared.nodeIds).toEqual(expect.arrayContaining(['p', 'r', 'c']));
+  expect(prepared.nodeIds).not.toContain('lonely');
+  expect(prepared.graph.edges.map((e) => e.id).sort()).toEqual(['p-c', 'r-c']);
+
+  const geometry = evaluator.commit(prepared, tagged(prepared));
+  expect(geometry.map((item) => item.nodeId).sort()).toEqual(['c', 'lonely', 'p', 'r']);
+  expect(evaluator.prepare()).toBeNull();
+});
+
+test('an unattributed partial result falls back to the full graph', () => {
+  const { nodes, edges } = graph();
+  const evaluator = new GraphEvaluator();
+  evaluator.update(nodes, edges);
+  const full = evaluator.prepare();
+  evaluator.commit(full, tagged(full));
+
+  evaluator.update([point('p', 2), ...nodes.slice(1)], edges);
+  const partial = evaluator.prepare();
+  expect(evaluator.commit(partial, [{ type: 'mesh' }])).toBeNull();
+  expect(evaluator.prepare().partial).toBe(false);
+});
+
+test('nodes edited while a request is in flight stay dirty', () => {
+  const { nodes, edges } = graph();
+  const evaluator = new GraphEvaluator();
+  evaluator.update(nodes, edges);
+  const prepared = evaluator.prepare();
+
+  evaluator.update([point('p', 3), ...nodes.slice(1)], edges);
+  evaluator.commit(prepared, []);
+  expect([...evaluator.dirty].sort()).toEqual(['c', 'p']);
+});
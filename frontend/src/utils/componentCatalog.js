@@ -0,0 +1,329 @@
+/**
+ * Indexed catalog of Grasshopper components
+ *
+ * Wraps the GH components database (gh_components_native.json) with a GUID
+ * hash index, category/subcategory indexes and a prebuilt trigram search
+ * index, so lookups and most searches no longer scan all ~1,200 components.
+ * Terms too short for a trigram, or with punctuation (e.g. "+"), fall back to
+ * scoring every component.
+ *
+ * The catalog can be built from the full database or from the compact catalog
+ * emitted by `npm run build:catalog` (scripts/build-component-catalog.js), whose
+ * rows are only turned into component objects when first accessed.
+ */
+
+export const CATALOG_URL = '/gh_components_catalog.json';
+export const DATABASE_URL = '/gh_components_native.json';
+
+/**
+ * Compact catalog format (version 1), written by scripts/build-component-catalog.js:
+ *   { version, exportedAt, count, libraries: [[Id, Name, Version, Location, IsCoreLibrary]],
+ *     strings: [...], components: [[Guid, Name, Nickname, Category*, SubCategory*, Kind*, library, inputs, outputs]] }
+ * Fields marked * are indexes into `strings`; inputs/outputs are
+ * [[Name, Nickname, Description, TypeName*, DotNetType*]].
+ */
+const COMPACT_CATALOG_VERSION = 2;
+
+const SEARCH_WEIGHTS = {
+  exact: 100,
+  prefix: 80,
+  wordPrefix: 60,
+  substring: 40,
+  category: 20,
+};
+
+const normalize = (value) => (typeof value === 'string' ? value.toLowerCase().trim() : '');
+
+// Terms the trigram index can answer: at least one trigram, letters/digits/spaces only
+const isIndexableTerm = (term) => term.length >= 3 && /^[a-z0-9 ]+$/.test(term);
+
+const trigramsOf = (text) => {
+  const grams = new Set();
+  for (let i = 0; i + 3 <= text.length; i++) {
+    grams.add(text.slice(i, i + 3));
+  }
+  return grams;
+};
+
+const wordsOf = (text) => text.split(/[^a-z0-9]+/).filter(Boolean);
+
+const addToIndex = (index, key, value) => {
+  let bucket = index.get(key);
+  if (!bucket) {
+    bucket = [];
+    index.set(key, bucket);
+  }
+  if (bucket[bucket.length - 1] !== value) {
+    bucket.push(value);
+  }
+};
+
+// Interned string reference; -1 marks a missing (null) value
+const stringAt = (strings, i) => (i >= 0 ? strings[i] : null);
+
+const hydrateParam = (row, strings) => ({
+  Name: row[0],
+  Nickname: row[1],
+  Description: row[2],
+  TypeName: stringAt(strings, row[3]),
+  DotNetType: stringAt(strings, row[4]),
+});
+
+const hydrateComponent = (row, compact) => {
+  const [guid, name, nickname, category, subCategory, kind, library, inputs, outputs] = row;
+  const { strings, libraries } = compact;
+  const lib = libraries[library];
+  return {
+    Guid: guid,
+    Name: name,
+    Nickname: nickname,
+    Category: stringAt(strings, category),
+    SubCategory: stringAt(strings, subCategory),
+    Kind: stringAt(strings, kind),
+    Library: lib
+      ? { Id: lib[0], Name: lib[1], Version: lib[2], Location: lib[3], IsCoreLibrary: lib[4] }
+      : null,
+    Inputs: inputs.map((param) => hydrateParam(param, strings)),
+    Outputs: outputs.map((param) => hydrateParam(param, strings)),
+  };
+};
+
+// Catalogs built for plain component arrays, so repeated lookups reuse one index
+const catalogsByDatabase = new WeakMap();
+
+export class ComponentCatalog {
+  /**
+   * @param {Array} entries - Search keys for each component: { guid, name, nickname, category, subCategory }
+   * @param {Function} getComponent - Returns the full component object for an entry index
+   * @param {Object} meta - { exportedAt }
+   */
+  constructor(entries, getComponent, meta = {}) {
+    this.entries = entries;
+    this.getComponent = getComponent;
+    this.exportedAt = meta.exportedAt;
+    this.count = entries.length;
+    this._components = null;
+
+    this.byGuid = new Map();
+    this.byCategory = new Map();
+    this.bySubCategory = new Map();
+    this.trigramIndex = new Map(); // trigrams of name/nickname/category -> entry indexes
+
+    entries.forEach((entry, i) => {
+      entry.nameKey = normalize(entry.name);
+      entry.nicknameKey = normalize(entry.nickname);
+      entry.categoryKey = normalize(entry.category);
+      entry.subCategoryKey = normalize(entry.subCategory);
+
+      const guidKey = normalize(entry.guid);
+      if (guidKey) {
+        this.byGuid.set(guidKey, i);
+      }
+      if (entry.category) {
+        addToIndex(this.byCategory, entry.category, i);
+        if (entry.subCategory) {
+          addToIndex(this.bySubCategory, `${entry.category}/${entry.subCategory}`, i);
+        }
+      }
+
+      const searchable = [entry.nameKey, entry.nicknameKey, entry.categoryKey, entry.subCategoryKey];
+      searchable.forEach((text) => {
+        trigramsOf(text).forEach((gram) => addToIndex(this.trigramIndex, gram, i));
+      });
+    });
+  }
+
+  /**
+   * Build a catalog from the full database JSON ({ Components: [...] }) or a component array
+   */
+  static fromDatabase(databaseJson) {
+    const components = Array.isArray(databaseJson) ? databaseJson : databaseJson?.Components || [];
+    const entries = components.map((comp) => ({
+      guid: comp.Guid,
+      name: comp.Name,
+      nickname: comp.Nickname,
+      category: comp.Category,
+      subCategory: comp.SubCategory,
+    }));
+    const catalog = new ComponentCatalog(entries, (i) => components[i], { exportedAt: databaseJson?.ExportedAt });
+    catalog._components = components;
+    catalogsByDatabase.set(components, catalog);
+    return catalog;
+  }
+
+  /**
+   * Build a catalog from the compact format; component objects are created on first access
+   */
+  static fromCompact(compact) {
+    if (compact?.version !== COMPACT_CATALOG_VERSION) {
+      throw new Error(`Unsupported component catalog version: ${compact?.version}`);
+    }
+    const { strings } = compact;
+    const entries = compact.components.map((row) => ({
+      guid: row[0],
+      name: row[1],
+      nickname: row[2],
+      category: stringAt(strings, row[3]),
+      subCategory: stringAt(strings, row[4]),
+    }));
+    const hydrated = new Array(entries.length);
+    const getComponent = (i) => {
+      if (!hydrated[i]) hydrated[i] = hydrateComponent(compact.components[i], compact);
+      return hydrated[i];
+    };
+    return new ComponentCatalog(entries, getComponent, { exportedAt: compact.exportedAt });
+  }
+
+  /**
+   * All components as an array (hydrates every compact row)
+   */
+  get components() {
+    if (!this._components) {
+      this._components = this.entries.map((_, i) => this.getComponent(i));
+      catalogsByDatabase.set(this._components, this);
+    }
+    return this._components;
+  }
+
+  findByGuid(guid) {
+    const key = normalize(guid);
+    const i = key ? this.byGuid.get(key) : undefined;
+    return i === undefined ? null : this.getComponent(i);
+  }
+
+  getCategories() {
+    return Array.from(this.byCategory.keys()).sort();
+  }
+
+  getSubCategories(category) {
+    const prefix = `${category}/`;
+    return Array.from(this.bySubCategory.keys())
+      .filter((key) => key.startsWith(prefix))
+      .map((key) => key.slice(prefix.length))
+      .sort();
+  }
+
+  filterByCategory(category, subCategory = null) {
+    const bucket = subCategory
+      ? this.bySubCategory.get(`${category}/${subCategory}`)
+      : this.byCategory.get(category);
+    return (bucket || []).map((i) => this.getComponent(i));
+  }
+
+  /**
+   * Candidate entry indexes that can contain the term as a substring
+   */
+  _candidates(term) {
+    if (!isIndexableTerm(term)) {
+      // Linear scan: _score decides; every entry is a candidate
+      return this.entries.map((_, i) => i);
+    }
+    // Intersect trigram posting lists, smallest first
+    const lists = [...trigramsOf(term)].map((gram) => this.trigramIndex.get(gram) || []);
+    lists.sort((a, b) => a.length - b.length);
+    let candidates = lists[0];
+    for (let l = 1; l < lists.length && candidates.length > 0; l++) {
+      const next = new Set(lists[l]);
+      candidates = candidates.filter((i) => next.has(i));
+    }
+    return candidates;
+  }
+
+  _score(entry, term, includeCategory) {
+    let best = 0;
+    [entry.nicknameKey, entry.nameKey].forEach((text) => {
+      if (!text) return;
+      if (text === term) best = Math.max(best, SEARCH_WEIGHTS.exact);
+      else if (text.startsWith(term)) best = Math.max(best, SEARCH_WEIGHTS.prefix);
+      else if (wordsOf(text).some((word) => word.startsWith(term))) best = Math.max(best, SEARCH_WEIGHTS.wordPrefix);
+      else if (text.includes(term)) best = Math.max(best, SEARCH_WEIGHTS.substring);
+    });
+    if (best === 0 && includeCategory &&
+      (entry.categoryKey.includes(term) || entry.subCategoryKey.includes(term))) {
+      best = SEARCH_WEIGHTS.category;
+    }
+    return best;
+  }
+
+  /**
+   * Ranked search over names, nicknames and (optionally) categories
+   * @param {string} query - Search text
+   * @param {Object} options
+   * @param {number} options.limit - Maximum number of results
+   * @param {boolean} options.includeCategory - Also match category/subcategory names
+   * @returns {Array} Matching components, best first
+   */
+  search(query, { limit = Infinity, includeCategory = true } = {}) {
+    const term = normalize(query);
+    if (!term) {
+      return [];
+    }
+
+    const scored = [];
+    this._candidates(term).forEach((i) => {
+      const entry = this.entries[i];
+      const score = this._score(entry, term, includeCategory);
+      if (score > 0) {
+        scored.push({ i, score, entry });
+      }
+    });
+
+    // Best score first, then shorter (more specific) names, then alphabetical
+    scored.sort((a, b) =>
+      b.score - a.score ||
+      a.entry.nameKey.length - b.entry.nameKey.length ||
+      a.entry.nameKey.localeCompare(b.entry.nameKey)
+    );
+
+    return scored.slice(0, limit).map(({ i }) => this.getComponent(i));
+  }
+}
+
+/**
+ * Get the indexed catalog for a component array (built once per array) or pass a catalog through
+ * @param {Array|ComponentCatalog} componentsDatabase
+ * @returns {ComponentCatalog|null}
+ */
+export const getComponentCatalog = (componentsDatabase) => {
+  if (componentsDatabase instanceof ComponentCatalog) {
+    return componentsDatabase;
+  }
+  if (!Array.isArray(componentsDatabase)) {
+    return null;
+  }
+  return catalogsByDatabase.get(componentsDatabase) || ComponentCatalog.fromDatabase(componentsDatabase);
+};
+
+let catalogPromise = null;
+
+/**
+ * Lazily fetch the component catalog (once per session)
+ *
+ * Prefers the compact catalog produced at build time and falls back to the full
+ * gh_components_native.json when it has not been generated.
+ * @returns {Promise<ComponentCatalog>}
+ */
+export const loadComponentCatalog = () => {
+  if (!catalogPromise) {
+    catalogPromise = (async () => {
+      try {
+        const response = await fetch(CATALOG_URL);
+        if (response.ok && (response.headers.get('content-type') || '').includes('json')) {
+          return ComponentCatalog.fromCompact(await response.json());
+        }
+      } catch (error) {
+        console.warn('[componentCatalog] Compact catalog unavailable, loading full database:', error);
+      }
+
+      const response = await fetch(DATABASE_URL);
+      if (!response.ok) {
+        throw new Error(`Failed to fetch database: ${response.statusText}`);
+      }
+      return ComponentCatalog.fromDatabase(await response.json());
+    })().catch((error) => {
+      catalogPromise = null;
+      throw error;
+    });
+  }
+  return catalogPromise;
+};
@@ -0,0 +1,103 @@
+import { ComponentCatalog, getComponentCatalog } from './componentCatalog';
+
+const component = (Guid, Name, Nickname, Category = 'Maths', SubCategory = 'Operators') => ({
+  Guid,
+  Name,
+  Nickname,
+  Category,
+  SubCategory,
+  Inputs: [],
+  Outputs: [],
+});
+
+const components = [
+  component('A0D62394-A118-422D-ABB3-6AF115C75B25', 'Addition', 'A+B'),
+  component('ce46b74e-00c9-43c4-805a-193b69ea4a11', 'Multiplication', 'A×B'),
+  component('3581f42a-9592-4549-bd6b-1c0fc39d067b', 'Construct Point', 'Pt', 'Vector', 'Point'),
+  component('2f53e2ed-7d2d-4c58-8d1f-4fc6b1f4b3a4', 'Area', 'Area', 'Surface', 'Analysis'),
+  component('d93100b6-d50b-40b2-831a-814659dc38e3', 'Rectangle', 'Rec', 'Curve', 'Primitive'),
+];
+
+const names = (results) => results.map((comp) => comp.Name);
+
+test('findByGuid ignores case and rejects non-string guids', () => {
+  const catalog = ComponentCatalog.fromDatabase(components);
+  expect(catalog.findByGuid('a0d62394-a118-422d-abb3-6af115c75b25').Name).toBe('Addition');
+  expect(catalog.findByGuid('  CE46B74E-00C9-43C4-805A-193B69EA4A11 ').Name).toBe('Multiplication');
+  expect(catalog.findByGuid(42)).toBeNull();
+  expect(catalog.findByGuid({ guid: 'x' })).toBeNull();
+  expect(catalog.findByGuid(undefined)).toBeNull();
+  expect(catalog.findByGuid('')).toBeNull();
+});
+
+test('search ranks exact, then prefix, then substring matches', () => {
+  const catalog = ComponentCatalog.fromDatabase(components);
+  expect(names(catalog.search('area'))).toEqual(['Area']);
+  expect(names(catalog.search('rect'))).toEqual(['Rectangle']);
+  expect(names(catalog.search('point'))[0]).toBe('Construct Point');
+  expect(names(catalog.search('ltip'))).toEqual(['Multiplication']);
+});
+
+test('short and punctuation terms fall back to a full scan', () => {
+  const catalog = ComponentCatalog.fromDatabase(components);
+  expect(names(catalog.search('+'))).toEqual(['Addition']);
+  expect(names(catalog.search('pt'))).toEqual(['Construct Point']);
+  // Substrings in the middle of a word have no prefix to index
+  expect(names(catalog.search('ul'))).toEqual(['Multiplication']);
+  expect(names(catalog.search('a+b'))).toEqual(['Addition']);
+});
+
+test('category matches are optional', () => {
+  const catalog = ComponentCatalog.fromDatabase(components);
+  expect(names(catalog.search('vector'))).toEqual(['Construct Point']);
+  expect(catalog.search('vector', { includeCategory: false })).toEqual([]);
+  expect(catalog.getCategories()).toEqual(['Curve', 'Maths', 'Surface', 'Vector']);
+  expect(names(catalog.filterByCategory('Maths', 'Operators'))).toEqual(['Addition', 'Multiplication']);
+});
+
+test('compact catalogs hydrate rows only when accessed', () => {
+  const compact = {
+    version: 2,
+    exportedAt: '2025-01-01',
+    libraries: [['lib', 'Grasshopper', '1.0', '', true]],
+    strings: ['Maths', 'Operators', 'Component', 'Number', 'System.Double'],
+    components: [
+      ['a0d62394-a118-422d-abb3-6af115c75b25', 'Addition', 'A+B', 0, 1, 2, 0,
+        [['A', 'A', 'First item', 3, 4]], [['Result', 'R', 'Sum', 3, 4]]],
+    ],
+  };
+  const catalog = ComponentCatalog.fromCompact(compact);
+  expect(catalog.count).toBe(1);
+  expect(catalog._components).toBeNull();
+
+  const addition = catalog.findByGuid('A0D62394-A118-422D-ABB3-6AF115C75B25');
+  expect(addition.Inputs[0]).toEqual({ Name: 'A', Nickname: 'A', Description: 'First item', TypeName: 'Number', DotNetType: 'System.Double' });
+  expect(addition.Library.Name).toBe('Grasshopper');
+  expect(catalog.findByGuid('a0d62394-a118-422d-abb3-6af115c75b25')).toBe(addition);
+  expect(() => ComponentCatalog.fromCompact({ version: 99 })).toThrow('Unsupported component catalog version');
+});
+
+test('compact catalogs keep missing values as null', () => {
+  const compact = {
+    version: 2,
+    libraries: [],
+    strings: ['', 'Component'],
+    components: [
+      ['a0d62394-a118-422d-abb3-6af115c75b25', 'Addition', null, 0, -1, 1, -1,
+        [['A', '', null, -1, -1]], []],
+    ],
+  };
+  const addition = ComponentCatalog.fromCompact(compact).findByGuid('a0d62394-a118-422d-abb3-6af115c75b25');
+  expect(addition.Nickname).toBeNull();
+  expect(addition.Category).toBe('');
+  expect(addition.SubCategory).toBeNull();
+  expect(addition.Library).toBeNull();
+  expect(addition.Inputs[0]).toEqual({ Name: 'A', Nickname: '', Description: null, TypeName: null, DotNetType: null });
+});
+
+test('getComponentCatalog reuses one index per array and passes catalogs through', () => {
+  const first = getComponentCatalog(components);
+  expect(getComponentCatalog(components)).toBe(first);
+  expect(getComponentCatalog(first)).toBe(first);
+  expect(getComponentCatalog(null)).toBeNull();
+});
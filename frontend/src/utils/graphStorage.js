@@ -0,0 +1,290 @@
+/**
+ * Liveblocks storage layout for collaborative graphs (NodeParserDemo)
+ *
+ * Simplified graphs ({ nodes, links }) are stored per node and per link so edits
+ * only send the fields that changed:
+ * - graphNodes: LiveMap<nodeId, LiveObject<node>> (node.properties is a nested LiveObject)
+ * - graphLinks: LiveMap<linkKey, LiveObject<link>>
+ * - graphNodeOrder / graphLinkOrder: LiveList of keys, preserving array order
+ * - graphLayoutVersion: set once a room uses this layout
+ *
+ * Other formats (componentInstances/connections) and rooms created before this
+ * layout keep a plain `graphData` object. While `graphData` exists the UI renders
+ * it, so every write below goes there too; simplified legacy rooms are moved to
+ * the per-node layout by migrateLegacyGraph.
+ *
+ * The functions take the mutable storage root (a LiveObject, as passed to
+ * useMutation) and are meant to run inside a mutation, i.e. one batch.
+ */
+import { LiveList, LiveMap, LiveObject } from '@liveblocks/client';
+
+export const GRAPH_LAYOUT_VERSION = 1;
+
+const isPlainObject = (value) => value !== null && typeof value === 'object' && !Array.isArray(value);
+
+export const isSimplifiedGraph = (graphData) => Array.isArray(graphData?.nodes) && Array.isArray(graphData?.links);
+
+export const getLinkKey = (link) => `${link.fromNode}:${link.fromParam}->${link.toNode}:${link.toParam}`;
+
+const nodeKey = (node) => String(node.id);
+
+const jsonEqual = (a, b) => a === b || JSON.stringify(a) === JSON.stringify(b);
+
+const toLiveNode = (node) => {
+  const { properties, ...fields } = node;
+  return new LiveObject({
+    ...fields,
+    properties: new LiveObject(isPlainObject(properties) ? properties : {}),
+  });
+};
+
+const toLiveLink = (link) => new LiveObject(link);
+
+/**
+ * Apply only the changed top-level fields of `next` to a LiveObject
+ */
+const syncLiveObject = (liveObject, next) => {
+  const current = liveObject.toObject();
+  Object.keys(current).forEach((key) => {
+    if (!(key in next)) {
+      liveObject.delete(key);
+    }
+  });
+  Object.entries(next).forEach(([key, value]) => {
+    const existing = current[key];
+    if (existing instanceof LiveObject && isPlainObject(value)) {
+      syncLiveObject(existing, value);
+    } else if (!jsonEqual(existing, value)) {
+      liveObject.set(key, value);
+    }
+  });
+};
+
+/**
+ * Reconcile a keyed LiveMap + order LiveList with a plain array, field by field
+ */
+const syncLiveCollection = (liveMap, orderList, items, getKey, toLive) => {
+  const nextKeys = items.map(getKey);
+  const nextKeySet = new Set(nextKeys);
+
+  // Removed items
+  Array.from(liveMap.keys()).forEach((key) => {
+    if (!nextKeySet.has(key)) {
+      liveMap.delete(key);
+    }
+  });
+
+  // Added and changed items
+  items.forEach((item, i) => {
+    const key = nextKeys[i];
+    const existing = liveMap.get(key);
+    if (existing) {
+      syncLiveObject(existing, item);
+    } else {
+      liveMap.set(key, toLive(item));
+    }
+  });
+
+  // Order only changes on add/remove/reorder
+  const currentOrder = orderList.toArray();
+  if (currentOrder.length !== nextKeys.length || currentOrder.some((key, i) => key !== nextKeys[i])) {
+    orderList.clear();
+    nextKeys.forEach((key) => orderList.push(key));
+  }
+};
+
+/**
+ * Create the per-node containers that are missing; existing ones are kept, so
+ * concurrent edits made against them survive
+ */
+const ensureGraphStorage = (storage) => {
+  if (!storage.get('graphNodes')) storage.set('graphNodes', new LiveMap());
+  if (!storage.get('graphLinks')) storage.set('graphLinks', new LiveMap());
+  if (!storage.get('graphNodeOrder')) storage.set('graphNodeOrder', new LiveList([]));
+  if (!storage.get('graphLinkOrder')) storage.set('graphLinkOrder', new LiveList([]));
+};
+
+/**
+ * Merge `fields` into a plain node; plain-object fields (properties) are merged
+ * one level deep, like LiveObject.update on the nested LiveObject
+ */
+const mergeNodeFields = (node, fields) => {
+  const next = { ...node };
+  Object.entries(fields).forEach(([key, value]) => {
+    next[key] = isPlainObject(node[key]) && isPlainObject(value) ? { ...node[key], ...value } : value;
+  });
+  return next;
+};
+
+/**
+ * Update nodes of a legacy graphData object
+ * @param {Function} update - Returns the node unchanged or a replacement
+ * @returns {Set<string>} Ids of the nodes that were replaced
+ */
+const updateLegacyNodes = (storage, update) => {
+  const legacy = storage.get('graphData');
+  const updated = new Set();
+  if (!Array.isArray(legacy?.nodes)) {
+    return updated;
+  }
+  const nodes = legacy.nodes.map((node) => {
+    const next = update(node);
+    if (next !== node) updated.add(nodeKey(node));
+    return next;
+  });
+  if (updated.size > 0) {
+    storage.set('graphData', { ...legacy, nodes });
+  }
+  return updated;
+};
+
+/**
+ * Initial room storage for a graph, in the per-node/per-link layout
+ * @param {Object} graphData - Graph in simplified ({ nodes, links }) or legacy format
+ * @returns {Object} Storage entries for RoomProvider's initialStorage
+ */
+export function createGraphStorage(graphData) {
+  if (!isSimplifiedGraph(graphData)) {
+    return { graphData };
+  }
+  return {
+    graphNodes: new LiveMap(graphData.nodes.map((node) => [nodeKey(node), toLiveNode(node)])),
+    graphLinks: new LiveMap(graphData.links.map((link) => [getLinkKey(link), toLiveLink(link)])),
+    graphNodeOrder: new LiveList(graphData.nodes.map(nodeKey)),
+    graphLinkOrder: new LiveList(graphData.links.map(getLinkKey)),
+    graphLayoutVersion: GRAPH_LAYOUT_VERSION,
+  };
+}
+
+/**
+ * Replace the whole graph: simplified graphs go to the per-node layout (only
+ * changed fields are written), anything else is stored as one graphData object
+ */
+export function writeGraph(storage, graph) {
+  if (!isSimplifiedGraph(graph)) {
+    storage.set('graphData', graph);
+    return;
+  }
+  ensureGraphStorage(storage);
+  storage.delete('graphData');
+  syncLiveCollection(storage.get('graphNodes'), storage.get('graphNodeOrder'), graph.nodes, nodeKey, toLiveNode);
+  syncLiveCollection(storage.get('graphLinks'), storage.get('graphLinkOrder'), graph.links, getLinkKey, toLiveLink);
+}
+
+/**
+ * Replace the node list, keeping the links
+ */
+export function writeGraphNodes(storage, nodes) {
+  const legacy = storage.get('graphData');
+  if (legacy) {
+    writeGraph(storage, { ...legacy, nodes });
+    return;
+  }
+  ensureGraphStorage(storage);
+  syncLiveCollection(storage.get('graphNodes'), storage.get('graphNodeOrder'), nodes, nodeKey, toLiveNode);
+}
+
+/**
+ * Replace the link list, keeping the nodes
+ */
+export function writeGraphLinks(storage, links) {
+  const legacy = storage.get('graphData');
+  if (legacy) {
+    writeGraph(storage, { ...legacy, links });
+    return;
+  }
+  ensureGraphStorage(storage);
+  syncLiveCollection(storage.get('graphLinks'), storage.get('graphLinkOrder'), links, getLinkKey, toLiveLink);
+}
+
+/**
+ * Update some fields of one node, e.g. { properties: { Value: 5 } }
+ * @returns {boolean} false when the node does not exist
+ */
+export function updateGraphNodeFields(storage, nodeId, fields) {
+  const id = String(nodeId);
+  if (storage.get('graphData')) {
+    return updateLegacyNodes(storage, (node) => (nodeKey(node) === id ? mergeNodeFields(node, fields) : node)).has(id);
+  }
+  const node = storage.get('graphNodes')?.get(id);
+  if (!node) {
+    return false;
+  }
+  Object.entries(fields).forEach(([key, value]) => {
+    const existing = node.get(key);
+    if (existing instanceof LiveObject && isPlainObject(value)) {
+      existing.update(value);
+    } else {
+      node.set(key, value);
+    }
+  });
+  return true;
+}
+
+/**
+ * Write a batch of node positions; unchanged positions are skipped
+ * @param {Object} positions - { [nodeId]: { x, y } }
+ */
+export function writeNodePositions(storage, positions) {
+  if (storage.get('graphData')) {
+    updateLegacyNodes(storage, (node) => {
+      const position = positions[nodeKey(node)];
+      return position && (node.x !== position.x || node.y !== position.y)
+        ? { ...node, x: position.x, y: position.y }
+        : node;
+    });
+    return;
+  }
+  const graphNodes = storage.get('graphNodes');
+  if (!graphNodes) return;
+  Object.entries(positions).forEach(([nodeId, { x, y }]) => {
+    const node = graphNodes.get(nodeId);
+    if (node && (node.get('x') !== x || node.get('y') !== y)) {
+      node.update({ x, y });
+    }
+  });
+}
+
+/**
+ * Move a simplified legacy graphData room to the per-node layout
+ *
+ * The version flag is checked and set in the same batch. The migration reconciles
+ * into containers that already exist instead of replacing them, so running it
+ * again (or after another client created them) keeps their contents. Two clients
+ * creating the containers at the same moment would still race, so callers should
+ * let a single client run it (see useGraphCollaboration).
+ *
+ * @returns {boolean} true when the room was migrated
+ */
+export function migrateLegacyGraph(storage) {
+  if (storage.get('graphLayoutVersion') >= GRAPH_LAYOUT_VERSION) {
+    return false;
+  }
+  const legacy = storage.get('graphData');
+  if (!isSimplifiedGraph(legacy)) {
+    return false;
+  }
+  writeGraph(storage, legacy);
+  storage.set('graphLayoutVersion', GRAPH_LAYOUT_VERSION);
+  return true;
+}
+
+/**
+ * Ordered values of an immutable map snapshot; keys missing from the order list
+ * (e.g. from concurrent inserts) are appended
+ */
+export const orderedValues = (map, order) => {
+  if (!map) return [];
+  const seen = new Set();
+  const values = [];
+  (order || []).forEach((key) => {
+    if (!seen.has(key) && map.has(key)) {
+      seen.add(key);
+      values.push(map.get(key));
+    }
+  });
+  map.forEach((value, key) => {
+    if (!seen.has(key)) values.push(value);
+  });
+  return values;
+};
@@ -0,0 +1,151 @@
+import { LiveObject } from '@liveblocks/client';
+import {
+  GRAPH_LAYOUT_VERSION,
+  createGraphStorage,
+  getLinkKey,
+  migrateLegacyGraph,
+  orderedValues,
+  updateGraphNodeFields,
+  writeGraph,
+  writeGraphLinks,
+  writeGraphNodes,
+  writeNodePositions,
+} from './graphStorage';
+
+const node = (id, x = 0, properties = {}) => ({ id, type: 'Number', x, y: 0, properties });
+const link = (fromNode, toNode) => ({ fromNode, fromParam: 'out', toNode, toParam: 'in' });
+
+const graph = {
+  nodes: [node(1, 0, { Value: 1 }), node(2, 100)],
+  links: [link(1, 2)],
+};
+
+// Storage root as seen inside a mutation
+const roomStorage = (initial) => new LiveObject(initial);
+
+const storedNode = (storage, id) => {
+  const { properties, ...fields } = storage.get('graphNodes').get(String(id)).toObject();
+  return { ...fields, properties: properties.toObject() };
+};
+
+describe('createGraphStorage', () => {
+  test('stores simplified graphs per node and per link', () => {
+    const storage = roomStorage(createGraphStorage(graph));
+    expect(storage.get('graphData')).toBeUndefined();
+    expect(storage.get('graphNodeOrder').toArray()).toEqual(['1', '2']);
+    expect(storage.get('graphLinkOrder').toArray()).toEqual([getLinkKey(link(1, 2))]);
+    expect(storedNode(storage, 1)).toEqual(node(1, 0, { Value: 1 }));
+    expect(storage.get('graphLayoutVersion')).toBe(GRAPH_LAYOUT_VERSION);
+  });
+
+  test('keeps other formats as a single graphData object', () => {
+    const legacy = { componentInstances: [], connections: [] };
+    expect(createGraphStorage(legacy)).toEqual({ graphData: legacy });
+  });
+});
+
+describe('writeGraph', () => {
+  test('keeps unchanged nodes and only rewrites changed fields', () => {
+    const storage = roomStorage(createGraphStorage(graph));
+    const first = storage.get('graphNodes').get('1');
+
+    writeGraph(storage, { nodes: [node(1, 0, { Value: 5 }), node(3)], links: [] });
+
+    expect(storage.get('graphNodes').get('1')).toBe(first);
+    expect(storedNode(storage, 1).properties).toEqual({ Value: 5 });
+    expect(storage.get('graphNodes').get('2')).toBeUndefined();
+    expect(storage.get('graphNodeOrder').toArray()).toEqual(['1', '3']);
+    expect(storage.get('graphLinkOrder').toArray()).toEqual([]);
+  });
+});
+
+describe('legacy graphData rooms', () => {
+  const legacyRoom = () => roomStorage({ graphData: graph });
+
+  test('field and position edits update graphData, which the UI renders', () => {
+    const storage = legacyRoom();
+
+    expect(updateGraphNodeFields(storage, 1, { properties: { Label: 'a' } })).toBe(true);
+    writeNodePositions(storage, { 2: { x: 250, y: 40 } });
+
+    const { nodes } = storage.get('graphData');
+    expect(nodes[0].properties).toEqual({ Value: 1, Label: 'a' });
+    expect(nodes[1]).toMatchObject({ x: 250, y: 40 });
+    expect(storage.get('graphNodes')).toBeUndefined();
+    expect(updateGraphNodeFields(storage, 9, { x: 1 })).toBe(false);
+
+    // Edits made before the migration are carried over
+    expect(migrateLegacyGraph(storage)).toBe(true);
+    expect(storedNode(storage, 1).properties).toEqual({ Value: 1, Label: 'a' });
+    expect(storedNode(storage, 2)).toMatchObject({ x: 250, y: 40 });
+  });
+
+  test('replacing the node or link list of a simplified legacy room moves it to the per-node layout', () => {
+    const storage = legacyRoom();
+    writeGraphNodes(storage, [node(1, 10)]);
+    expect(storage.get('graphData')).toBeUndefined();
+    expect(storage.get('graphNodeOrder').toArray()).toEqual(['1']);
+    expect(storage.get('graphLinkOrder').toArray()).toEqual([getLinkKey(link(1, 2))]);
+
+    const other = legacyRoom();
+    writeGraphLinks(other, []);
+    expect(other.get('graphData')).toBeUndefined();
+    expect(other.get('graphNodeOrder').toArray()).toEqual(['1', '2']);
+    expect(other.get('graphLinkOrder').toArray()).toEqual([]);
+  });
+
+  test('other legacy formats stay in graphData', () => {
+    const storage = roomStorage({ graphData: { componentInstances: [], connections: [] } });
+    writeGraphLinks(storage, [link(1, 2)]);
+    expect(storage.get('graphData').links).toEqual([link(1, 2)]);
+    expect(migrateLegacyGraph(storage)).toBe(false);
+  });
+});
+
+describe('migrateLegacyGraph', () => {
+  test('migrates once and sets the layout version in the same batch', () => {
+    const storage = roomStorage({ graphData: graph });
+    expect(migrateLegacyGraph(storage)).toBe(true);
+    expect(storage.get('graphData')).toBeUndefined();
+    expect(storage.get('graphLayoutVersion')).toBe(GRAPH_LAYOUT_VERSION);
+    expect(storedNode(storage, 2)).toEqual(node(2, 100));
+
+    // An old client writing graphData again does not trigger a second migration
+    storage.set('graphData', graph);
+    expect(migrateLegacyGraph(storage)).toBe(false);
+  });
+
+  test('reconciles into per-node containers that already exist', () => {
+    const storage = roomStorage({ ...createGraphStorage({ nodes: [node(1)], links: [] }), graphData: graph });
+    storage.delete('graphLayoutVersion');
+    const existing = storage.get('graphNodes');
+    const first = existing.get('1');
+
+    expect(migrateLegacyGraph(storage)).toBe(true);
+    expect(storage.get('graphNodes')).toBe(existing);
+    expect(existing.get('1')).toBe(first);
+    expect(storedNode(storage, 1)).toEqual(node(1, 0, { Value: 1 }));
+    expect(storage.get('graphNodeOrder').toArray()).toEqual(['1', '2']);
+  });
+});
+
+describe('per-node rooms', () => {
+  test('field updates merge properties and report missing nodes', () => {
+    const storage = roomStorage(createGraphStorage(graph));
+    expect(updateGraphNodeFields(storage, '1', { properties: { Label: 'a' }, type: 'Slider' })).toBe(true);
+    expect(storedNode(storage, 1)).toMatchObject({ type: 'Slider', properties: { Value: 1, Label: 'a' } });
+    expect(updateGraphNodeFields(storage, '9', { x: 1 })).toBe(false);
+  });
+
+  test('positions are written to the node objects', () => {
+    const storage = roomStorage(createGraphStorage(graph));
+    writeNodePositions(storage, { 1: { x: 5, y: 6 }, 9: { x: 0, y: 0 } });
+    expect(storedNode(storage, 1)).toMatchObject({ x: 5, y: 6 });
+  });
+});
+
+test('orderedValues follows the order list and appends unordered keys', () => {
+  const map = new Map([['a', 1], ['b', 2], ['c', 3]]);
+  expect(orderedValues(map, ['b', 'a', 'x'])).toEqual([2, 1, 3]);
+  expect(orderedValues(undefined, ['a'])).toEqual([]);
+});
@@ -20,6 +20,24 @@ export async function ghFileToBase64(file) {
   });
 }
 
+/**
+ * Error message from a failed gateway response. Errors from the gateway are JSON
+ * ({ error: { message } }); proxies and crashed upstreams may send text or HTML.
+ */
+async function readErrorMessage(response, fallback) {
+  const contentType = response.headers.get('content-type') || '';
+  try {
+    if (contentType.includes('application/json')) {
+      const error = await response.json();
+      return error.error?.message || fallback;
+    }
+    const text = (await response.text()).trim();
+    return text ? `${fallback} (${response.status}): ${text.slice(0, 200)}` : fallback;
+  } catch (err) {
+    return fallback;
+  }
+}
+
 /**
  * Step 1: Upload .gh file to get a pointer
  * @param {string} ghFileBase64 - Base64 encoded .gh file
@@ -40,8 +58,7 @@ export async function uploadGrasshopper(ghFileBase64, fileName = 'definition.gh'
   });
 
   if (!response.ok) {
-    const error = await response.json();
-    throw new Error(error.error?.message || 'Grasshopper upload failed');
+    throw new Error(await readErrorMessage(response, 'Grasshopper upload failed'));
   }
 
   return response.json();
@@ -97,13 +114,220 @@ export async function solveGrasshopper({
   });
 
   if (!response.ok) {
-    const error = await response.json();
-    throw new Error(error.error?.message || 'Grasshopper solve failed');
+    throw new Error(await readErrorMessage(response, 'Grasshopper solve failed'));
   }
 
   return response.json();
 }
 
+/**
+ * Binary framed solve transport (see backend-compute-gateway/src/services/solveFrames.js)
+ *
+ * Stream: "GHSF" | u8 version | 3 reserved bytes, then frames of
+ * u8 type | u32 headerLength | u32 payloadLength | JSON header | payload (little-endian).
+ */
+export const SOLVE_FRAMES_CONTENT_TYPE = 'application/x-gh-solve-frames';
+
+export const SOLVE_FRAME_TYPES = {
+  META: 1,
+  BRANCH: 2,
+  END: 3,
+};
+
+const SOLVE_FRAMES_MAGIC = 'GHSF';
+const SOLVE_FRAMES_VERSION = 1;
+const STREAM_HEADER_BYTES = 8;
+const FRAME_PREFIX_BYTES = 9;
+
+/**
+ * Parse solve frames from a byte stream as they arrive
+ * @param {ReadableStream<Uint8Array>} stream - e.g. fetch response.body
+ * @yields {{ type: number, header: Object, payload: Uint8Array }}
+ */
+export async function* readSolveFrames(stream) {
+  const reader = stream.getReader();
+  const textDecoder = new TextDecoder();
+
+  // Received chunks are only joined once a whole frame part is available
+  let chunks = [];
+  let available = 0;
+  const take = (length) => {
+    available -= length;
+    if (chunks[0].length >= length) {
+      const out = chunks[0].subarray(0, length);
+      chunks[0] = chunks[0].subarray(length);
+      if (chunks[0].length === 0) chunks.shift();
+      return out;
+    }
+    const out = new Uint8Array(length);
+    let filled = 0;
+    while (filled < length) {
+      const chunk = chunks[0];
+      const count = Math.min(chunk.length, length - filled);
+      out.set(chunk.subarray(0, count), filled);
+      filled += count;
+      if (count === chunk.length) chunks.shift();
+      else chunks[0] = chunk.subarray(count);
+    }
+    return out;
+  };
+
+  let needed = STREAM_HEADER_BYTES;
+  let frame = null;
+  let streamStarted = false;
+
+  try {
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (value && value.length > 0) {
+        chunks.push(value);
+        available += value.length;
+      }
+
+      while (available >= needed) {
+        const bytes = take(needed);
+        if (!streamStarted) {
+          const magic = textDecoder.decode(bytes.subarray(0, 4));
+          if (magic !== SOLVE_FRAMES_MAGIC || bytes[4] !== SOLVE_FRAMES_VERSION) {
+            throw new Error(`Unsupported solve frame stream (${magic} v${bytes[4]})`);
+          }
+          streamStarted = true;
+          needed = FRAME_PREFIX_BYTES;
+        } else if (!frame) {
+          const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.length);
+          frame = {
+            type: view.getUint8(0),
+            headerLength: view.getUint32(1, true),
+            payloadLength: view.getUint32(5, true),
+          };
+          needed = frame.headerLength + frame.payloadLength;
+        } else {
+          const header = JSON.parse(textDecoder.decode(bytes.subarray(0, frame.headerLength)));
+          // Copy the payload so consumers holding on to geometry bytes don't keep the
+          // whole network chunk (or joined buffer) alive
+          yield { type: frame.type, header, payload: bytes.slice(frame.headerLength) };
+          frame = null;
+          needed = FRAME_PREFIX_BYTES;
+        }
+      }
+
+      if (done) {
+        if (available > 0 || frame) {
+          throw new Error('Solve frame stream ended mid-frame');
+        }
+        return;
+      }
+    }
+  } finally {
+    chunks = [];
+    reader.releaseLock();
+  }
+}
+
+/**
+ * Rebuild Compute InnerTree items from a BRANCH frame; geometry items keep their
+ * raw OpenNURBS bytes as data.bytes instead of a base64 JSON string
+ */
+const branchItemsFromFrame = (header, payload) =>
+  header.items.map((item) => {
+    if (item.length === undefined) {
+      return { type: item.type, data: item.data };
+    }
+    const { type, offset, length, ...fields } = item;
+    return { type, data: { ...fields, bytes: payload.subarray(offset, offset + length) } };
+  });
+
+/**
+ * Solve a Grasshopper definition, receiving results as binary frames
+ *
+ * Takes the same options as solveGrasshopper. Each output branch is handed to
+ * `onBranch` as soon as it arrives, so geometry can be decoded while the rest of
+ * the response is still downloading. Falls back to the JSON response when the
+ * backend does not send frames.
+ *
+ * @param {Object} options - solveGrasshopper options, plus:
+ * @param {Function} [options.onBranch] - Called with { paramName, path, items } per branch
+ * @param {AbortSignal} [options.signal] - Cancels the request
+ * @returns {Promise<Object>} Solve results in Compute's shape ({ values, warnings, errors, ... })
+ */
+export async function solveGrasshopperStream({
+  algo = null,
+  pointer = null,
+  fileName = 'definition.gh',
+  values = [],
+  cachesolve = true,
+  absolutetolerance = 0.01,
+  angletolerance = 1.0,
+  modelunits = 'Meters',
+  dataversion = 7,
+  backendUrl = 'http://localhost:4001',
+  onBranch,
+  signal
+}) {
+  if (!algo && !pointer) {
+    throw new Error('Either algo (base64 .gh file) or pointer is required');
+  }
+
+  const response = await fetch(`${backendUrl}/grasshopper/solve`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: `${SOLVE_FRAMES_CONTENT_TYPE}, application/json`,
+    },
+    body: JSON.stringify({
+      algo,
+      pointer,
+      fileName,
+      values,
+      cachesolve,
+      absolutetolerance,
+      angletolerance,
+      modelunits,
+      dataversion
+    }),
+    signal,
+  });
+
+  if (!response.ok) {
+    throw new Error(await readErrorMessage(response, 'Grasshopper solve failed'));
+  }
+
+  const contentType = response.headers.get('content-type') || '';
+  if (!contentType.includes(SOLVE_FRAMES_CONTENT_TYPE) || !response.body) {
+    const result = await response.json();
+    if (onBranch) {
+      (result.values || []).forEach((param) => {
+        Object.entries(param.InnerTree || {}).forEach(([path, items]) => {
+          onBranch({ paramName: param.ParamName, path, items });
+        });
+      });
+    }
+    return result;
+  }
+
+  const result = { values: [] };
+  const params = new Map();
+  for await (const { type, header, payload } of readSolveFrames(response.body)) {
+    if (type === SOLVE_FRAME_TYPES.META) {
+      Object.assign(result, header);
+      result.values = [];
+    } else if (type === SOLVE_FRAME_TYPES.BRANCH) {
+      let param = params.get(header.param);
+      if (!param) {
+        param = { ParamName: header.param, InnerTree: {} };
+        params.set(header.param, param);
+        result.values.push(param);
+      }
+      const items = branchItemsFromFrame(header, payload);
+      param.InnerTree[header.path] = items;
+      if (onBranch) {
+        onBranch({ paramName: header.param, path: header.path, items });
+      }
+    }
+  }
+  return result;
+}
+
 /**
  * Format a simple number parameter for Rhino Compute
  * @param {string} paramName - Parameter name from Grasshopper
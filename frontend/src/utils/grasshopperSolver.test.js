@@ -0,0 +1,94 @@
+/**
+ * @jest-environment node
+ */
+import { readSolveFrames, SOLVE_FRAME_TYPES } from './grasshopperSolver';
+
+const textEncoder = new TextEncoder();
+
+const frame = (type, header, payload = new Uint8Array(0)) => {
+  const headerBytes = textEncoder.encode(JSON.stringify(header));
+  const bytes = new Uint8Array(9 + headerBytes.length + payload.length);
+  const view = new DataView(bytes.buffer);
+  view.setUint8(0, type);
+  view.setUint32(1, headerBytes.length, true);
+  view.setUint32(5, payload.length, true);
+  bytes.set(headerBytes, 9);
+  bytes.set(payload, 9 + headerBytes.length);
+  return bytes;
+};
+
+const concat = (parts) => {
+  const out = new Uint8Array(parts.reduce((sum, part) => sum + part.length, 0));
+  let offset = 0;
+  parts.forEach((part) => {
+    out.set(part, offset);
+    offset += part.length;
+  });
+  return out;
+};
+
+const streamHeader = (version = 1) => new Uint8Array([71, 72, 83, 70, version, 0, 0, 0]); // "GHSF"
+
+const solveStream = concat([
+  streamHeader(),
+  frame(SOLVE_FRAME_TYPES.META, { warnings: [] }),
+  frame(SOLVE_FRAME_TYPES.BRANCH, { param: 'P', path: '{0}', items: [] }, new Uint8Array([1, 2, 3, 4])),
+  frame(SOLVE_FRAME_TYPES.END, { branches: 1, params: 1 }),
+]);
+
+// Minimal ReadableStream: hands out the bytes in chunks of `chunkSize`
+const chunkedStream = (bytes, chunkSize) => {
+  let offset = 0;
+  return {
+    getReader: () => ({
+      read: async () => {
+        if (offset >= bytes.length) return { done: true, value: undefined };
+        const value = bytes.subarray(offset, offset + chunkSize);
+        offset += chunkSize;
+        return { done: false, value };
+      },
+      releaseLock: () => {},
+    }),
+  };
+};
+
+const collect = async (stream) => {
+  const frames = [];
+  for await (const item of readSolveFrames(stream)) {
+    frames.push(item);
+  }
+  return frames;
+};
+
+describe('readSolveFrames', () => {
+  test('decodes frames regardless of how the stream is chunked', async () => {
+    for (const chunkSize of [1, 3, 9, solveStream.length]) {
+      const frames = await collect(chunkedStream(solveStream, chunkSize));
+      expect(frames.map((f) => f.type)).toEqual([
+        SOLVE_FRAME_TYPES.META,
+        SOLVE_FRAME_TYPES.BRANCH,
+        SOLVE_FRAME_TYPES.END,
+      ]);
+      expect(frames[1].header).toEqual({ param: 'P', path: '{0}', items: [] });
+      expect(Array.from(frames[1].payload)).toEqual([1, 2, 3, 4]);
+      expect(frames[2].header).toEqual({ branches: 1, params: 1 });
+    }
+  });
+
+  test('payloads are copies, not views of the received chunk', async () => {
+    const frames = await collect(chunkedStream(solveStream, solveStream.length));
+    const { payload } = frames[1];
+    expect(payload.byteOffset).toBe(0);
+    expect(payload.buffer.byteLength).toBe(payload.length);
+  });
+
+  test('rejects unknown stream versions', async () => {
+    const stream = chunkedStream(concat([streamHeader(2), frame(SOLVE_FRAME_TYPES.END, {})]), 64);
+    await expect(collect(stream)).rejects.toThrow('Unsupported solve frame stream');
+  });
+
+  test('rejects a stream that ends mid-frame', async () => {
+    const truncated = solveStream.subarray(0, solveStream.length - 2);
+    await expect(collect(chunkedStream(truncated, 64))).rejects.toThrow('ended mid-frame');
+  });
+});
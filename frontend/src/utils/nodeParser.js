@@ -3,6 +3,8 @@
  * Based on the actual GH Components database structure
  */
 
+import { ComponentCatalog, getComponentCatalog } from './componentCatalog';
+
 /**
  * Scale factor for converting between Grasshopper and UI coordinates
  * Grasshopper uses tighter spacing, so we multiply by this factor for display
@@ -117,33 +119,27 @@ export const parseComponentInstances = (componentInstances) => {
 
 /**
  * Finds a component by GUID from the components database
- * @param {Array} componentsDatabase - Array of all available components
+ * @param {Array|ComponentCatalog} componentsDatabase - Array of all available components or its catalog
  * @param {string} guid - The GUID of the component to find
  * @returns {Object|null} The component object or null if not found
  */
 export const findComponentByGuid = (componentsDatabase, guid) => {
-  if (!Array.isArray(componentsDatabase)) {
-    return null;
-  }
-  return componentsDatabase.find(comp => comp.Guid === guid) || null;
+  const catalog = getComponentCatalog(componentsDatabase);
+  return catalog ? catalog.findByGuid(guid) : null;
 };
 
 /**
- * Finds a component by name (case-insensitive partial match)
- * @param {Array} componentsDatabase - Array of all available components
+ * Finds a component by name (case-insensitive partial match, best matches first)
+ * @param {Array|ComponentCatalog} componentsDatabase - Array of all available components or its catalog
  * @param {string} name - The name or nickname to search for
  * @returns {Array} Array of matching components
  */
 export const searchComponentsByName = (componentsDatabase, name) => {
-  if (!Array.isArray(componentsDatabase) || !name) {
+  const catalog = getComponentCatalog(componentsDatabase);
+  if (!catalog || !name) {
     return [];
   }
-  
-  const searchTerm = name.toLowerCase();
-  return componentsDatabase.filter(comp => 
-    comp.Name?.toLowerCase().includes(searchTerm) ||
-    comp.Nickname?.toLowerCase().includes(searchTerm)
-  );
+  return catalog.search(name, { includeCategory: false });
 };
 
 /**
@@ -186,7 +182,7 @@ export const parseGrasshopperGraph = (graphData) => {
  * Parses simplified JSON format (Test-Script-1.json style)
  * Uses GUID to look up component from database and extract only needed info
  * @param {Object} simplifiedData - {nodes: [], links: []}
- * @param {Array} componentsDatabase - Array of all available components from gh_components_native.json
+ * @param {Array|ComponentCatalog} componentsDatabase - Components from gh_components_native.json or their catalog
  * @returns {Object} Object containing nodes and edges for React Flow
  */
 export const parseSimplifiedGraph = (simplifiedData, componentsDatabase) => {
@@ -195,6 +191,9 @@ export const parseSimplifiedGraph = (simplifiedData, componentsDatabase) => {
     return { nodes: [], edges: [] };
   }
 
+  // Index the database once so each node lookup is a hash lookup
+  const catalog = getComponentCatalog(componentsDatabase);
+
   // console.log('=== parseSimplifiedGraph ===');
   // console.log('Input data:', simplifiedData);
   // console.log('Database size:', componentsDatabase?.length || 0);
@@ -219,7 +218,7 @@ export const parseSimplifiedGraph = (simplifiedData, componentsDatabase) => {
     }
     
     // Look up component from database
-    const component = findComponentByGuid(componentsDatabase, guid);
+    const component = catalog ? catalog.findByGuid(guid) : null;
     
     if (!component) {
       console.warn(`Component with GUID ${guid} not found in database`);
@@ -506,44 +505,34 @@ const createInteractiveNodeFromSimplified = (id, guid, nickname, position, prope
 
 /**
  * Loads the complete components database
- * @param {Object} databaseJson - The complete GH components database JSON
+ * @param {Object} databaseJson - The complete GH components database JSON, or the compact
+ *   catalog produced by scripts/build-component-catalog.js
  * @returns {Object} Processed database with helper methods
  */
 export const loadComponentsDatabase = (databaseJson) => {
-  const components = databaseJson?.Components || [];
-  
+  const catalog = databaseJson?.version !== undefined && Array.isArray(databaseJson?.strings)
+    ? ComponentCatalog.fromCompact(databaseJson)
+    : ComponentCatalog.fromDatabase(databaseJson);
+
   return {
-    components,
-    count: components.length,
-    exportedAt: databaseJson?.ExportedAt,
+    get components() {
+      return catalog.components;
+    },
+    catalog,
+    count: catalog.count,
+    exportedAt: catalog.exportedAt,
     
     // Helper methods
-    findByGuid: (guid) => findComponentByGuid(components, guid),
-    searchByName: (name) => searchComponentsByName(components, name),
+    findByGuid: (guid) => catalog.findByGuid(guid),
+    searchByName: (name) => catalog.search(name, { includeCategory: false }),
     
     // Get all categories
-    getCategories: () => {
-      const categories = new Set();
-      components.forEach(comp => {
-        if (comp.Category) categories.add(comp.Category);
-      });
-      return Array.from(categories).sort();
-    },
+    getCategories: () => catalog.getCategories(),
     
     // Get subcategories for a category
-    getSubCategories: (category) => {
-      const subCategories = new Set();
-      components.forEach(comp => {
-        if (comp.Category === category && comp.SubCategory) {
-          subCategories.add(comp.SubCategory);
-        }
-      });
-      return Array.from(subCategories).sort();
-    },
+    getSubCategories: (category) => catalog.getSubCategories(category),
     
     // Filter by category
-    filterByCategory: (category) => {
-      return components.filter(comp => comp.Category === category);
-    }
+    filterByCategory: (category) => catalog.filterByCategory(category)
   };
 };
@@ -0,0 +1,231 @@
+/**
+ * Decode Rhino.Compute geometry items into flat mesh buffers
+ *
+ * Shared by the rhino decoder Web Worker and the main-thread fallback in
+ * rhinoGeometryConverter.js. Everything here works on plain typed arrays so the
+ * results can be transferred out of a worker without copying.
+ */
+
+export const RHINO3DM_CDN_BASE = 'https://cdn.jsdelivr.net/npm/rhino3dm@8.4.0/';
+export const RHINO3DM_CDN_URL = `${RHINO3DM_CDN_BASE}rhino3dm.min.js`;
+
+/**
+ * rhino3dm module options: fetch rhino3dm.wasm from the CDN next to the script.
+ * Emscripten otherwise resolves it against the page (or worker bundle) URL.
+ */
+export const RHINO3DM_MODULE_OPTIONS = {
+  locateFile: (file) => `${RHINO3DM_CDN_BASE}${file}`,
+};
+
+const bytesToBase64 = (bytes) => {
+  let binary = '';
+  // Chunked so String.fromCharCode stays under the argument limit
+  for (let i = 0; i < bytes.length; i += 0x8000) {
+    binary += String.fromCharCode.apply(null, bytes.subarray(i, i + 0x8000));
+  }
+  return btoa(binary);
+};
+
+const base64ToBytes = (base64) => {
+  const binary = atob(base64);
+  const bytes = new Uint8Array(binary.length);
+  for (let i = 0; i < binary.length; i++) {
+    bytes[i] = binary.charCodeAt(i);
+  }
+  return bytes;
+};
+
+/**
+ * Decode the OpenNURBS payload of a single InnerTree item into rhino3dm objects
+ * @param {Object} rhino - rhino3dm module
+ * @param {Object} item - { type, data } item from a Compute InnerTree. `data` is the
+ *   serialized object as a JSON string or object, or from the framed solve transport
+ *   { version, archive3dm, opennurbs, bytes } with the raw bytes as a Uint8Array
+ * @returns {Array} rhino3dm geometry objects (caller must delete them)
+ */
+export const decodeRhinoItem = (rhino, item) => {
+  let payload = typeof item.data === 'string' ? JSON.parse(item.data) : item.data;
+  if (payload?.bytes && !payload.data) {
+    // rhino3dm's decoders only read base64; encoding here keeps it off the wire
+    const { bytes, ...fields } = payload;
+    payload = { ...fields, data: bytesToBase64(bytes) };
+  }
+  if (!payload || !payload.data) {
+    return [];
+  }
+
+  // Compute serializes each object as { version, archive3dm, opennurbs, data },
+  // which the type-specific decoder (e.g. Brep.decode) or CommonObject.decode reads
+  const geometryType = item.type.split('.').pop();
+  const decoders = [rhino[geometryType], rhino.CommonObject].filter(
+    (cls) => cls && typeof cls.decode === 'function'
+  );
+  for (const decoder of decoders) {
+    try {
+      const geometry = decoder.decode(payload);
+      if (geometry) {
+        return [geometry];
+      }
+    } catch (err) {
+      // Try the next decoder
+    }
+  }
+
+  // Fall back to reading the data as a whole .3dm file
+  const doc = rhino.File3dm.fromByteArray(item.data?.bytes || base64ToBytes(payload.data));
+  if (!doc) {
+    return [];
+  }
+  const objects = doc.objects();
+  const geometries = [];
+  for (let i = 0; i < objects.count; i++) {
+    const geometry = objects.get(i).geometry();
+    if (geometry) {
+      geometries.push(geometry);
+    }
+  }
+  doc.delete();
+  return geometries;
+};
+
+/**
+ * Read a rhino3dm Mesh into { positions, indices, normals } typed arrays
+ */
+export const meshToBuffers = (rhinoMesh) => {
+  // toThreejsJSON copies the whole mesh out of WASM in one call
+  if (typeof rhinoMesh.toThreejsJSON === 'function') {
+    const json = rhinoMesh.toThreejsJSON();
+    const attributes = json?.data?.attributes;
+    if (attributes?.position?.array) {
+      const positions = new Float32Array(attributes.position.array);
+      const indices = json.data.index?.array
+        ? new Uint32Array(json.data.index.array)
+        : Uint32Array.from({ length: positions.length / 3 }, (_, i) => i);
+      const normals = attributes.normal?.array?.length === positions.length
+        ? new Float32Array(attributes.normal.array)
+        : null;
+      return { positions, indices, normals };
+    }
+  }
+
+  // Older rhino3dm builds: walk vertices and faces individually
+  const vertexList = rhinoMesh.vertices();
+  const faceList = rhinoMesh.faces();
+  const positions = new Float32Array(vertexList.count * 3);
+  for (let i = 0; i < vertexList.count; i++) {
+    const v = vertexList.get(i);
+    positions[i * 3] = v[0] !== undefined ? v[0] : v.x;
+    positions[i * 3 + 1] = v[1] !== undefined ? v[1] : v.y;
+    positions[i * 3 + 2] = v[2] !== undefined ? v[2] : v.z;
+  }
+
+  const indices = [];
+  for (let i = 0; i < faceList.count; i++) {
+    // Faces are [a, b, c, d] where d equals c for triangles
+    const [a, b, c, d] = faceList.get(i);
+    indices.push(a, b, c);
+    if (c !== d) {
+      indices.push(a, c, d);
+    }
+  }
+  return { positions, indices: new Uint32Array(indices), normals: null };
+};
+
+/**
+ * Concatenate several mesh buffers into one (one draw call per Brep)
+ */
+export const mergeMeshBuffers = (parts) => {
+  if (parts.length === 1) {
+    return parts[0];
+  }
+  const vertexTotal = parts.reduce((sum, part) => sum + part.positions.length, 0);
+  const indexTotal = parts.reduce((sum, part) => sum + part.indices.length, 0);
+  const hasNormals = parts.every((part) => part.normals);
+
+  const positions = new Float32Array(vertexTotal);
+  const normals = hasNormals ? new Float32Array(vertexTotal) : null;
+  const indices = new Uint32Array(indexTotal);
+
+  let vertexOffset = 0;
+  let indexOffset = 0;
+  for (const part of parts) {
+    positions.set(part.positions, vertexOffset);
+    if (normals) {
+      normals.set(part.normals, vertexOffset);
+    }
+    const base = vertexOffset / 3;
+    for (let i = 0; i < part.indices.length; i++) {
+      indices[indexOffset + i] = part.indices[i] + base;
+    }
+    vertexOffset += part.positions.length;
+    indexOffset += part.indices.length;
+  }
+  return { positions, indices, normals };
+};
+
+/**
+ * Convert a decoded rhino3dm geometry object into mesh buffers, or null
+ *
+ * rhino3dm cannot tessellate Breps itself, so Breps use the render meshes
+ * embedded in their faces (add a Mesh component in Grasshopper if missing).
+ */
+export const geometryToBuffers = (rhino, geometry) => {
+  const typeName = geometry.constructor.name;
+
+  if (typeName === 'Mesh') {
+    return meshToBuffers(geometry);
+  }
+
+  if (typeName === 'Brep') {
+    const faces = geometry.faces();
+    const parts = [];
+    for (let f = 0; f < faces.count; f++) {
+      const face = faces.get(f);
+      const mesh = face.getMesh(rhino.MeshType.Any);
+      if (mesh) {
+        parts.push(meshToBuffers(mesh));
+        mesh.delete();
+      }
+      face.delete();
+    }
+    faces.delete();
+    if (parts.length === 0) {
+      console.warn('[rhinoConverter] No render meshes found in Brep. Add a Mesh component before the output.');
+      return null;
+    }
+    return mergeMeshBuffers(parts);
+  }
+
+  return null;
+};
+
+/**
+ * Decode every Rhino geometry item of one InnerTree branch into mesh buffers
+ * @returns {Array<{ name, path, positions, indices, normals }>}
+ */
+export const decodeBranchToBuffers = (rhino, { paramName, path, items }) => {
+  const meshes = [];
+  for (const item of items) {
+    if (!item.type || !item.data || !item.type.startsWith('Rhino.Geometry')) {
+      continue;
+    }
+    try {
+      for (const geometry of decodeRhinoItem(rhino, item)) {
+        const buffers = geometryToBuffers(rhino, geometry);
+        geometry.delete();
+        if (buffers) {
+          meshes.push({ name: paramName, path, ...buffers });
+        }
+      }
+    } catch (err) {
+      console.error(`[rhinoConverter] Failed to decode ${item.type} in ${paramName} ${path}:`, err);
+    }
+  }
+  return meshes;
+};
+
+/**
+ * Typed-array buffers of decoded meshes, for postMessage transfer lists
+ */
+export const collectTransferables = (meshes) =>
+  meshes.flatMap((mesh) => [mesh.positions.buffer, mesh.indices.buffer, mesh.normals?.buffer].filter(Boolean));
@@ -0,0 +1,119 @@
+import {
+  collectTransferables,
+  geometryToBuffers,
+  meshToBuffers,
+  mergeMeshBuffers,
+} from './rhinoMeshBuffers';
+
+// rhino3dm list wrappers expose { count, get(i) }
+const list = (items) => ({ count: items.length, get: (i) => items[i], delete: () => {} });
+
+const threeJsonMesh = (data) => ({ toThreejsJSON: () => ({ data }) });
+
+const part = (positions, indices, normals = null) => ({
+  positions: new Float32Array(positions),
+  indices: new Uint32Array(indices),
+  normals: normals && new Float32Array(normals),
+});
+
+describe('meshToBuffers', () => {
+  test('reads indexed meshes with normals from toThreejsJSON', () => {
+    const buffers = meshToBuffers(threeJsonMesh({
+      attributes: {
+        position: { array: [0, 0, 0, 1, 0, 0, 0, 1, 0] },
+        normal: { array: [0, 0, 1, 0, 0, 1, 0, 0, 1] },
+      },
+      index: { array: [0, 1, 2] },
+    }));
+    expect(buffers.positions).toEqual(new Float32Array([0, 0, 0, 1, 0, 0, 0, 1, 0]));
+    expect(buffers.indices).toEqual(new Uint32Array([0, 1, 2]));
+    expect(buffers.normals).toEqual(new Float32Array([0, 0, 1, 0, 0, 1, 0, 0, 1]));
+  });
+
+  test('generates sequential indices and drops normals that do not match the vertices', () => {
+    const buffers = meshToBuffers(threeJsonMesh({
+      attributes: {
+        position: { array: [0, 0, 0, 1, 0, 0, 0, 1, 0, 1, 1, 0, 2, 0, 0, 2, 1, 0] },
+        normal: { array: [0, 0, 1] },
+      },
+    }));
+    expect(buffers.indices).toEqual(new Uint32Array([0, 1, 2, 3, 4, 5]));
+    expect(buffers.normals).toBeNull();
+  });
+
+  test('falls back to vertex and face lists, splitting quads into two triangles', () => {
+    const mesh = {
+      vertices: () => list([[0, 0, 0], { x: 1, y: 0, z: 0 }, [1, 1, 0], [0, 1, 0]]),
+      faces: () => list([[0, 1, 2, 3], [0, 1, 2, 2]]),
+    };
+    const buffers = meshToBuffers(mesh);
+    expect(buffers.positions).toEqual(new Float32Array([0, 0, 0, 1, 0, 0, 1, 1, 0, 0, 1, 0]));
+    expect(buffers.indices).toEqual(new Uint32Array([0, 1, 2, 0, 2, 3, 0, 1, 2]));
+    expect(buffers.normals).toBeNull();
+  });
+});
+
+describe('mergeMeshBuffers', () => {
+  test('returns a single part unchanged', () => {
+    const only = part([0, 0, 0], [0]);
+    expect(mergeMeshBuffers([only])).toBe(only);
+  });
+
+  test('offsets the indices of later parts by the vertices before them', () => {
+    const merged = mergeMeshBuffers([
+      part([0, 0, 0, 1, 0, 0, 0, 1, 0], [0, 1, 2], [0, 0, 1, 0, 0, 1, 0, 0, 1]),
+      part([5, 0, 0, 6, 0, 0, 5, 1, 0], [2, 1, 0], [0, 0, -1, 0, 0, -1, 0, 0, -1]),
+    ]);
+    expect(merged.positions).toEqual(new Float32Array([0, 0, 0, 1, 0, 0, 0, 1, 0, 5, 0, 0, 6, 0, 0, 5, 1, 0]));
+    expect(merged.indices).toEqual(new Uint32Array([0, 1, 2, 5, 4, 3]));
+    expect(merged.normals).toEqual(new Float32Array([0, 0, 1, 0, 0, 1, 0, 0, 1, 0, 0, -1, 0, 0, -1, 0, 0, -1]));
+  });
+
+  test('drops normals when any part has none', () => {
+    const merged = mergeMeshBuffers([
+      part([0, 0, 0], [0], [0, 0, 1]),
+      part([1, 0, 0], [0]),
+    ]);
+    expect(merged.normals).toBeNull();
+    expect(merged.indices).toEqual(new Uint32Array([0, 1]));
+  });
+});
+
+describe('geometryToBuffers', () => {
+  test('merges the render meshes of Brep faces and frees them', () => {
+    let deleted = 0;
+    const faceMesh = (x) => ({
+      ...threeJsonMesh({ attributes: { position: { array: [x, 0, 0, x + 1, 0, 0, x, 1, 0] } } }),
+      delete: () => { deleted += 1; },
+    });
+    const face = (mesh) => ({ getMesh: () => mesh, delete: () => { deleted += 1; } });
+    class Brep {
+      faces() {
+        return list([face(faceMesh(0)), face(null), face(faceMesh(5))]);
+      }
+    }
+
+    const buffers = geometryToBuffers({ MeshType: { Any: 0 } }, new Brep());
+    expect(buffers.indices).toEqual(new Uint32Array([0, 1, 2, 3, 4, 5]));
+    expect(buffers.positions.length).toBe(18);
+    // Two meshes and three faces
+    expect(deleted).toBe(5);
+  });
+
+  test('returns null for geometry it cannot mesh', () => {
+    class Curve {}
+    expect(geometryToBuffers({}, new Curve())).toBeNull();
+  });
+});
+
+test('collectTransferables lists each typed-array buffer, skipping missing normals', () => {
+  const withNormals = part([0, 0, 0], [0], [0, 0, 1]);
+  const withoutNormals = part([1, 0, 0], [0]);
+  expect(collectTransferables([withNormals, withoutNormals])).toEqual([
+    withNormals.positions.buffer,
+    withNormals.indices.buffer,
+    withNormals.normals.buffer,
+    withoutNormals.positions.buffer,
+    withoutNormals.indices.buffer,
+  ]);
+});
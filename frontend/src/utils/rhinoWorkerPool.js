@@ -0,0 +1,101 @@
+/**
+ * Pool of rhino3dm decoder Web Workers
+ *
+ * Workers are created lazily, each with its own rhino3dm WASM instance, and
+ * reused across solves. Jobs go to the worker with the fewest pending jobs.
+ * A worker that errors is replaced; the pool is torn down when the viewer
+ * unmounts or the page unloads.
+ */
+
+const MAX_WORKERS = 4;
+
+let pool = null;
+let nextJobId = 0;
+
+export const isWorkerDecodingSupported = () => typeof Worker !== 'undefined';
+
+const getPoolSize = () => {
+  const cores = typeof navigator !== 'undefined' && navigator.hardwareConcurrency ? navigator.hardwareConcurrency : 2;
+  // Leave a core for the main thread / renderer
+  return Math.max(1, Math.min(MAX_WORKERS, cores - 1));
+};
+
+const createPoolWorker = () => {
+  const entry = {
+    worker: new Worker(new URL('../workers/rhinoDecoder.worker.js', import.meta.url)),
+    pending: new Map(),
+  };
+
+  entry.worker.onmessage = (event) => {
+    const { id, meshes, error } = event.data;
+    const job = entry.pending.get(id);
+    if (!job) return;
+    entry.pending.delete(id);
+    if (error) {
+      job.reject(new Error(error));
+    } else {
+      job.resolve(meshes);
+    }
+  };
+
+  entry.worker.onerror = (event) => {
+    // A load failure (e.g. CDN unreachable) fails every job queued on this worker
+    const err = new Error(event.message || 'rhino3dm worker failed');
+    entry.pending.forEach((job) => job.reject(err));
+    entry.pending.clear();
+    replacePoolWorker(entry);
+  };
+
+  return entry;
+};
+
+/**
+ * Swap a failed worker for a fresh one so later jobs don't land on a broken instance
+ */
+const replacePoolWorker = (entry) => {
+  entry.worker.terminate();
+  const index = pool ? pool.indexOf(entry) : -1;
+  if (index !== -1) {
+    pool[index] = createPoolWorker();
+  }
+};
+
+const getPool = () => {
+  if (!pool) {
+    pool = Array.from({ length: getPoolSize() }, createPoolWorker);
+    window.addEventListener('pagehide', terminateRhinoWorkers);
+    console.log(`[rhinoWorkerPool] Started ${pool.length} decoder worker(s)`);
+  }
+  return pool;
+};
+
+/**
+ * Decode one InnerTree branch in a worker
+ * @param {Object} branch - { paramName, path, items }
+ * @returns {Promise<Array<{ name, path, positions, indices, normals }>>} Transferred mesh buffers
+ */
+export const decodeBranchInWorker = (branch) => {
+  const entry = getPool().reduce((best, candidate) =>
+    candidate.pending.size < best.pending.size ? candidate : best
+  );
+  const id = nextJobId++;
+
+  return new Promise((resolve, reject) => {
+    entry.pending.set(id, { resolve, reject });
+    entry.worker.postMessage({ id, ...branch });
+  });
+};
+
+/**
+ * Stop all workers and reject their pending jobs (page unload). The pool is shared by
+ * every viewer and solve, so it is not torn down when a single viewer unmounts.
+ */
+export const terminateRhinoWorkers = () => {
+  if (!pool) return;
+  window.removeEventListener('pagehide', terminateRhinoWorkers);
+  pool.forEach((entry) => {
+    entry.worker.terminate();
+    entry.pending.forEach((job) => job.reject(new Error('rhino3dm worker terminated')));
+  });
+  pool = null;
+};
@@ -0,0 +1,46 @@
+/* eslint-disable no-restricted-globals */
+/**
+ * Web Worker that decodes Rhino.Compute geometry off the main thread
+ *
+ * Each worker loads its own rhino3dm WASM instance. Messages carry one InnerTree
+ * branch: { id, paramName, path, items }. Replies are { id, meshes } where each
+ * mesh holds Float32Array/Uint32Array buffers transferred back without copying.
+ */
+
+import {
+  RHINO3DM_CDN_URL,
+  RHINO3DM_MODULE_OPTIONS,
+  collectTransferables,
+  decodeBranchToBuffers,
+} from '../utils/rhinoMeshBuffers';
+
+let rhinoPromise = null;
+
+const loadRhino = () => {
+  if (!rhinoPromise) {
+    // Same CDN build as the main-thread loader; webpack emits workers as classic
+    // scripts, so importScripts is available here
+    rhinoPromise = (async () => {
+      if (!self.rhino3dm) {
+        self.importScripts(RHINO3DM_CDN_URL);
+      }
+      return self.rhino3dm(RHINO3DM_MODULE_OPTIONS);
+    })().catch((err) => {
+      // Let the next job retry instead of failing forever on a transient CDN error
+      rhinoPromise = null;
+      throw err;
+    });
+  }
+  return rhinoPromise;
+};
+
+self.onmessage = async (event) => {
+  const { id, paramName, path, items } = event.data;
+  try {
+    const rhino = await loadRhino();
+    const meshes = decodeBranchToBuffers(rhino, { paramName, path, items });
+    self.postMessage({ id, meshes }, collectTransferables(meshes));
+  } catch (err) {
+    self.postMessage({ id, error: err.message || String(err) });
+  }
+};